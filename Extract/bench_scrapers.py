@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+"""
+Offline-Benchmark für eg_scraper.py und carus.py auf aufgezeichneten Fixtures.
+
+Ein lokaler Ersatz-Server (stub_server.py) spielt die gespeicherten Seiten aus fixtures/ ab:
+Wikipedia-Liste und Liederdatenbank-Liederbuch werden für die gewünschte Liedzahl synthetisch
+im Originalaufbau erzeugt, die Liedseiten reihum aus fixtures/liederdb/*.html bedient, die
+Carus-Produktseite aus fixtures/carus/product.html auf die gewünschte Eintragszahl vervielfacht.
+Die Rubriken werden zusätzlich über die MediaWiki-API (wiki_api.py) gemessen: synthetische
+action=parse-Antworten zur selben Liste sowie die API-Antworten aus fixtures/wikipedia/.
+
+Gemessen werden je Stufe Wandzeit, CPU-Zeit und tracemalloc-Spitze, dazu Seiten/s, reine
+Parse-CPU je Parser und die Spitzen-RSS. Ergebnis als JSON, damit Läufe verschiedener Commits
+verglichen werden können.
+
+    python bench_scrapers.py --json bench.json
+    python bench_scrapers.py --songs 5000 --carus-entries 400 --latency 0.01 --json bench-5000.json
+    python bench_scrapers.py --baseline bench.json          # Abweichungen zur Vorlage ausgeben
+"""
+import argparse, contextlib, glob, io, json, os, platform, re, subprocess, sys, tempfile, time, tracemalloc
+from typing import Any, Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from stub_server import Routes, StubServer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, "fixtures")
+HTML = "text/html; charset=utf-8"
+JSON = "application/json; charset=utf-8"
+RUBRIKEN = ["Advent", "Weihnachten", "Jahreswende", "Epiphanias", "Passion", "Ostern", "Pfingsten",
+            "Loben und Danken", "Morgen", "Abend"]
+
+
+# ---------- Messung ----------
+
+class Stage:
+    """Misst Wandzeit, CPU-Zeit und (optional) tracemalloc-Spitze eines Abschnitts."""
+
+    def __init__(self, results: Dict[str, Any], name: str, trace: bool):
+        self.results, self.name, self.trace = results, name, trace
+
+    def __enter__(self):
+        if self.trace:
+            tracemalloc.reset_peak()
+        self._wall, self._cpu = time.perf_counter(), time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        entry = {"wall_s": round(time.perf_counter() - self._wall, 4),
+                 "cpu_s": round(time.process_time() - self._cpu, 4)}
+        if self.trace:
+            entry["tracemalloc_peak_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+        self.results.setdefault("stages", {})[self.name] = entry
+
+
+def peak_rss_kb() -> Optional[int]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+# ---------- Fixtures ----------
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def build_eg_routes(songs: int) -> Routes:
+    song_pages = [_read(p) for p in sorted(glob.glob(os.path.join(FIXTURES, "liederdb", "*.html")))]
+    if not song_pages:
+        raise SystemExit("Keine Liedseiten unter fixtures/liederdb/ gefunden.")
+    per_rubrik = -(-songs // len(RUBRIKEN))
+    wiki = ['<html><body><div class="mw-parser-output">']
+    for i, rubrik in enumerate(RUBRIKEN):
+        nrs = range(i * per_rubrik + 1, min(songs, (i + 1) * per_rubrik) + 1)
+        wiki.append(f'<h2><span class="mw-headline" id="r{i}">{rubrik}</span></h2><ul>')
+        wiki.extend(f"<li>{nr} <a href=\"/wiki/Lied_{nr}\">Lied {nr}</a> (Text/Melodie)</li>" for nr in nrs)
+        wiki.append("</ul>")
+    wiki.append("</div></body></html>")
+    book = ['<html><body><h1>Liederbuch</h1><ul class="songlist">']
+    book.extend(f'<li>{nr}&nbsp;<a href="/song/{100000 + nr}">Lied Nummer {nr}</a></li>' for nr in range(1, songs + 1))
+    book.append("</ul></body></html>")
+    routes: Routes = {
+        "/wiki/EG": (HTML, "".join(wiki).encode("utf-8")),
+        "/songbook/1": (HTML, "".join(book).encode("utf-8")),
+    }
+    for nr in range(1, songs + 1):
+        routes[f"/song/{100000 + nr}"] = (HTML, song_pages[nr % len(song_pages)])
+    return routes
+
+
+def build_wiki_api_routes(songs: int, page: str = "EG", revid: int = 1) -> Routes:
+    """action=parse-Antworten (Gliederung + Wikitext je Abschnitt) zur synthetischen Wikipedia-Liste."""
+    from wiki_api import section_url, sections_url
+
+    per_rubrik = -(-songs // len(RUBRIKEN))
+    sections, routes = [], {}
+    for i, rubrik in enumerate(RUBRIKEN):
+        nrs = range(i * per_rubrik + 1, min(songs, (i + 1) * per_rubrik) + 1)
+        sections.append({"toclevel": 1, "level": "2", "line": rubrik, "number": str(i + 1), "index": str(i + 1)})
+        text = f"== {rubrik} ==\n" + "".join(f"* {nr} [[Lied {nr}]] (Text/Melodie)\n" for nr in nrs)
+        body = {"parse": {"title": page, "pageid": 1, "wikitext": text}}
+        routes[section_url("/w/api.php", revid, str(i + 1))] = (JSON, json.dumps(body).encode("utf-8"))
+    body = {"parse": {"title": page, "pageid": 1, "revid": revid, "sections": sections}}
+    routes[sections_url("/w/api.php", page)] = (JSON, json.dumps(body).encode("utf-8"))
+    return routes
+
+
+def load_wiki_fixture_routes(page: str = "Liste_der_Kirchenlieder_im_Evangelischen_Gesangbuch") -> Routes:
+    """fixtures/wikipedia/: sections.json (prop=sections|revid) und section-<index>.json (Wikitext)."""
+    from wiki_api import section_url, sections_url
+
+    base = os.path.join(FIXTURES, "wikipedia")
+    sections = _read(os.path.join(base, "sections.json"))
+    revid = json.loads(sections)["parse"]["revid"]
+    routes: Routes = {sections_url("/w/api.php", page): (JSON, sections)}
+    for path in glob.glob(os.path.join(base, "section-*.json")):
+        index = os.path.basename(path)[len("section-"):-len(".json")]
+        routes[section_url("/w/api.php", revid, index)] = (JSON, _read(path))
+    return routes
+
+
+def bench_wiki_api(args, html_rubriken: Dict[int, str], html_bytes: int) -> Dict[str, Any]:
+    """Rubriken über action=parse gegen dieselbe Liste: Übereinstimmung, Bytes, Lauf mit Revisions-Cache."""
+    import eg_scraper, wiki_api
+    from fetch_pool import FetchPool
+
+    nr_range = (1, args.songs)
+    res: Dict[str, Any] = {"html_bytes": html_bytes}
+    with StubServer(build_wiki_api_routes(args.songs), latency=args.latency) as srv, \
+            tempfile.TemporaryDirectory() as tmp, FetchPool(workers=args.workers, rate=0) as pool:
+        for run in ("erstlauf", "revision-unveraendert"):
+            stats: Dict[str, Any] = {}
+            with Stage(res, run, args.trace):
+                rubriken = wiki_api.fetch_rubriken(pool, srv.url("/wiki/EG"), nr_range, eg_scraper.EG_RUBRIKEN,
+                                                   tmp, stats)
+            res[run] = dict(stats, rubriken=len(rubriken), gleich_html=rubriken == html_rubriken)
+        res["server"] = dict(srv.stats)
+    with StubServer(load_wiki_fixture_routes()) as srv, FetchPool(workers=2, rate=0) as pool:
+        url = srv.url("/wiki/Liste_der_Kirchenlieder_im_Evangelischen_Gesangbuch")
+        rubriken = wiki_api.fetch_rubriken(pool, url, eg_scraper.NR_RANGE, eg_scraper.EG_RUBRIKEN)
+        res["fixture"] = {rubrik: sorted(nr for nr, r in rubriken.items() if r == rubrik)
+                          for rubrik in dict.fromkeys(rubriken.values())}
+    return res
+
+
+def build_carus_routes(entries: int) -> Routes:
+    page = _read(os.path.join(FIXTURES, "carus", "product.html")).decode("utf-8")
+    start, end = "<!-- entries:start -->", "<!-- entries:end -->"
+    head, rest = page.split(start, 1)
+    block, tail = rest.split(end, 1)
+    items = re.findall(r'  <div class="work-item">.*?\n  </div>(?=\n|$)', block, re.S)
+    out = []
+    for k in range(entries):
+        item = items[k % len(items)]
+        if k >= len(items):  # Kopien eindeutig machen (ids und Titel), damit sie nicht als Duplikat gelten
+            item = re.sub(r'work-(\d+)', rf'work-\1-{k}', item)
+            item = re.sub(r'(<strong class="work-item-name-and-year">)([^<]+)', rf'\1\2 ({k})', item)
+        out.append(item)
+    return {"/carus/product.html": (HTML, (head + start + "\n" + "\n".join(out) + "\n" + end + tail).encode("utf-8"))}
+
+
+# ---------- Benchmarks ----------
+
+def bench_eg(args) -> Dict[str, Any]:
+    import eg_scraper
+    from checkpoint import CheckpointJournal
+    from fetch_pool import FetchPool
+    from song_extract import PARSERS
+
+    routes = build_eg_routes(args.songs)
+    res: Dict[str, Any] = {"songs": args.songs, "workers": args.workers, "latency_s": args.latency}
+    nr_range = (1, args.songs)
+    with StubServer(routes, latency=args.latency) as srv, tempfile.TemporaryDirectory() as tmp, \
+            contextlib.redirect_stderr(io.StringIO()):
+        pool = FetchPool(workers=args.workers, rate=0, headers=eg_scraper.HEADERS)
+        journal = CheckpointJournal(os.path.join(tmp, "eg.journal"), resume=False)
+        try:
+            with Stage(res, "rubriken", args.trace):
+                rubriken = eg_scraper.fetch_rubrik_for_nr(pool, srv.url("/wiki/EG"), nr_range)
+            with Stage(res, "liste", args.trace):
+                songs = eg_scraper.fetch_titles_and_song_links(pool, srv.url("/songbook/1"), nr_range)
+            with Stage(res, "details+csv", args.trace):
+                records = eg_scraper.detail_stage(pool, songs, journal, args.parser)
+                rows, failed = eg_scraper.write_stage(eg_scraper.clean_stage(records, journal),
+                                                      os.path.join(tmp, "eg.csv"), rubriken)
+        finally:
+            journal.close()
+            pool.close()
+        res["server"] = dict(srv.stats)
+    detail = res["stages"]["details+csv"]["wall_s"]
+    res.update(rows=rows, failed=failed, rubriken=len(rubriken),
+               pages_per_s=round(rows / detail, 1) if detail else None)
+    res["rubriken_api"] = bench_wiki_api(args, rubriken, len(routes["/wiki/EG"][1]))
+
+    bodies = [routes[f"/song/{100000 + nr}"][1].decode("utf-8") for nr in range(1, args.songs + 1)]
+    res["parse_cpu_s"] = {}
+    for name, fn in PARSERS.items():
+        t0 = time.process_time()
+        for body in bodies:
+            fn(body)
+        res["parse_cpu_s"][name] = round(time.process_time() - t0, 4)
+    res["peak_rss_kb"] = peak_rss_kb()
+    return res
+
+
+def bench_carus(args) -> Dict[str, Any]:
+    try:
+        import carus
+    except ImportError as e:
+        return {"skipped": f"carus.py nicht ladbar ({e})"}
+    res: Dict[str, Any] = {"entries": args.carus_entries}
+    with StubServer(build_carus_routes(args.carus_entries), latency=args.latency) as srv, \
+            tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        out_csv = os.path.join(tmp, "carus.csv")
+        try:
+            with Stage(res, "gesamt", args.trace):
+                carus.scrape(srv.url("/carus/product.html"), out_csv)
+        except Exception as e:  # z. B. Chromium nicht installiert
+            return {"skipped": f"Playwright-Lauf fehlgeschlagen: {e}"}
+        with open(out_csv, encoding="utf-8") as f:
+            rows = max(0, sum(1 for _ in f) - 1)
+        res["server"] = dict(srv.stats)
+    total = res["stages"]["gesamt"]["wall_s"]
+    res.update(rows=rows, entries_per_s=round(args.carus_entries / total, 2) if total else None,
+               peak_rss_kb=peak_rss_kb())
+    return res
+
+
+# ---------- Ausgabe ----------
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def _print_report(results: Dict[str, Any], baseline: Optional[Dict[str, Any]]):
+    for scraper in ("eg", "carus"):
+        res = results.get(scraper)
+        if not res:
+            continue
+        if "skipped" in res:
+            print(f"[{scraper}] übersprungen: {res['skipped']}")
+            continue
+        print(f"[{scraper}]")
+        for stage, m in res.get("stages", {}).items():
+            line = f"  {stage:<14} {m['wall_s']:>8.3f}s wall {m['cpu_s']:>8.3f}s cpu"
+            if "tracemalloc_peak_kb" in m:
+                line += f" {m['tracemalloc_peak_kb']:>8} KB peak"
+            old = ((baseline or {}).get(scraper) or {}).get("stages", {}).get(stage)
+            if old and old.get("wall_s"):
+                line += f"  ({(m['wall_s'] / old['wall_s'] - 1) * 100:+.1f}% ggü. Vorlage)"
+            print(line)
+        for key in ("pages_per_s", "entries_per_s", "parse_cpu_s", "peak_rss_kb", "rows", "failed"):
+            if key in res:
+                print(f"  {key:<14} {res[key]}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline-Benchmark der Extract-Scraper auf Fixtures")
+    ap.add_argument("--songs", type=int, default=535, help="Anzahl Lieder (synthetisch hochskaliert)")
+    ap.add_argument("--carus-entries", type=int, default=40, help="Anzahl Einträge der Carus-Produktseite")
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--parser", default="stream", help="Parser für den EG-Detailabruf")
+    ap.add_argument("--latency", type=float, default=0.0, help="Künstliche Latenz je Anfrage (s)")
+    ap.add_argument("--only", choices=["eg", "carus"], default=None)
+    ap.add_argument("--no-tracemalloc", dest="trace", action="store_false",
+                    help="Ohne tracemalloc messen (weniger Overhead, keine Speicherspitzen je Stufe)")
+    ap.add_argument("--json", default=None, help="Ergebnisse als JSON speichern")
+    ap.add_argument("--baseline", default=None, help="Frühere JSON-Ergebnisse zum Vergleich")
+    args = ap.parse_args()
+
+    if args.trace:
+        tracemalloc.start()
+    results: Dict[str, Any] = {"meta": {
+        "commit": _git_commit(), "python": platform.python_version(), "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "args": vars(args)}}
+    if args.only in (None, "eg"):
+        results["eg"] = bench_eg(args)
+    if args.only in (None, "carus"):
+        results["carus"] = bench_carus(args)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    _print_report(results, baseline)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"Ergebnisse: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
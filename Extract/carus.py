@@ -1,47 +1,130 @@
+import argparse
 import csv
-import sys
+import multiprocessing
+import queue as queue_mod
 import time
 import os
-import re
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from typing import Optional, Tuple
+from urllib.parse import urlsplit
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 
+from namenorm import normalize, clean_zur_person, clean_tonart, format_person_name
+from metrics import Metrics
+from catalog_export import FORMATS as EXPORT_FORMATS, export_csv
+from name_dedupe import load_name_map
+from csv_diff import carus_key, diff_rows, read_rows, write_delta
+from durable_csv import DurableCSVWriter
+from dup_index import DupIndex
+from checkpoint import CheckpointJournal
+
 URL = "https://www.carus-verlag.com/musiknoten-und-aufnahmen/christmas-carols-of-the-world-weihnachtslieder-aus-aller-welt-chorbuch-214205.html"
 DEFAULT_OUTPUT_CSV = "christmas_carols.csv"
+DEFAULT_CRAWL_CSV = "carus_katalog.csv"
 ERROR_LOG = "errors.log"
+ENTRY_LINKS = "div.work-item-title a.work-item-link"
+EXTRACT_MODES = ("bulk", "click")
+FIELDS = ["Komponist", "Titel", "Tonart", "Besetzung", "Textquelle", "Dichter"]
+SOURCE_COLUMN = "Produktseite"   # zusätzliche Spalte im Crawl-Modus
+
+# Produktseiten: .../musiknoten-und-aufnahmen/<titel>-<nummer>.html (Pfad ohne Query/Fragment)
+PRODUCT_LINK_RE = r"/musiknoten-und-aufnahmen/[^/?#]+-\d+\.html$"
+PRODUCT_LINKS_JS = """
+(pattern) => {
+    const re = new RegExp(pattern);
+    const links = [];
+    for (const a of document.querySelectorAll('a[href]')) {
+        const u = new URL(a.href, location.href);
+        const href = u.origin + u.pathname;
+        if (re.test(u.pathname) && !links.includes(href)) links.push(href);
+    }
+    const next = document.querySelector('a[rel="next"], link[rel="next"], li.pages-item-next a');
+    return {links, next: next && next.getAttribute('href') ? new URL(next.getAttribute('href'), location.href).href : null};
+}
+"""
+PRODUCT_LINKS_READY_JS = """
+(pattern) => Array.from(document.querySelectorAll('a[href]')).some(a => new RegExp(pattern).test(new URL(a.href, location.href).pathname))
+"""
+
+# Standardmäßig blockiert: Ressourcentypen ohne Bedeutung für die Extraktion sowie Tracker und
+# Consent-Manager (Host oder Subdomain). --allow nimmt einzelne Typen/URL-Muster wieder aus.
+BLOCK_TYPES = frozenset({"image", "media", "font"})
+BLOCK_HOSTS = ("cookiebot.com", "google-analytics.com", "googletagmanager.com", "googleadservices.com",
+               "doubleclick.net", "facebook.net", "facebook.com", "hotjar.com", "clarity.ms", "etracker.com",
+               "usercentrics.eu")
+CONSENT_SCRIPT = "https://consent.cookiebot.com/uc.js"
+
+
+class ResourceBlocker:
+    """Routing-Handler für context.route("**/*", ...): blockiert nach Typ/Host, zählt je Typ."""
+
+    def __init__(self, allow=()):
+        self.allow = tuple(allow)   # Ressourcentypen ("image") oder URL-Muster ("*cookiebot*")
+        self.blocked = Counter()
+
+    def should_block(self, url, resource_type):
+        if any(pattern == resource_type or fnmatch(url, pattern) for pattern in self.allow):
+            return False
+        if resource_type in BLOCK_TYPES:
+            return True
+        host = urlsplit(url).hostname or ""
+        return any(host == domain or host.endswith("." + domain) for domain in BLOCK_HOSTS)
+
+    @property
+    def blocks_consent(self):
+        return self.should_block(CONSENT_SCRIPT, "script")
+
+    def handle(self, route):
+        request = route.request
+        if self.should_block(request.url, request.resource_type):
+            self.blocked[request.resource_type] += 1
+            route.abort()
+        else:
+            route.fallback()   # weiter an ältere Routen (HAR-Wiedergabe) bzw. ins Netz
+
+@dataclass(frozen=True)
+class PageOptions:
+    """Wie die Produktseite geladen wird; wird unverändert an Shard-Prozesse übergeben."""
+    blocking: Optional[Tuple[str, ...]] = ()   # Allow-Liste für ResourceBlocker, None = nichts blockieren
+    record_har: Optional[str] = None           # Netzverkehr in diese HAR-Datei aufzeichnen
+    replay_har: Optional[str] = None           # Seite nur aus dieser HAR-Datei bedienen (offline)
+    storage_state: Optional[str] = None        # Cookies/LocalStorage (Consent) sichern bzw. laden
+
+    def state_path(self):
+        har = self.record_har or self.replay_har
+        return self.storage_state or (f"{os.path.splitext(har)[0]}.state.json" if har else None)
+
+def track_transfer(page):
+    """Übertragene Bytes (komprimiert, laut Chromium) und Antworten der Seite, laufend mitgezählt."""
+    stats = {"bytes": 0, "responses": 0}
+    def finished(event):
+        stats["bytes"] += int(event.get("encodedDataLength") or 0)
+        stats["responses"] += 1
+    try:
+        cdp = page.context.new_cdp_session(page)
+        cdp.send("Network.enable")
+        cdp.on("Network.loadingFinished", finished)
+    except Exception:
+        stats["bytes"] = stats["responses"] = None   # kein Chromium/CDP
+    return stats
 
+# Liste gilt als vollständig, wenn sich die Zahl der Eintragslinks quietMs lang nicht mehr ändert
+LIST_STABLE_JS = """
+({selector, quietMs, timeoutMs}) => new Promise((resolve) => {
+    let timer = null;
+    const obs = new MutationObserver(() => arm());
+    const done = () => { obs.disconnect(); clearTimeout(timer); clearTimeout(deadline);
+                         resolve(document.querySelectorAll(selector).length); };
+    const arm = () => { clearTimeout(timer); timer = setTimeout(done, quietMs); };
+    const deadline = setTimeout(done, timeoutMs);
+    obs.observe(document.body, {childList: true, subtree: true});
+    arm();
+})
+"""
 
-def normalize(text: str) -> str:
-    return " ".join(text.strip().split())
-
-def clean_zur_person(text: str) -> str:
-    """Entfernt die Phrase 'zur Person' (falls vorhanden) und normalisiert."""
-    if not text:
-        return ""
-    cleaned = re.sub(r'\bzur Person\b', '', text, flags=re.IGNORECASE)
-    return normalize(cleaned)
-
-def clean_tonart(text: str) -> str:
-    """Entfernt '-Moll' und '-Dur' aus der Tonart und normalisiert."""
-    if not text:
-        return ""
-    t = normalize(text)
-    t = re.sub(r'(?i)-moll', '', t)
-    t = re.sub(r'(?i)-dur', '', t)
-    return t.strip()
-
-def format_person_name(name: str) -> str:
-    """Wandelt 'Vorname Mittelname Nachname' in 'Nachname, Vorname Mittelname' um. Einzelne Wörter bleiben."""
-    name = clean_zur_person(name)
-    if not name:
-        return ""
-    if "," in name:
-        return name  # schon formatiert
-    parts = name.split()
-    if len(parts) == 1:
-        return parts[0]
-    lastname = parts[-1]
-    given = " ".join(parts[:-1])
-    return f"{lastname}, {given}"
 
 def remove_cookie_banner_completely(page):
     """Entfernt das Cookie-Banner/Overlay einmalig vollständig."""
@@ -144,215 +227,851 @@ def open_entry_and_wait(link, panel, page):
     print(f"        ! {description} gescheitert, Panel nicht sichtbar.")
     return False
 
-def load_existing_seen(csv_path):
-    seen = set()
-    if os.path.isfile(csv_path):
+# Alle Einträge in einer page.evaluate-Runde: fehlende Panels aufklappen, per MutationObserver
+# warten, bis das DOM ruhig ist (alle Panels geladen: quietMs, sonst stallMs ohne Änderung),
+# dann je Eintrag Kopfzeile und alle li (strong-Text, li-Text) einsammeln. innerText wie im
+# Klick-Pfad, dafür wird jedes Panel beim Lesen kurz sichtbar geschaltet.
+BULK_EXTRACT_JS = """
+async ({selector, start, end, timeoutMs, quietMs, stallMs}) => {
+    const links = Array.from(document.querySelectorAll(selector)).slice(start, end === null ? undefined : end);
+    const panelOf = (a) => {
+        const id = a.getAttribute('aria-controls') || (a.getAttribute('href') || '').replace(/^#/, '');
+        return id ? document.getElementById(id) : null;
+    };
+    const loaded = (p) => !!(p && p.querySelector('div.work-item-info'));
+    const allLoaded = () => links.every((a) => loaded(panelOf(a)));
+    await new Promise((resolve) => {
+        let timer = null, deadline = null;
+        const obs = new MutationObserver(() => arm());
+        const done = () => { obs.disconnect(); clearTimeout(timer); clearTimeout(deadline); resolve(); };
+        const arm = () => { clearTimeout(timer); timer = setTimeout(done, allLoaded() ? quietMs : stallMs); };
+        deadline = setTimeout(done, timeoutMs);
+        obs.observe(document.body, {childList: true, subtree: true, characterData: true});
+        links.forEach((a) => { if (!loaded(panelOf(a))) a.click(); });
+        arm();
+    });
+    const text = (el) => (el ? el.innerText : null);
+    return links.map((a) => {
+        const p = panelOf(a);
+        const rec = {panel_id: p ? p.id : null, loaded: loaded(p), items: [],
+                     komponist: text(a.querySelector('span.work-item-author-name')),
+                     titel: text(a.querySelector('strong.work-item-name-and-year'))};
+        if (p) {
+            const display = p.style.display;
+            p.style.display = 'block';
+            rec.items = Array.from(p.querySelectorAll('ul.list-unstyled li')).map((li) => {
+                const strong = li.querySelector('strong');
+                return [strong ? strong.innerText : null, li.innerText];
+            });
+            p.style.display = display;
+        }
+        return rec;
+    });
+}
+"""
+
+
+def extract_all_entries(page, start=0, end=None, timeout_ms=20000, quiet_ms=150, stall_ms=2000):
+    """Rohdaten der Einträge start..end-1 in einem Roundtrip; Einträge mit loaded=False gehen in den Klick-Pfad."""
+    return page.evaluate(BULK_EXTRACT_JS, {"selector": ENTRY_LINKS, "start": start, "end": end,
+                                           "timeoutMs": timeout_ms, "quietMs": quiet_ms, "stallMs": stall_ms})
+
+def read_entry(link, panel):
+    """Rohdaten eines geöffneten Eintrags über einzelne Locator-Abfragen (Klick-Pfad)."""
+    raw = {"komponist": None, "titel": None, "items": []}
+    try:
+        komponist_span = link.locator("span.work-item-author-name")
+        if komponist_span.count():
+            raw["komponist"] = komponist_span.inner_text()
+    except:
+        pass
+    try:
+        titel_elem = link.locator("strong.work-item-name-and-year")
+        if titel_elem.count():
+            raw["titel"] = titel_elem.inner_text()
+    except:
+        pass
+    if panel and panel.count():
+        wait_until_panel_loaded(panel, timeout_ms=1500)
+        lis = panel.locator("ul.list-unstyled li")
+        for li_i in range(lis.count()):
+            li = lis.nth(li_i)
+            try:
+                text = li.inner_text()
+            except:
+                text = ""
+            strong = li.locator("strong")
+            raw["items"].append((strong.inner_text() if strong.count() else None, text))
+    return raw
+
+def build_entry(raw, name_map):
+    """Rohdaten (Sammelabfrage oder Klick-Pfad) -> CSV-Zeile; gleiche Regeln für beide Wege."""
+    komponist = normalize(raw["komponist"]) if raw.get("komponist") else ""
+    titel = normalize(raw["titel"]) if raw.get("titel") else ""
+    tonart = ""
+    besetzung = ""
+    textquelle = ""
+    fallback_textquelle = ""
+    dichter = ""
+    bibelstelle = ""
+
+    for strong_text, li_text in raw.get("items") or ():
+        text = normalize(li_text or "")
+        if strong_text is not None:
+            strong_text = normalize(strong_text)
+            raw_label = strong_text.rstrip(":").lower()
+            label = raw_label.replace("*", "")
+            value = text.replace(strong_text, "").strip(" :")
+            if label == "besetzung":
+                besetzung = value
+            elif label == "tonart":
+                tonart = value
+            elif label == "textquelle":
+                textquelle = value
+            elif label in ("komponist*in", "komponistin") and not komponist:
+                komponist = value
+            elif label == "bearbeiterin" and not komponist:
+                komponist = value  # Fallback: Bearbeiter*in als Komponist
+            elif label in ("textdichter*in", "textdichterin"):
+                dichter = value
+            elif label == "bibelstelle":
+                bibelstelle = value
+        else:
+            if not fallback_textquelle and text:
+                fallback_textquelle = text
+
+    if not textquelle and fallback_textquelle:
+        textquelle = fallback_textquelle
+
+    # Bibelstelle ergänzen
+    if bibelstelle:
+        if textquelle:
+            textquelle = f"{textquelle}; Bibelstelle: {bibelstelle}"
+        else:
+            textquelle = bibelstelle
+
+    komponist = format_person_name(komponist) if komponist else ""
+    titel = clean_zur_person(titel)
+    tonart = clean_tonart(clean_zur_person(tonart))
+    besetzung = clean_zur_person(besetzung)
+    textquelle = clean_zur_person(textquelle)
+    dichter = format_person_name(dichter) if dichter else ""
+    komponist = name_map.get(komponist, komponist)
+    dichter = name_map.get(dichter, dichter)
+    return {
+        "Komponist": komponist,
+        "Titel": titel,
+        "Tonart": tonart,
+        "Besetzung": besetzung,
+        "Textquelle": textquelle,
+        "Dichter": dichter,
+    }
+
+# ---------- Eintragsquellen: ein Browser im Prozess oder mehrere Shard-Prozesse ----------
+
+def launch_context(p, metrics, tag="", opts=PageOptions()):
+    """Browser und Kontext starten (HAR-Wiedergabe/-Aufzeichnung, Blockierung) -> (browser, page, blocker, transfer)."""
+    state = opts.state_path()
+    with metrics.stage("browser_start"):
+        browser = p.chromium.launch(headless=True)
+        if opts.replay_har and state and os.path.isfile(state):
+            context = browser.new_context(storage_state=state)
+        else:
+            context = browser.new_context()
+        if opts.replay_har:
+            context.route_from_har(opts.replay_har, not_found="abort")
+        elif opts.record_har:
+            context.route_from_har(opts.record_har, update=True, update_content="embed")
+        # zuletzt registrierte Route greift zuerst: Blockieren vor HAR-Wiedergabe/-Aufzeichnung
+        blocker = ResourceBlocker(opts.blocking) if opts.blocking is not None else None
+        if blocker:
+            context.route("**/*", blocker.handle)
+        page = context.new_page()
+        transfer = track_transfer(page)
+    return browser, page, blocker, transfer
+
+def load_product_page(page, url, metrics, blocker, transfer, tag="", consent=True):
+    """
+    Produktseite im vorhandenen Kontext laden -> ladeinfo (nur für diese Seite). Bereit ist die
+    Seite, sobald die Eintragsliste steht (nicht erst bei networkidle). consent=False: das
+    Cookie-Banner wurde in diesem Kontext schon behandelt (Einwilligung liegt als Cookie vor).
+    """
+    bytes0, responses0 = transfer["bytes"], transfer["responses"]
+    blocked0 = Counter(blocker.blocked) if blocker else Counter()
+    t_load = time.perf_counter()
+    with metrics.stage("seite_laden"):
+        page.goto(url, wait_until="domcontentloaded")
         try:
-            with open(csv_path, newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f, delimiter=';')
-                for row in reader:
-                    key = (
-                        normalize(row.get("Komponist", "")),
-                        normalize(row.get("Titel", "")),
-                        normalize(row.get("Tonart", "")),
-                        normalize(row.get("Besetzung", "")),
-                        normalize(row.get("Textquelle", "")),
-                        normalize(row.get("Dichter", "")),
-                    )
-                    seen.add(key)
-            print(f"[*] Bereits {len(seen)} vorhandene Einträge aus '{csv_path}' geladen (Duplikat-Vermeidung).")
+            page.wait_for_selector(ENTRY_LINKS, state="attached", timeout=30000)
+            page.evaluate(LIST_STABLE_JS, {"selector": ENTRY_LINKS, "quietMs": 300, "timeoutMs": 5000})
+        except PlaywrightTimeoutError:
+            print(f"{tag}    ! Keine Einträge nach 30 s – Seite ohne Werkliste?")
+    info = {"seconds": time.perf_counter() - t_load,
+            "bytes": None if bytes0 is None else transfer["bytes"] - bytes0,
+            "responses": None if responses0 is None else transfer["responses"] - responses0,
+            "blocked": dict(blocker.blocked - blocked0) if blocker else {}}
+    kb = "?" if info["bytes"] is None else f"{info['bytes'] // 1024}"
+    print(f"{tag}    -> Seite bereit nach {info['seconds']:.2f}s, {kb} KB in {info['responses']} Antworten, "
+          f"{sum(info['blocked'].values())} Anfragen blockiert.")
+    record_page_load(metrics, info)
+    if consent:
+        if blocker and blocker.blocks_consent:
+            print(f"{tag}[2/7] Seite geladen. Consent-Manager blockiert, kein Cookie-Banner.")
+        else:
+            print(f"{tag}[2/7] Seite geladen. Entferne Cookie-Banner/Overlay...")
+            with metrics.stage("cookie_banner"):
+                remove_cookie_banner_completely(page)
+    return info
+
+def open_product_page(p, url, metrics, tag="", opts=PageOptions()):
+    """
+    Browser starten, Produktseite laden, Cookie-Banner entfernen -> (browser, page, ladeinfo).
+    Beim Aufzeichnen wird nach dem Cookie-Banner der Storage-State gesichert; die HAR-Datei
+    schreibt Playwright beim Schließen des Kontexts (close_product_page).
+    """
+    print(f"{tag}[1/7] Browser starten und Seite laden...")
+    browser, page, blocker, transfer = launch_context(p, metrics, tag, opts)
+    info = load_product_page(page, url, metrics, blocker, transfer, tag)
+    save_storage_state(page, opts, tag)
+    return browser, page, info
+
+def save_storage_state(page, opts, tag=""):
+    state = opts.state_path()
+    if opts.record_har and state:
+        page.context.storage_state(path=state)
+        print(f"{tag}    -> Storage-State gesichert: {state}")
+
+def close_product_page(browser, page, opts=PageOptions(), tag=""):
+    page.context.close()   # schreibt bei --record-har die HAR-Datei
+    browser.close()
+    if opts.record_har:
+        print(f"{tag}    -> HAR aufgezeichnet: {opts.record_har}")
+
+def record_page_load(metrics, info, **labels):
+    metrics.observe("page_load_seconds", info["seconds"], **labels)
+    if info["bytes"] is not None:
+        metrics.inc("page_bytes_total", info["bytes"], **labels)
+    for resource_type, n in info["blocked"].items():
+        metrics.inc("blocked_requests_total", n, type=resource_type, **labels)
+
+def bulk_extract(page, lo, hi, metrics, tag=""):
+    """Sammelabfrage für die Einträge lo..hi-1; None = alles per Klick."""
+    if hi <= lo:
+        return None
+    bulk = None
+    with metrics.stage("sammelabfrage"):
+        try:
+            bulk = extract_all_entries(page, lo, hi)
         except Exception as e:
-            print(f"    ! Konnte vorhandene CSV nicht lesen: {e}")
-    return seen
+            print(f"{tag}    ! Sammelabfrage fehlgeschlagen ({e}), einzeln per Klick weiter.")
+    if bulk is not None and len(bulk) != hi - lo:
+        print(f"{tag}    ! Sammelabfrage lieferte {len(bulk)} statt {hi - lo} Einträge, einzeln per Klick weiter.")
+        bulk = None
+    if bulk is not None:
+        pending = sum(1 for rec in bulk if not rec["loaded"])
+        print(f"{tag}    -> {hi - lo - pending} Panels gelesen, {pending} per Klick nachzuholen.")
+    return bulk
 
-def scrape(url: str, output_csv: str):
-    error_entries = []
-    seen = load_existing_seen(output_csv)
-    csv_file_exists = os.path.isfile(output_csv)
-    csv_file = open(output_csv, "a", newline="", encoding="utf-8")
-    fieldnames = ["Komponist", "Titel", "Tonart", "Besetzung", "Textquelle", "Dichter"]
-    writer = csv.DictWriter(csv_file, fieldnames=fieldnames, delimiter=';')
-    if not csv_file_exists or os.path.getsize(output_csv) == 0:
-        writer.writeheader()
-        csv_file.flush()
+def iter_raw_entries(page, lo, hi, total, bulk):
+    """
+    (idx, rohdaten, fehler, info) für die Einträge lo..hi-1 in Seitenreihenfolge: aus der
+    Sammelabfrage `bulk`, sonst per Klick. fehler = (outcome, meldung) oder None.
+    """
+    links = page.locator(ENTRY_LINKS)
+    for idx in range(lo, hi):
+        rec = bulk[idx - lo] if bulk is not None else None
+        if rec is not None and rec["loaded"]:
+            yield idx, rec, None, {"source": "bulk"}
+            continue
+        link = links.nth(idx)
+        panel_id = link.get_attribute("aria-controls") or (link.get_attribute("href") or "").lstrip("#")
+        panel = page.locator(f"div#{panel_id}")
+        t_open = time.perf_counter()
+        opened = open_entry_and_wait(link, panel, page)
+        info = {"source": "click" if bulk is None else "fallback", "open_s": time.perf_counter() - t_open}
+        if not opened:
+            yield idx, None, ("open_failed", f"Eintrag {idx+1}/{total} ({panel_id}) konnte nicht geöffnet werden."), info
+            continue
+        try:
+            raw = read_entry(link, panel)
+        except Exception as e:
+            yield idx, None, ("error", f"Fehler bei Extraktion Eintrag {idx+1}/{total}: {e}"), info
+            continue
+        yield idx, raw, None, info
 
-    consecutive_empty = 0  # Zähler für drei hintereinander komplett leere Einträge
+def shard_bounds(total, shard, workers):
+    return total * shard // workers, total * (shard + 1) // workers
 
+def shard_worker(shard, workers, url, extract_mode, out, stop, opts=PageOptions()):
+    """Prozess je Shard: eigener Browser und Kontext, schickt seine Einträge einzeln an den Elternprozess."""
+    tag = f"[Shard {shard + 1}/{workers}] "
+    metrics = Metrics("carus")
     try:
         with sync_playwright() as p:
-            print("[1/7] Browser starten und Seite laden...")
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.goto(url, wait_until="networkidle")
-            time.sleep(1)
-            print("[2/7] Seite geladen. Entferne Cookie-Banner/Overlay...")
-            remove_cookie_banner_completely(page)
-
-            links = page.locator("div.work-item-title a.work-item-link")
-            total_links = links.count()
-            print(f"[3/7] Gefundene Einträge: {total_links}. Verarbeite sequenziell...")
-
-            for idx in range(total_links):
-                print(f"    -> Eintrag {idx+1}/{total_links}: Öffnen und extrahieren...")
-                link = links.nth(idx)
-                panel_id = link.get_attribute("aria-controls") or (link.get_attribute("href") or "").lstrip("#")
-                panel = page.locator(f"div#{panel_id}")
-
-                opened = open_entry_and_wait(link, panel, page)
-                if not opened:
-                    msg = f"Eintrag {idx+1}/{total_links} ({panel_id}) konnte nicht geöffnet werden."
-                    print("    !", msg)
-                    error_entries.append(msg)
-                    continue
-
-                # Extraktion
-                try:
-                    komponist = ""
-                    titel = ""
-                    tonart = ""
-                    besetzung = ""
-                    textquelle = ""
-                    fallback_textquelle = ""
-                    dichter = ""
-                    bibelstelle = ""
-
-                    try:
-                        komponist_span = link.locator("span.work-item-author-name")
-                        if komponist_span.count():
-                            komponist = normalize(komponist_span.inner_text())
-                    except:
-                        pass
-
-                    try:
-                        titel_elem = link.locator("strong.work-item-name-and-year")
-                        if titel_elem.count():
-                            titel = normalize(titel_elem.inner_text())
-                    except:
-                        pass
-
-                    if panel and panel.count():
-                        wait_until_panel_loaded(panel, timeout_ms=1500)
-                        lis = panel.locator("ul.list-unstyled li")
-                        for li_i in range(lis.count()):
-                            li = lis.nth(li_i)
-                            try:
-                                text = normalize(li.inner_text())
-                            except:
-                                text = ""
-                            strong = li.locator("strong")
-                            if strong.count():
-                                raw_label = normalize(strong.inner_text()).rstrip(":").lower()
-                                label = raw_label.replace("*", "")
-                                value = text.replace(normalize(strong.inner_text()), "").strip(" :")
-                                if label == "besetzung":
-                                    besetzung = value
-                                elif label == "tonart":
-                                    tonart = value
-                                elif label == "textquelle":
-                                    textquelle = value
-                                elif label in ("komponist*in", "komponistin") and not komponist:
-                                    komponist = value
-                                elif label == "bearbeiterin" and not komponist:
-                                    komponist = value  # Fallback: Bearbeiter*in als Komponist
-                                elif label in ("textdichter*in", "textdichterin"):
-                                    dichter = value
-                                elif label == "bibelstelle":
-                                    bibelstelle = value
-                            else:
-                                if not fallback_textquelle and text:
-                                    fallback_textquelle = text
-
-                    if not textquelle and fallback_textquelle:
-                        textquelle = fallback_textquelle
-
-                    # Bibelstelle ergänzen
-                    if bibelstelle:
-                        if textquelle:
-                            textquelle = f"{textquelle}; Bibelstelle: {bibelstelle}"
-                        else:
-                            textquelle = bibelstelle
-
-                    komponist = format_person_name(komponist) if komponist else ""
-                    titel = clean_zur_person(titel)
-                    tonart = clean_tonart(clean_zur_person(tonart))
-                    besetzung = clean_zur_person(besetzung)
-                    textquelle = clean_zur_person(textquelle)
-                    dichter = format_person_name(dichter) if dichter else ""
-
-                    # Welche Felder gefunden
-                    parts_found = {
-                        "Komponist": bool(komponist),
-                        "Titel": bool(titel),
-                        "Tonart": bool(tonart),
-                        "Besetzung": bool(besetzung),
-                        "Textquelle": bool(textquelle),
-                        "Dichter": bool(dichter),
-                    }
-                    found_summary = " ".join(f"{k}={'✓' if v else '—'}" for k, v in parts_found.items())
-
-                    # Ausgabe in Konsole
-                    print(f"        -> Gefundene Felder: {found_summary}")
-                    print(f"        -> Daten: Komponist='{komponist}', Titel='{titel}', Tonart='{tonart}', Besetzung='{besetzung}', Textquelle='{textquelle}', Dichter='{dichter}'")
-
-                    key = (komponist, titel, tonart, besetzung, textquelle, dichter)
-                    is_duplicate = key in seen
-
-                    if not any(parts_found.values()):
-                        consecutive_empty += 1
-                        print(f"        -> Keine Daten extrahiert (consecutive_empty={consecutive_empty}).")
-                    else:
-                        consecutive_empty = 0
-
-                    if consecutive_empty >= 3:
-                        print(f"[!] Abbruch: Drei aufeinanderfolgende Einträge ohne Parsing ({idx+1}/{total_links}).")
+            browser, page, _load = open_product_page(p, url, metrics, tag, opts)
+            try:
+                total = page.locator(ENTRY_LINKS).count()
+                lo, hi = shard_bounds(total, shard, workers)
+                out.put(("ready", shard, total))
+                print(f"{tag}[3/7] Einträge {lo + 1}–{hi} von {total}.")
+                bulk = bulk_extract(page, lo, hi, metrics, tag) if extract_mode == "bulk" else None
+                for item in iter_raw_entries(page, lo, hi, total, bulk):
+                    if stop.is_set():
                         break
+                    out.put(("entry", shard, item))
+            finally:
+                close_product_page(browser, page, opts, tag)
+    except Exception as e:
+        out.put(("failed", shard, f"{type(e).__name__}: {e}"))
+    finally:
+        out.put(("metrics", shard, metrics.snapshot()))  # der Elternprozess führt sie mit Label shard zusammen
+        out.put(("done", shard))
+
+class ShardedSource:
+    """
+    N Prozesse mit je eigenem Chromium teilen sich den Indexbereich der Einträge. Die Einträge
+    kommen über eine Queue und werden in Seitenreihenfolge weitergereicht, damit Duplikatprüfung
+    und Leer-Abbruch im Elternprozess genau wie beim sequenziellen Lauf greifen. Jeder Shard schickt
+    zum Schluss seine Metriken, die hier mit dem Label shard übernommen werden. close() stoppt die
+    Shards (z. B. nach dem Leer-Abbruch) und wartet auf deren Metriken.
+    """
 
-                    if is_duplicate:
-                        print("        -> Duplikat erkannt, wird nicht erneut geschrieben.")
-                        continue
-
-                    # Schreiben
-                    seen.add(key)
-                    entry = {
-                        "Komponist": komponist,
-                        "Titel": titel,
-                        "Tonart": tonart,
-                        "Besetzung": besetzung,
-                        "Textquelle": textquelle,
-                        "Dichter": dichter,
-                    }
-                    writer.writerow(entry)
-                    csv_file.flush()
-                    try:
-                        os.fsync(csv_file.fileno())
-                    except:
-                        pass
-                    print(f"        -> In CSV geschrieben.")
-
-                except Exception as e:
-                    msg = f"Fehler bei Extraktion Eintrag {idx+1}/{total_links}: {e}"
-                    print("    !", msg)
-                    error_entries.append(msg)
-
-            print(f"[4/7] Verarbeitung abgeschlossen. CSV steht in '{output_csv}'.")
-
-            if error_entries:
-                print(f"[5/7] Fehler beim Öffnen/Extrahieren einiger Einträge. Schreibe Log nach '{ERROR_LOG}'...")
-                with open(ERROR_LOG, "w", encoding="utf-8") as ef:
-                    for e in error_entries:
-                        ef.write(e + "\n")
+    def __init__(self, url, extract_mode, workers, metrics, opts=PageOptions()):
+        ctx = multiprocessing.get_context("spawn")  # Playwright verträgt kein fork
+        self.workers = workers
+        self.metrics = metrics
+        self.queue = ctx.Queue()
+        self.stop = ctx.Event()
+        self.procs = [ctx.Process(target=shard_worker, args=(k, workers, url, extract_mode, self.queue, self.stop,
+                                                             opts), daemon=True) for k in range(workers)]
+        self.total = None
+        self.done, self.failed, self.buffer = set(), {}, {}
+
+    def start(self):
+        print(f"[1/7] {self.workers} Browser-Prozesse starten, jeder lädt die Seite...")
+        for proc in self.procs:
+            proc.start()
+        while self.total is None:
+            if len(self.done) == self.workers:
+                raise RuntimeError("Kein Shard konnte die Seite laden: " + "; ".join(self.failed.values()))
+            self._pump()
+        return self.total
+
+    def _pump(self):
+        try:
+            msg = self.queue.get(timeout=1.0)
+        except queue_mod.Empty:
+            for k, proc in enumerate(self.procs):
+                if k not in self.done and not proc.is_alive():
+                    self.failed.setdefault(k, f"Prozess beendet (Exitcode {proc.exitcode})")
+                    self.done.add(k)
+            return
+        kind, shard = msg[0], msg[1]
+        if kind == "ready":
+            total = msg[2]
+            if self.total is None:
+                self.total = total
+            elif total != self.total:
+                print(f"    ! Shard {shard + 1} sieht {total} statt {self.total} Einträge (Seite geändert?).")
+        elif kind == "entry":
+            self.buffer[msg[2][0]] = msg[2]
+        elif kind == "failed":
+            self.failed[shard] = msg[2]
+            print(f"    ! Shard {shard + 1} ausgefallen: {msg[2]}")
+        elif kind == "metrics":
+            self.metrics.merge(msg[2], shard=str(shard))
+        elif kind == "done":
+            self.done.add(shard)
+
+    def _shard_of(self, idx):
+        return next(k for k in range(self.workers) if idx < shard_bounds(self.total, k, self.workers)[1])
+
+    def entries(self):
+        for idx in range(self.total):
+            while idx not in self.buffer:
+                shard = self._shard_of(idx)
+                if shard in self.done:
+                    reason = self.failed.get(shard, "vorzeitig beendet")
+                    yield idx, None, ("error", f"Eintrag {idx+1}/{self.total}: Shard {shard + 1} ausgefallen ({reason})"), {}
+                    break
+                self._pump()
             else:
-                print("[5/7] Keine kritischen Fehler festgestellt.")
+                yield self.buffer.pop(idx)
+
+    def close(self):
+        self.stop.set()
+        deadline = time.monotonic() + 10
+        while len(self.done) < self.workers and time.monotonic() < deadline:
+            self._pump()  # restliche Nachrichten (v. a. Metriken) abholen, bis jeder Shard fertig ist
+        for proc in self.procs:
+            proc.join(timeout=10)
+            if proc.is_alive():
+                proc.terminate()
 
-            browser.close()
-            print("[6/7] Browser geschlossen.")
-            print("[7/7] Fertig.")
+@contextmanager
+def entry_source(url, extract_mode, workers, metrics, opts=PageOptions()):
+    """(Anzahl Einträge, Iterator über (idx, rohdaten, fehler, info)) in Seitenreihenfolge."""
+    if workers > 1:
+        source = ShardedSource(url, extract_mode, workers, metrics, opts)
+        try:
+            yield source.start(), source.entries()
+        finally:
+            source.close()
+        return
+    with sync_playwright() as p:
+        browser, page, _load = open_product_page(p, url, metrics, opts=opts)
+        try:
+            total = page.locator(ENTRY_LINKS).count()
+            bulk = None
+            if extract_mode == "bulk" and total:
+                print(f"[3/7] Gefundene Einträge: {total}. Sammelabfrage aller Panels...")
+                bulk = bulk_extract(page, 0, total, metrics)
+            yield total, iter_raw_entries(page, 0, total, total, bulk)
+        finally:
+            close_product_page(browser, page, opts)
+
+# ---------- Crawl-Modus: viele Produktseiten in einem Browser ----------
+
+class CrawlQueue:
+    """
+    Persistente Arbeitsliste als CheckpointJournal (<csv>.queue.jsonl, Schlüssel url, jüngster
+    Eintrag gilt). Aufgenommene Produkt- und Kategorieseiten stehen als "pending" darin, bis sie
+    "done" bzw. nach max_attempts Fehlschlägen endgültig "failed" sind; ein neuer Lauf setzt fort.
+    """
+
+    def __init__(self, path, max_attempts=2):
+        self.journal = CheckpointJournal(path, key="url", batch=50)
+        self.records = dict(self.journal.records)   # Reihenfolge der ersten Aufnahme
+        self.max_attempts = max_attempts
+
+    def _put(self, rec):
+        self.records[rec["url"]] = rec
+        self.journal.append(rec)
+
+    def add(self, url, kind="product", **fields):
+        if url in self.records:
+            return False
+        self._put({"url": url, "kind": kind, "status": "pending", "ok": False, "attempts": 0, **fields})
+        return True
+
+    def mark(self, url, ok, **fields):
+        rec = self.records[url]
+        self._put({**rec, **fields, "ok": ok, "status": "done" if ok else "failed", "attempts": rec["attempts"] + 1})
+        self.journal.sync()
+
+    def pending(self, kind="product"):
+        return [url for url, rec in self.records.items()
+                if rec["kind"] == kind and not rec["ok"] and rec["attempts"] < self.max_attempts]
+
+    def summary(self, kind="product"):
+        recs = [rec for rec in self.records.values() if rec["kind"] == kind]
+        done = sum(rec["ok"] for rec in recs)
+        failed = sum(not rec["ok"] and rec["attempts"] >= self.max_attempts for rec in recs)
+        retry = sum(not rec["ok"] and 0 < rec["attempts"] < self.max_attempts for rec in recs)
+        return f"{done} erledigt, {len(recs) - done - failed} offen (davon {retry} erneut), {failed} endgültig fehlgeschlagen"
+
+    def close(self):
+        self.journal.close()
+
+def discover_products(page, category_url, metrics, max_pages=20, tag=""):
+    """Produktlinks einer Kategorie- oder Suchseite samt Folgeseiten (rel=next), in Seitenreihenfolge."""
+    found, seen, visited = [], {category_url}, set()
+    url = category_url
+    with metrics.stage("kategorie"):
+        while url and url not in visited and len(visited) < max_pages:
+            visited.add(url)
+            page.goto(url, wait_until="domcontentloaded")
+            try:
+                page.wait_for_function(PRODUCT_LINKS_READY_JS, arg=PRODUCT_LINK_RE, timeout=30000)
+            except PlaywrightTimeoutError:
+                print(f"{tag}    ! Keine Produktlinks auf {url}.")
+                break
+            result = page.evaluate(PRODUCT_LINKS_JS, PRODUCT_LINK_RE)
+            new = [link for link in result["links"] if link not in seen]
+            seen.update(new)
+            found.extend(new)
+            print(f"{tag}    -> Seite {len(visited)}: {len(new)} neue Produkte ({url})")
+            url = result["next"]
+    return found
+
+def check_csv_columns(csv_path, fieldnames):
+    """Bricht ab, wenn eine vorhandene Ziel-CSV andere Spalten hat (Anhängen würde sie verschieben)."""
+    if not os.path.isfile(csv_path) or not os.path.getsize(csv_path):
+        return
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        header = next(csv.reader(f, delimiter=";"), [])
+    if header != list(fieldnames):
+        raise SystemExit(f"'{csv_path}' hat die Spalten {';'.join(header)}, erwartet {';'.join(fieldnames)} "
+                         f"– bitte eine andere Ziel-CSV angeben.")
+
+def csv_fields(csv_path):
+    """Schlüsselspalten einer vorhandenen Carus-CSV (mit Produktseite, wenn vom Crawl-Modus geschrieben)."""
+    if os.path.isfile(csv_path):
+        with open(csv_path, newline="", encoding="utf-8-sig") as f:
+            if SOURCE_COLUMN in next(csv.reader(f, delimiter=";"), []):
+                return FIELDS + [SOURCE_COLUMN]
+    return list(FIELDS)
+
+@dataclass
+class EntryRun:
+    """Ergebnis der Eintragsschleife einer Produktseite."""
+    scraped: list = field(default_factory=list)   # alle gelesenen Einträge (auch Duplikate), für --diff-against
+    errors: list = field(default_factory=list)
+    written: int = 0
+    aborted: bool = False
+
+def write_entries(entries, total_links, writer, dup_index, metrics, name_map, extra=None):
+    """
+    Verarbeitet (idx, rohdaten, fehler, info) einer Produktseite: Felder aufbereiten, Duplikate über
+    den Index erkennen, neue Zeilen schreiben. `extra`: zusätzliche Spalten je Zeile (z. B. Produktseite).
+    Drei aufeinanderfolgende leere Einträge brechen die Seite ab.
+    """
+    extra = extra or {}
+    run = EntryRun()
+    consecutive_empty = 0  # Zähler für drei hintereinander komplett leere Einträge
+    for idx, raw, error, info in entries:
+        if "open_s" in info:
+            metrics.observe("entry_seconds", info["open_s"], phase="open")
+        if info.get("source") == "fallback":
+            metrics.inc("entries_click_fallback_total")
+        if error:
+            outcome, msg = error
+            print("    !", msg)
+            run.errors.append(msg)
+            metrics.inc("entries_total", outcome=outcome)
+            continue
+        how = "aus Sammelabfrage" if info["source"] == "bulk" else "geöffnet und extrahiert"
+        print(f"    -> Eintrag {idx+1}/{total_links}: {how}.")
+
+        # Extraktion
+        t_extract = time.perf_counter()
+        try:
+            entry = build_entry(raw, name_map)
+
+            # Welche Felder gefunden
+            parts_found = {field: bool(value) for field, value in entry.items()}
+            found_summary = " ".join(f"{k}={'✓' if v else '—'}" for k, v in parts_found.items())
+
+            # Ausgabe in Konsole
+            print(f"        -> Gefundene Felder: {found_summary}")
+            print("        -> Daten: " + ", ".join(f"{k}='{v}'" for k, v in entry.items()))
+
+            row = {**entry, **extra}
+            key = tuple(row.values())
+            is_duplicate = key in dup_index
+            metrics.observe("entry_seconds", time.perf_counter() - t_extract, phase="extract")
+
+            if not any(parts_found.values()):
+                consecutive_empty += 1
+                print(f"        -> Keine Daten extrahiert (consecutive_empty={consecutive_empty}).")
+            else:
+                consecutive_empty = 0
+
+            if consecutive_empty >= 3:
+                print(f"[!] Abbruch: Drei aufeinanderfolgende Einträge ohne Parsing ({idx+1}/{total_links}).")
+                metrics.inc("entries_total", outcome="empty")
+                metrics.inc("aborts_total", reason="consecutive_empty")
+                run.aborted = True
+                break
+
+            run.scraped.append(entry)
+
+            if is_duplicate:
+                print("        -> Duplikat erkannt, wird nicht erneut geschrieben.")
+                metrics.inc("entries_total", outcome="duplicate")
+                continue
+
+            # Schreiben
+            dup_index.add(key)
+            t_write = time.perf_counter()
+            writer.writerow(row)
+            run.written += 1
+            metrics.observe("entry_seconds", time.perf_counter() - t_write, phase="write")
+            metrics.inc("entries_total", outcome="ok" if any(parts_found.values()) else "empty")
+            print(f"        -> In CSV geschrieben.")
+
+        except Exception as e:
+            msg = f"Fehler bei Extraktion Eintrag {idx+1}/{total_links}: {e}"
+            print("    !", msg)
+            run.errors.append(msg)
+            metrics.inc("entries_total", outcome="error")
+    return run
+
+def scrape(url: str, output_csv: str, metrics: Metrics = None, export=(), name_map=None, diff_against=None,
+           extract_mode: str = "bulk", workers: int = 1, page_opts: PageOptions = PageOptions(),
+           commit_rows: int = 20, commit_ms: float = 1000, rebuild_index: bool = False):
+    metrics = metrics or Metrics("carus")
+    name_map = name_map or {}
+    error_entries = []
+    # Vorher einlesen (die Ziel-CSV wird gleich ergänzt); verglichen wird mit allen Einträgen dieses Laufs
+    previous = read_rows(diff_against)[1] if diff_against else None
+    scraped = []
+    aborted = False
+    fieldnames = list(FIELDS)
+    check_csv_columns(output_csv, fieldnames)
+    # Zuerst öffnen: entfernt einen unbestätigten Rest aus einem abgestürzten Lauf vor dem Index-Abgleich
+    writer = DurableCSVWriter(output_csv, fieldnames, every=commit_rows, interval_ms=commit_ms, metrics=metrics)
+    if writer.recovered_bytes:
+        print(f"[*] '{output_csv}': {writer.recovered_bytes} Bytes unbestätigter Rest eines abgebrochenen Laufs entfernt.")
+    with metrics.stage("index_laden"):
+        dup_index = DupIndex(output_csv, fieldnames, rebuild=rebuild_index)
+    metrics.inc("dup_index_rows_read_total", dup_index.loaded_rows)
+    print(f"[*] {dup_index.summary()}")
+    # Index-Schlüssel gelten erst, wenn ihre Zeilen per Gruppen-Commit gesichert sind
+    writer.on_commit = dup_index.sync
+
+    try:
+        with entry_source(url, extract_mode, workers, metrics, page_opts) as (total_links, entries):
+            metrics.inc("entries_found_total", total_links)
+            if workers > 1:
+                print(f"[3/7] Gefundene Einträge: {total_links}. Verarbeite in {workers} Shards, Ausgabe in Seitenreihenfolge...")
+            elif extract_mode != "bulk":
+                print(f"[3/7] Gefundene Einträge: {total_links}. Verarbeite sequenziell...")
+            with metrics.stage("eintraege"):
+                run = write_entries(entries, total_links, writer, dup_index, metrics, name_map)
+            scraped, error_entries, aborted = run.scraped, run.errors, run.aborted
+
+        print(f"[4/7] Verarbeitung abgeschlossen. CSV steht in '{output_csv}'.")
+
+        if error_entries:
+            print(f"[5/7] Fehler beim Öffnen/Extrahieren einiger Einträge. Schreibe Log nach '{ERROR_LOG}'...")
+            with open(ERROR_LOG, "w", encoding="utf-8") as ef:
+                for e in error_entries:
+                    ef.write(e + "\n")
+        else:
+            print("[5/7] Keine kritischen Fehler festgestellt.")
+
+        print("[6/7] Browser geschlossen.")
+        print("[7/7] Fertig.")
+    finally:
+        writer.close()
+        dup_index.close()
+        print(f"[*] {writer.summary()}")
+        metrics.close()
+        print(f"[*] {metrics.short_summary()}")
+
+    if export:
+        # Die CSV wird über Läufe hinweg ergänzt -> Export immer aus der vollständigen Datei
+        exporter = export_csv(output_csv, "carus", export)
+        print(f"[*] Export: {exporter.rows} Zeilen -> {', '.join(exporter.paths.values())}")
+
+    if previous is not None:
+        # Abbruch oder nicht geöffnete Einträge -> fehlende Zeilen nicht als entfernt melden
+        delta = diff_rows(previous, scraped, carus_key, fieldnames, partial=aborted or bool(error_entries))
+        paths = write_delta(delta, os.path.splitext(output_csv)[0])
+        print(f"[*] Diff gegen '{diff_against}': {delta.summary()}")
+        print(f"[*] Delta: {', '.join(paths.values())}")
+
+def crawl(product_urls, category_urls, output_csv: str, metrics: Metrics = None, export=(), name_map=None,
+          extract_mode: str = "bulk", page_opts: PageOptions = PageOptions(), commit_rows: int = 20,
+          commit_ms: float = 1000, rebuild_index: bool = False, queue_path: str = None, max_pages: int = 20,
+          max_attempts: int = 2):
+    """
+    Viele Produktseiten nacheinander in einem Browser und Kontext: Produkt- und Kategorie-URLs gehen
+    in die Warteschlange <csv>.queue.jsonl, Kategorien werden einmal in Produktlinks aufgelöst. Das
+    Cookie-Banner wird nur beim ersten Produkt behandelt (die Einwilligung gilt für den Kontext).
+    Jede Zeile bekommt die Spalte Produktseite; ein Produkt gilt erst als erledigt, wenn seine
+    Zeilen gesichert sind, so dass ein abgebrochener Crawl beim nächsten Aufruf dort weitermacht.
+    """
+    metrics = metrics or Metrics("carus")
+    name_map = name_map or {}
+    fieldnames = FIELDS + [SOURCE_COLUMN]
+    check_csv_columns(output_csv, fieldnames)
+    queue = CrawlQueue(queue_path or f"{os.path.splitext(output_csv)[0]}.queue.jsonl", max_attempts)
+    added = sum(queue.add(url) for url in product_urls) + sum(queue.add(url, kind="category") for url in category_urls)
+    queue.journal.sync()
+    print(f"[*] Warteschlange '{queue.journal.path}': {added} neu aufgenommen; {queue.summary()}.")
+
+    writer = DurableCSVWriter(output_csv, fieldnames, every=commit_rows, interval_ms=commit_ms, metrics=metrics)
+    if writer.recovered_bytes:
+        print(f"[*] '{output_csv}': {writer.recovered_bytes} Bytes unbestätigter Rest eines abgebrochenen Laufs entfernt.")
+    with metrics.stage("index_laden"):
+        dup_index = DupIndex(output_csv, fieldnames, rebuild=rebuild_index)
+    metrics.inc("dup_index_rows_read_total", dup_index.loaded_rows)
+    print(f"[*] {dup_index.summary()}")
+    writer.on_commit = dup_index.sync
+
+    error_entries = []
+    products = entries_read = entries_written = 0
+    t_start = time.perf_counter()
+
+    def rates():
+        minutes = max(time.perf_counter() - t_start, 1e-9) / 60
+        return f"{products / minutes:.1f} Produkte/min, {entries_read / minutes:.0f} Einträge/min"
+
+    try:
+        if not (queue.pending() or queue.pending("category")):
+            print("[*] Nichts offen in der Warteschlange, Browser wird nicht gestartet.")
+        else:
+            with sync_playwright() as p:
+                print("[1/7] Browser starten (einmal für alle Produkte)...")
+                browser, page, blocker, transfer = launch_context(p, metrics, opts=page_opts)
+                consent = True
+                try:
+                    for category in queue.pending("category"):
+                        print(f"[*] Kategorie/Suche: {category}")
+                        try:
+                            links = discover_products(page, category, metrics, max_pages)
+                        except Exception as e:
+                            print(f"    ! Kategorie fehlgeschlagen: {e}")
+                            queue.mark(category, False, error=str(e))
+                            continue
+                        new = sum(queue.add(link, category=category) for link in links)
+                        queue.mark(category, True, products=len(links))
+                        print(f"    -> {len(links)} Produkte, davon {new} neu in der Warteschlange.")
+
+                    todo = queue.pending()
+                    for n, url in enumerate(todo, 1):
+                        print(f"[*] Produkt {n}/{len(todo)}: {url}")
+                        t_product = time.perf_counter()
+                        try:
+                            load_product_page(page, url, metrics, blocker, transfer, consent=consent)
+                            if consent:
+                                consent = False   # Einwilligung gilt jetzt für den ganzen Kontext
+                                save_storage_state(page, page_opts)
+                            total = page.locator(ENTRY_LINKS).count()
+                            metrics.inc("entries_found_total", total)
+                            bulk = bulk_extract(page, 0, total, metrics) if extract_mode == "bulk" and total else None
+                            with metrics.stage("eintraege"):
+                                run = write_entries(iter_raw_entries(page, 0, total, total, bulk), total, writer,
+                                                    dup_index, metrics, name_map, extra={SOURCE_COLUMN: url})
+                            writer.commit()   # erst sichern, dann als erledigt vermerken
+                        except Exception as e:
+                            print(f"    ! Produkt fehlgeschlagen: {e}")
+                            error_entries.append(f"{url}: {e}")
+                            metrics.inc("products_total", outcome="failed")
+                            queue.mark(url, False, error=str(e))
+                            if not browser.is_connected():
+                                print("[!] Browser beendet – Crawl abgebrochen, nächster Aufruf setzt fort.")
+                                break
+                            continue
+                        error_entries.extend(f"{url}: {msg}" for msg in run.errors)
+                        products += 1
+                        entries_read += len(run.scraped)
+                        entries_written += run.written
+                        outcome = "aborted" if run.aborted else "done"
+                        metrics.inc("products_total", outcome=outcome)
+                        metrics.observe("product_seconds", time.perf_counter() - t_product)
+                        # Abbruch wegen leerer Einträge (Parserproblem) beim nächsten Lauf erneut versuchen
+                        queue.mark(url, not run.aborted, entries=len(run.scraped), written=run.written,
+                                   errors=len(run.errors))
+                        print(f"    -> {len(run.scraped)} Einträge, {run.written} neu geschrieben ({outcome}); {rates()}")
+                finally:
+                    close_product_page(browser, page, page_opts)
+
+        print(f"[4/7] Crawl abgeschlossen: {products} Produkte, {entries_read} Einträge, {entries_written} neu "
+              f"in '{output_csv}'; {rates()}.")
+        if error_entries:
+            print(f"[5/7] Fehler bei einigen Produkten/Einträgen. Schreibe Log nach '{ERROR_LOG}'...")
+            with open(ERROR_LOG, "w", encoding="utf-8") as ef:
+                for e in error_entries:
+                    ef.write(e + "\n")
+        else:
+            print("[5/7] Keine kritischen Fehler festgestellt.")
+        print(f"[6/7] Warteschlange: {queue.summary()}.")
+        print("[7/7] Fertig.")
     finally:
-        csv_file.close()
+        writer.close()
+        dup_index.close()
+        queue.close()
+        print(f"[*] {writer.summary()}")
+        metrics.close()
+        print(f"[*] {metrics.short_summary()}")
+
+    if export:
+        exporter = export_csv(output_csv, "carus", export)
+        print(f"[*] Export: {exporter.rows} Zeilen -> {', '.join(exporter.paths.values())}")
 
 if __name__ == "__main__":
-    target = DEFAULT_OUTPUT_CSV
-    if len(sys.argv) >= 2:
-        target = sys.argv[1]
-    scrape(URL, target)
+    ap = argparse.ArgumentParser(description="Carus-Produktseite(n) nach CSV (Komponist;Titel;Tonart;Besetzung;Textquelle;Dichter"
+                                             "[;Produktseite im Crawl-Modus])")
+    ap.add_argument("output_csv", nargs="?", default=None,
+                    help=f"Ziel-CSV (wird ergänzt; Standard {DEFAULT_OUTPUT_CSV}, im Crawl-Modus {DEFAULT_CRAWL_CSV})")
+    ap.add_argument("--url", default=URL, help="Produktseite")
+    ap.add_argument("--urls", default=None, metavar="DATEI",
+                    help="Crawl-Modus: Produkt-URLs aus dieser Datei (eine je Zeile, # = Kommentar)")
+    ap.add_argument("--category", action="append", default=[], metavar="URL",
+                    help="Crawl-Modus: Kategorie- oder Suchseite, deren Produkte (samt Folgeseiten) gelesen werden")
+    ap.add_argument("--crawl", action="store_true",
+                    help="Crawl-Modus ohne neue URLs: offene Einträge der Warteschlange abarbeiten")
+    ap.add_argument("--queue", default=None, metavar="JSONL",
+                    help="Warteschlange des Crawl-Modus (Standard: <csv>.queue.jsonl)")
+    ap.add_argument("--max-pages", type=int, default=20, help="Höchstens so viele Ergebnisseiten je Kategorie")
+    ap.add_argument("--max-attempts", type=int, default=2,
+                    help="Fehlgeschlagene Produkte in späteren Läufen bis zu so vielen Versuchen wiederholen")
+    ap.add_argument("--metrics", default=None,
+                    help="Präfix für <präfix>.metrics.jsonl und <präfix>.prom (Standard: Ziel-CSV ohne Endung, '' = aus)")
+    ap.add_argument("--profile", default=None, metavar="DIR",
+                    help="cProfile- und tracemalloc-Dumps je Stufe in dieses Verzeichnis schreiben")
+    ap.add_argument("--export", action="append", choices=EXPORT_FORMATS, default=[],
+                    help="Zusätzlich <csv>.sqlite bzw. <csv>.jsonl mit Abgleich-Schlüsseln schreiben (mehrfach möglich)")
+    ap.add_argument("--name-map", default=None, metavar="CSV",
+                    help="Namensvarianten aus dieser Zuordnungsdatei (name_dedupe.py) vereinheitlichen")
+    ap.add_argument("--diff-against", default=None, metavar="CSV",
+                    help="Einträge dieses Laufs mit dem vorherigen Stand vergleichen (Titel+Komponist+Besetzung) "
+                         "und <csv>.added/.changed/.removed.csv schreiben")
+    ap.add_argument("--extract", choices=EXTRACT_MODES, default="bulk",
+                    help="bulk: alle Panels in einer Sammelabfrage im Browser lesen (Standard); "
+                         "click: jeden Eintrag einzeln aufklappen (bisheriges Verfahren)")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Anzahl Browser-Prozesse; jeder lädt die Seite und bearbeitet einen Teil der Einträge")
+    ap.add_argument("--no-block", action="store_true",
+                    help="Keine Anfragen blockieren (sonst: Bilder, Medien, Schriften, Tracker, Consent-Manager)")
+    ap.add_argument("--allow", action="append", default=[], metavar="MUSTER",
+                    help="Trotz Blockierung laden: Ressourcentyp (z. B. image) oder URL-Muster (z. B. '*cookiebot*')")
+    ap.add_argument("--record-har", default=None, metavar="HAR",
+                    help="Seitenaufruf als HAR aufzeichnen (Inhalte eingebettet) und den Storage-State sichern; "
+                         "mit --allow '*cookiebot*' wird die akzeptierte Cookie-Einwilligung mitgesichert")
+    ap.add_argument("--replay-har", default=None, metavar="HAR",
+                    help="Seite nur aus dieser HAR-Datei bedienen, ohne Netz (z. B. nach Parser-Korrekturen, Benchmarks)")
+    ap.add_argument("--storage-state", default=None, metavar="JSON",
+                    help="Storage-State (Cookie-Consent) für --record-har/--replay-har (Standard: <har>.state.json)")
+    ap.add_argument("--commit-rows", type=int, default=20,
+                    help="CSV alle N Zeilen per fsync sichern (Gruppen-Commit mit Journal <csv>.wal)")
+    ap.add_argument("--commit-ms", type=float, default=1000,
+                    help="... bzw. spätestens nach so vielen Millisekunden")
+    ap.add_argument("--rebuild-index", action="store_true",
+                    help="Duplikat-Index <csv>.idx.sqlite aus der Ziel-CSV neu aufbauen und beenden "
+                         "(wird sonst bei jedem Lauf mit der CSV abgeglichen und nur bei Bedarf nachgeführt)")
+    args = ap.parse_args()
+    crawl_mode = bool(args.urls or args.category or args.crawl)
+    args.output_csv = args.output_csv or (DEFAULT_CRAWL_CSV if crawl_mode else DEFAULT_OUTPUT_CSV)
+    if args.rebuild_index:
+        if os.path.isfile(args.output_csv):
+            DurableCSVWriter(args.output_csv).close()  # unbestätigten Rest eines Absturzes vorher entfernen
+        with DupIndex(args.output_csv, csv_fields(args.output_csv), rebuild=True) as index:
+            print(f"[*] {index.summary()}; {len(index)} verschiedene Schlüssel")
+        raise SystemExit(0)
+    if args.workers < 1:
+        ap.error("--workers muss mindestens 1 sein")
+    if args.record_har and args.replay_har:
+        ap.error("--record-har und --replay-har schließen sich aus")
+    if args.record_har and args.workers > 1:
+        ap.error("--record-har nur mit --workers 1 (eine Aufzeichnung je Kontext)")
+    if args.replay_har and not os.path.isfile(args.replay_har):
+        ap.error(f"--replay-har: {args.replay_har} nicht gefunden")
+    if args.diff_against and not os.path.isfile(args.diff_against):
+        ap.error(f"--diff-against: {args.diff_against} nicht gefunden")
+    if crawl_mode and (args.workers > 1 or args.diff_against):
+        ap.error("Crawl-Modus (--urls/--category/--crawl) nur mit --workers 1 und ohne --diff-against")
+    if args.urls and not os.path.isfile(args.urls):
+        ap.error(f"--urls: {args.urls} nicht gefunden")
+    prefix = os.path.splitext(args.output_csv)[0] if args.metrics is None else args.metrics
+    metrics = Metrics("carus", jsonl_path=f"{prefix}.metrics.jsonl" if prefix else None,
+                      prom_path=f"{prefix}.prom" if prefix else None, profile_dir=args.profile)
+    name_map = load_name_map(args.name_map) if args.name_map else None
+    page_opts = PageOptions(blocking=None if args.no_block else tuple(args.allow), record_har=args.record_har,
+                            replay_har=args.replay_har, storage_state=args.storage_state)
+    if crawl_mode:
+        product_urls = []
+        if args.urls:
+            with open(args.urls, encoding="utf-8") as f:
+                product_urls = [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+        crawl(product_urls, args.category, args.output_csv, metrics, export=args.export, name_map=name_map,
+              extract_mode=args.extract, page_opts=page_opts, commit_rows=args.commit_rows, commit_ms=args.commit_ms,
+              queue_path=args.queue, max_pages=args.max_pages, max_attempts=args.max_attempts)
+    else:
+        scrape(args.url, args.output_csv, metrics, export=args.export, name_map=name_map,
+               diff_against=args.diff_against, extract_mode=args.extract, workers=args.workers,
+               page_opts=page_opts, commit_rows=args.commit_rows, commit_ms=args.commit_ms)
 
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Export der Scraper-CSVs als SQLite-Datei und JSON-Lines mit vorberechneten Abgleich-Schlüsseln.
+
+Der Backend-Import (choir-app-backend/src/controllers/import.controller.js) zerlegt, verkleinert
+und vergleicht Titel und Komponisten bei jedem Import neu. Die Schlüssel hier folgen denselben
+Regeln (namenorm.match_key / composer_match_key / match_tokens) und können direkt übernommen werden.
+
+SQLite (<basis>.sqlite):
+    meta(key, value)      schema_version, source, columns (JSON), created
+    entries(id, nr, title, composer, poet,
+            title_key, title_tokens, composer_key, composer_tokens, poet_key, poet_tokens,
+            fields)        *_tokens und fields als JSON; Indizes auf title_key und composer_key
+JSON-Lines (<basis>.jsonl):
+    {"type": "meta", "schema_version": 1, "source": ..., "columns": [...]}
+    {"type": "entry", "id": 1, "nr": ..., "title": ..., "title_key": ..., "title_tokens": [...], ..., "fields": {...}}
+
+Dateien entstehen unter .tmp und werden erst bei Erfolg umbenannt. Nachträglich für vorhandene CSVs:
+    python catalog_export.py EG_1-535.csv christmas_carols.csv --format sqlite --format jsonl
+"""
+import argparse, csv, json, os, sqlite3, time
+from typing import Any, Dict, List, Optional, Sequence
+
+from namenorm import composer_match_key, match_key, match_tokens
+
+SCHEMA_VERSION = 1
+FORMATS = ("sqlite", "jsonl")
+
+# CSV-Spalten beider Scraper (eg_scraper: Nr;Titel;Rubrik;Komponist;Dichter, carus: ohne Nr/Rubrik)
+KEY_COLUMNS = {"nr": "Nr", "title": "Titel", "composer": "Komponist", "poet": "Dichter"}
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE entries (
+    id INTEGER PRIMARY KEY,
+    nr INTEGER,
+    title TEXT NOT NULL, composer TEXT NOT NULL, poet TEXT NOT NULL,
+    title_key TEXT NOT NULL, title_tokens TEXT NOT NULL,
+    composer_key TEXT NOT NULL, composer_tokens TEXT NOT NULL,
+    poet_key TEXT NOT NULL, poet_tokens TEXT NOT NULL,
+    fields TEXT NOT NULL
+);
+CREATE INDEX entries_title_key ON entries (title_key);
+CREATE INDEX entries_composer_key ON entries (composer_key);
+"""
+
+
+def entry_keys(fields: Dict[str, str]) -> Dict[str, Any]:
+    """Rohwerte und Abgleich-Schlüssel einer CSV-Zeile."""
+    title = fields.get(KEY_COLUMNS["title"]) or ""
+    composer = fields.get(KEY_COLUMNS["composer"]) or ""
+    poet = fields.get(KEY_COLUMNS["poet"]) or ""
+    nr = str(fields.get(KEY_COLUMNS["nr"]) or "").strip()
+    return {
+        "nr": int(nr) if nr.isdigit() else None,
+        "title": title, "composer": composer, "poet": poet,
+        "title_key": match_key(title), "title_tokens": list(match_tokens(title)),
+        "composer_key": composer_match_key(composer), "composer_tokens": list(match_tokens(composer)),
+        "poet_key": composer_match_key(poet), "poet_tokens": list(match_tokens(poet)),
+    }
+
+
+class CatalogExporter:
+    """Schreibt Zeilen fortlaufend in <basis>.sqlite und/oder <basis>.jsonl."""
+
+    def __init__(self, base_path: str, source: str, columns: Sequence[str], formats: Sequence[str] = FORMATS,
+                 batch: int = 500):
+        unknown = set(formats) - set(FORMATS)
+        if unknown:
+            raise ValueError(f"Unbekannte Exportformate: {', '.join(sorted(unknown))}")
+        self.source = source
+        self.columns = list(columns)
+        self.batch = batch
+        self.rows = 0
+        self.paths: Dict[str, str] = {fmt: f"{base_path}.{fmt}" for fmt in formats}
+        self._pending: List[tuple] = []
+        self._db: Optional[sqlite3.Connection] = None
+        self._jsonl = None
+        meta = {"schema_version": SCHEMA_VERSION, "source": source, "columns": self.columns,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        if "sqlite" in self.paths:
+            tmp = self._tmp("sqlite")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            self._db = sqlite3.connect(tmp)
+            self._db.executescript(_SCHEMA)
+            self._db.executemany("INSERT INTO meta (key, value) VALUES (?, ?)",
+                                 [(k, v if isinstance(v, str) else json.dumps(v, ensure_ascii=False))
+                                  for k, v in meta.items()])
+        if "jsonl" in self.paths:
+            self._jsonl = open(self._tmp("jsonl"), "w", encoding="utf-8")
+            self._jsonl.write(json.dumps({"type": "meta", **meta}, ensure_ascii=False) + "\n")
+
+    def _tmp(self, fmt: str) -> str:
+        return f"{self.paths[fmt]}.tmp"
+
+    def add(self, fields: Dict[str, str]):
+        self.rows += 1
+        keys = entry_keys(fields)
+        fields = {c: "" if fields.get(c) is None else str(fields[c]) for c in self.columns}
+        if self._jsonl is not None:
+            self._jsonl.write(json.dumps({"type": "entry", "id": self.rows, **keys, "fields": fields},
+                                         ensure_ascii=False) + "\n")
+        if self._db is not None:
+            dump = lambda v: json.dumps(v, ensure_ascii=False)
+            self._pending.append((self.rows, keys["nr"], keys["title"], keys["composer"], keys["poet"],
+                                  keys["title_key"], dump(keys["title_tokens"]),
+                                  keys["composer_key"], dump(keys["composer_tokens"]),
+                                  keys["poet_key"], dump(keys["poet_tokens"]), dump(fields)))
+            if len(self._pending) >= self.batch:
+                self._flush()
+
+    def _flush(self):
+        if self._pending:
+            self._db.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", self._pending)
+            self._pending = []
+
+    def close(self, commit: bool = True):
+        """Mit commit=True werden die Dateien an ihren Platz verschoben, sonst verworfen."""
+        if self._db is not None:
+            if commit:
+                self._flush()
+                self._db.commit()
+            self._db.close()
+            self._db = None
+        if self._jsonl is not None:
+            self._jsonl.close()
+            self._jsonl = None
+        for fmt, path in self.paths.items():
+            tmp = self._tmp(fmt)
+            if not os.path.exists(tmp):
+                continue
+            if commit:
+                os.replace(tmp, path)
+            else:
+                os.remove(tmp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close(commit=exc_type is None)
+
+
+def export_csv(csv_path: str, source: Optional[str] = None, formats: Sequence[str] = FORMATS,
+               base_path: Optional[str] = None) -> CatalogExporter:
+    """Exportiert eine vorhandene Semikolon-CSV vollständig. Gibt den (geschlossenen) Exporter zurück."""
+    base_path = base_path or os.path.splitext(csv_path)[0]
+    source = source or os.path.basename(base_path)
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f, delimiter=';')
+        with CatalogExporter(base_path, source, reader.fieldnames or [], formats) as exporter:
+            for row in reader:
+                exporter.add(row)
+    return exporter
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Scraper-CSV als SQLite/JSON-Lines mit Abgleich-Schlüsseln exportieren")
+    ap.add_argument("csv", nargs="+", help="Semikolon-CSV(s) aus eg_scraper.py oder carus.py")
+    ap.add_argument("--format", action="append", choices=FORMATS, default=None,
+                    help="Exportformat (mehrfach möglich; Standard: beide)")
+    ap.add_argument("--source", default=None, help="Quellname in den Metadaten (Standard: Dateiname)")
+    args = ap.parse_args()
+    for path in args.csv:
+        exporter = export_csv(path, args.source, args.format or FORMATS)
+        print(f"{path}: {exporter.rows} Zeilen -> {', '.join(exporter.paths.values())}")
+
+
+if __name__ == "__main__":
+    main()
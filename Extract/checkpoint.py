@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Append-only Checkpoint-Journal für Scraper-Läufe (JSON-Lines).
+
+Jede Zeile ist ein abgeschlossener Datensatz, z. B.
+    {"nr": 12, "title": "...", "link": "...", "komponist": "...", "dichter": "...", "ok": true}
+Geschrieben wird sofort, per fsync gesichert aber nur alle `batch` Datensätze bzw. spätestens
+nach `interval` Sekunden. Ein Absturz verliert also höchstens den letzten ungesicherten Block;
+eine abgeschnittene letzte Zeile wird beim Laden ignoriert.
+
+Beim Laden gewinnt je Schlüssel der jüngste Eintrag, so dass ein erfolgreicher Nachabruf
+einen früher fehlgeschlagenen ("ok": false) ersetzt. `records` enthält nur den geladenen Stand;
+neu angehängte Einträge werden nicht im Speicher gehalten.
+"""
+import json, os, time
+from typing import Any, Dict, Hashable
+
+
+class CheckpointJournal:
+    def __init__(self, path: str, key: str = "nr", batch: int = 25, interval: float = 5.0, resume: bool = True):
+        self.path = path
+        self.key = key
+        self.batch = max(1, batch)
+        self.interval = interval
+        self.records: Dict[Hashable, Dict[str, Any]] = self._load() if resume else {}
+        self._f = open(path, "a" if resume else "w", encoding="utf-8")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _load(self) -> Dict[Hashable, Dict[str, Any]]:
+        records: Dict[Hashable, Dict[str, Any]] = {}
+        if not os.path.isfile(self.path):
+            return records
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # abgeschnittene letzte Zeile nach Absturz
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(rec, dict) and self.key in rec:
+                    records[rec[self.key]] = rec
+        self._truncate_partial_tail()
+        return records
+
+    def _truncate_partial_tail(self):
+        """Entfernt eine unvollständige letzte Zeile, damit neue Einträge sauber anschließen."""
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def is_done(self, key: Hashable) -> bool:
+        rec = self.records.get(key)
+        return bool(rec and rec.get("ok"))
+
+    def append(self, record: Dict[str, Any]):
+        self._f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._unsynced += 1
+        if self._unsynced >= self.batch or time.monotonic() - self._last_sync >= self.interval:
+            self.sync()
+
+    def sync(self):
+        if self._f.closed:
+            return
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if not self._f.closed:
+            self.sync()
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
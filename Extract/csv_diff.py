@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Delta zwischen zwei Ständen einer Scraper-CSV, damit nach einem Neu-Scrape nur geänderte Zeilen
+in den Backend-Import gehen.
+
+- Schlüssel "nr" (eg_scraper): Spalte Nr.
+- Schlüssel "carus": Titel + Komponist + Besetzung über die Abgleich-Schlüssel aus namenorm, d. h.
+  Groß/klein, Satzzeichen und Jahreszahlen ändern den Schlüssel nicht. Gleiche Schlüssel werden
+  in Dateireihenfolge durchnummeriert.
+- Ausgabe neben der Ziel-CSV: <basis>.added.csv, <basis>.changed.csv (jeweils aktuelle Zeilen),
+  <basis>.removed.csv (vorherige Zeilen) und <basis>.changes.csv (Schlüssel;Feld;Alt;Neu).
+- Bei unvollständigem Lauf (partial) werden keine Zeilen als entfernt gemeldet; mit `skip`
+  ausgenommene Schlüssel (z. B. fehlgeschlagene Abrufe) gelten als unverändert.
+
+    python csv_diff.py EG_alt.csv EG_1-535.csv --key nr
+    python csv_diff.py christmas_carols_alt.csv christmas_carols.csv --key carus --out delta/carus
+"""
+import argparse, csv, os
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from namenorm import clean_name, composer_match_key, match_key
+
+Row = Dict[str, str]
+KINDS = ("added", "changed", "removed")
+CHANGE_COLUMNS = ["Schlüssel", "Feld", "Alt", "Neu"]
+
+
+def nr_key(row: Row) -> str:
+    return (row.get("Nr") or "").strip()
+
+
+def carus_key(row: Row) -> str:
+    composer = composer_match_key(clean_name(row.get("Komponist") or "")).strip()
+    return "|".join((match_key(row.get("Titel") or ""), composer, match_key(row.get("Besetzung") or "")))
+
+
+KEYS: Dict[str, Callable[[Row], str]] = {"nr": nr_key, "carus": carus_key}
+
+
+def read_rows(path: str) -> Tuple[List[str], List[Row]]:
+    """(Spalten, Zeilen) einer Scraper-CSV (Semikolon, UTF-8 mit BOM); auch für enrich.py."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f, delimiter=';')
+        return list(reader.fieldnames or []), list(reader)
+
+
+def keyed(rows: Iterable[Row], key: Callable[[Row], str]) -> Dict[str, Row]:
+    """{Schlüssel: Zeile}; Wiederholungen als 'schlüssel#2', 'schlüssel#3', ..."""
+    seen: Dict[str, int] = defaultdict(int)
+    out: Dict[str, Row] = {}
+    for row in rows:
+        k = key(row)
+        seen[k] += 1
+        out[k if seen[k] == 1 else f"{k}#{seen[k]}"] = row
+    return out
+
+
+@dataclass
+class Delta:
+    columns: List[str]
+    added: List[Row] = field(default_factory=list)
+    changed: List[Tuple[str, Row, Row, List[str]]] = field(default_factory=list)  # (Schlüssel, alt, neu, Felder)
+    removed: List[Row] = field(default_factory=list)
+    unchanged: int = 0
+    partial: bool = False
+
+    def field_counts(self) -> Counter:
+        return Counter(f for _k, _old, _new, fields in self.changed for f in fields)
+
+    def summary(self) -> str:
+        fields = ", ".join(f"{f} {n}" for f, n in self.field_counts().most_common()) or "–"
+        removed = "entfernt nicht ermittelt (Lauf unvollständig)" if self.partial else f"{len(self.removed)} entfernt"
+        return (f"{len(self.added)} neu, {len(self.changed)} geändert, {removed}, "
+                f"{self.unchanged} unverändert; geänderte Felder: {fields}")
+
+
+def diff_rows(previous: Sequence[Row], current: Sequence[Row], key: Callable[[Row], str],
+              columns: Optional[List[str]] = None, skip: Iterable[str] = (), partial: bool = False) -> Delta:
+    """Vergleicht Zeilen über `key`; Werte werden ohne umgebenden Leerraum verglichen."""
+    old, new = keyed(previous, key), keyed(current, key)
+    skip_keys: Set[str] = set(skip)
+    if columns is None:
+        columns = list(dict.fromkeys(c for row in (*current, *previous) for c in row if c is not None))
+    delta = Delta(columns=columns, partial=partial)
+    for k, row in new.items():
+        before = old.get(k)
+        if before is None:
+            delta.added.append(row)
+        elif k.split("#", 1)[0] in skip_keys:
+            delta.unchanged += 1
+        else:
+            fields = [c for c in columns if (before.get(c) or "").strip() != (row.get(c) or "").strip()]
+            if fields:
+                delta.changed.append((k, before, row, fields))
+            else:
+                delta.unchanged += 1
+    if not partial:
+        delta.removed = [row for k, row in old.items() if k not in new and k.split("#", 1)[0] not in skip_keys]
+    return delta
+
+
+def _write_csv(path: str, header: List[str], rows: Iterable[List[str]]):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.writer(f, delimiter=';')
+        w.writerow(header)
+        w.writerows(rows)
+    os.replace(tmp, path)
+
+
+def write_delta(delta: Delta, base: str) -> Dict[str, str]:
+    """Schreibt die Delta-Dateien <base>.<art>.csv und gibt {art: pfad} zurück."""
+    cols = delta.columns
+    as_list = lambda row: [row.get(c) or "" for c in cols]
+    paths = {kind: f"{base}.{kind}.csv" for kind in (*KINDS, "changes")}
+    _write_csv(paths["added"], cols, map(as_list, delta.added))
+    _write_csv(paths["changed"], cols, (as_list(new) for _k, _old, new, _f in delta.changed))
+    if delta.partial:
+        del paths["removed"]  # eine alte removed-Datei bliebe sonst als scheinbar aktuelles Ergebnis liegen
+        if os.path.exists(f"{base}.removed.csv"):
+            os.remove(f"{base}.removed.csv")
+    else:
+        _write_csv(paths["removed"], cols, map(as_list, delta.removed))
+    _write_csv(paths["changes"], CHANGE_COLUMNS,
+               ([k, f, old.get(f) or "", new.get(f) or ""] for k, old, new, fields in delta.changed for f in fields))
+    return paths
+
+
+def diff_csv(previous_path: str, current_path: str, key: str = "nr", base: Optional[str] = None) -> Delta:
+    _, previous = read_rows(previous_path)
+    columns, current = read_rows(current_path)
+    delta = diff_rows(previous, current, KEYS[key], columns)
+    write_delta(delta, base or os.path.splitext(current_path)[0])
+    return delta
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Neue/geänderte/entfernte Zeilen zwischen zwei Scraper-CSVs")
+    ap.add_argument("previous", help="Vorheriger Stand")
+    ap.add_argument("current", help="Aktueller Stand")
+    ap.add_argument("--key", choices=sorted(KEYS), default="nr", help="nr (eg_scraper) oder carus")
+    ap.add_argument("--out", default=None, help="Basis der Delta-Dateien (Standard: aktuelle CSV ohne Endung)")
+    args = ap.parse_args()
+    base = args.out or os.path.splitext(args.current)[0]
+    delta = diff_csv(args.previous, args.current, args.key, base)
+    print(f"Diff gegen {args.previous}: {delta.summary()}")
+    print(f"-> {base}.{{added,changed,removed,changes}}.csv")
+
+
+if __name__ == "__main__":
+    main()
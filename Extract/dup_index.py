@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Persistenter Duplikat-Index für carus.py: 64-Bit-Hashes der normalisierten Schlüsselfelder in
+<csv>.idx.sqlite, statt bei jedem Start die ganze CSV einzulesen und als Menge im Speicher zu halten.
+
+- Schlüssel: blake2b (8 Byte) über die mit namenorm.normalize bereinigten Felder. Eine Kollision
+  ist bei 64 Bit praktisch ausgeschlossen (etwa n²/2^65, bei einer Million Zeilen 3e-8).
+- add() schreibt in eine offene Transaktion (Abfragen sehen die Schlüssel sofort); sync(offset)
+  bestätigt sie zusammen mit dem CSV-Stand in Bytes, auf den sie sich beziehen. carus.py ruft
+  sync nach jedem Gruppen-Commit des DurableCSVWriter auf, d. h. erst wenn die Zeilen gesichert sind.
+- Beim Öffnen: passt der gespeicherte Stand (Größe + Hash der ersten Bytes) zur CSV, ist nichts zu
+  lesen. Ist die CSV nur gewachsen (Absturz zwischen CSV- und Index-Commit, Ergänzung von Hand),
+  wird ab dem gespeicherten Stand nachgelesen. Sonst (gekürzt, ersetzt, andere Spalten oder
+  Schlüsselversion) wird der Index aus der CSV neu aufgebaut; rebuild=True erzwingt das.
+
+    python dup_index.py christmas_carols.csv            # Index neu aufbauen
+"""
+import argparse, csv, hashlib, io, os, sqlite3, time
+from typing import Dict, Iterable, Optional, Sequence
+
+from namenorm import normalize
+
+KEY_VERSION = 1
+HEAD_BYTES = 4096
+FIELDS = ["Komponist", "Titel", "Tonart", "Besetzung", "Textquelle", "Dichter"]
+
+
+def key_hash(values: Iterable[str]) -> int:
+    text = "\x1f".join(normalize(v or "") for v in values)
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+
+class DupIndex:
+    def __init__(self, csv_path: str, fields: Sequence[str] = FIELDS, path: Optional[str] = None,
+                 rebuild: bool = False, delimiter: str = ";"):
+        self.csv_path = csv_path
+        self.fields = list(fields)
+        self.path = path or csv_path + ".idx.sqlite"
+        self.delimiter = delimiter
+        self.loaded_rows = 0   # beim Öffnen aus der CSV gelesene Zeilen (0 = Index war aktuell)
+        self.state = "aktuell"
+        self._db = sqlite3.connect(self.path, isolation_level=None)  # Transaktionen von Hand
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS keys (h INTEGER PRIMARY KEY)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT)")
+        t0 = time.perf_counter()
+        self._db.execute("BEGIN")
+        self._open(rebuild)
+        self.open_seconds = time.perf_counter() - t0
+
+    # ---------- Abgleich mit der CSV ----------
+    def _meta(self) -> Dict[str, str]:
+        return dict(self._db.execute("SELECT k, v FROM meta"))
+
+    def _head(self, n: int) -> str:
+        with open(self.csv_path, "rb") as f:
+            return hashlib.sha1(f.read(n)).hexdigest()
+
+    def _open(self, rebuild: bool):
+        size = os.path.getsize(self.csv_path) if os.path.isfile(self.csv_path) else 0
+        meta = self._meta()
+        offset = int(meta.get("offset", -1))
+        head_len = int(meta.get("head_len", 0))
+        stale = (rebuild or meta.get("version") != str(KEY_VERSION) or meta.get("fields") != ";".join(self.fields)
+                 or not 0 <= offset <= size or (head_len and self._head(head_len) != meta.get("head")))
+        if stale:
+            self.state = "neu aufgebaut"
+            self._db.execute("DELETE FROM keys")
+            self.loaded_rows = self._read_from(0)
+        elif offset < size:
+            self.state = "nachgeführt"
+            self.loaded_rows = self._read_from(offset)
+        self.sync(size)
+
+    def _read_from(self, offset: int) -> int:
+        """Schlüssel aller Zeilen ab Byte `offset` (Zeilenanfang) eintragen; -> Anzahl Zeilen."""
+        if not os.path.isfile(self.csv_path) or os.path.getsize(self.csv_path) <= offset:
+            return 0
+        with open(self.csv_path, "rb") as f:
+            header = next(csv.reader(io.TextIOWrapper(f, encoding="utf-8-sig", newline=""), delimiter=self.delimiter), [])
+        n = 0
+        with open(self.csv_path, "rb") as f:
+            f.seek(offset)
+            reader = csv.DictReader(io.TextIOWrapper(f, encoding="utf-8-sig" if offset == 0 else "utf-8", newline=""),
+                                    fieldnames=header, delimiter=self.delimiter)
+            rows = iter(reader)
+            if offset == 0:
+                next(rows, None)  # Kopfzeile
+            for batch in _batches((key_hash(row.get(c) or "" for c in self.fields),) for row in rows):
+                self._db.executemany("INSERT OR IGNORE INTO keys (h) VALUES (?)", batch)
+                n += len(batch)
+        return n
+
+    # ---------- Laufender Betrieb ----------
+    def __contains__(self, values: Iterable[str]) -> bool:
+        return self._db.execute("SELECT 1 FROM keys WHERE h = ?", (key_hash(values),)).fetchone() is not None
+
+    def add(self, values: Iterable[str]):
+        self._db.execute("INSERT OR IGNORE INTO keys (h) VALUES (?)", (key_hash(values),))
+
+    def sync(self, offset: int):
+        """Bisherige Schlüssel zusammen mit dem CSV-Stand `offset` (Bytes) bestätigen."""
+        head_len = min(offset, HEAD_BYTES)
+        meta = {"version": str(KEY_VERSION), "fields": ";".join(self.fields), "offset": str(offset),
+                "head_len": str(head_len), "head": self._head(head_len) if head_len else ""}
+        self._db.executemany("INSERT OR REPLACE INTO meta (k, v) VALUES (?, ?)", meta.items())
+        self._db.execute("COMMIT")
+        self._db.execute("BEGIN")
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM keys").fetchone()[0]
+
+    def close(self):
+        if self._db is None:
+            return
+        self._db.execute("ROLLBACK")  # nicht per sync bestätigte Schlüssel gehören zu ungesicherten Zeilen
+        self._db.close()
+        self._db = None
+
+    def summary(self) -> str:
+        if self.state == "aktuell":
+            return f"Duplikat-Index '{self.path}' aktuell ({self.open_seconds:.3f} s)"
+        return (f"Duplikat-Index '{self.path}' {self.state}: {self.loaded_rows} Zeilen aus der CSV gelesen "
+                f"({self.open_seconds:.2f} s)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _batches(items, size: int = 5000):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Duplikat-Index <csv>.idx.sqlite für carus.py aus der CSV neu aufbauen")
+    ap.add_argument("csv", help="Carus-CSV")
+    ap.add_argument("--index", default=None, help="Indexdatei (Standard: <csv>.idx.sqlite)")
+    args = ap.parse_args()
+    with DupIndex(args.csv, path=args.index, rebuild=True) as index:
+        print(f"{index.summary()}; {len(index)} verschiedene Schlüssel")
+
+
+if __name__ == "__main__":
+    main()
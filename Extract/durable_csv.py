@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+CSV-Schreiber mit Gruppen-Commit für die Extract-Scraper.
+
+Statt flush + fsync je Zeile werden Zeilen gesammelt und alle `every` Zeilen bzw. spätestens
+nach `interval_ms` (geprüft beim Schreiben, wie im CheckpointJournal) gemeinsam gesichert:
+
+1. CSV flush + fsync,
+2. Commit-Satz "<bytes> <zeilen>" an das Write-Ahead-Journal <csv>.wal anhängen + fsync.
+
+Nach einem Absturz gilt nur, was im Journal bestätigt ist: beim nächsten Öffnen wird die CSV auf
+den letzten bestätigten Stand gekürzt, d. h. verloren ist höchstens der letzte unbestätigte Stapel
+samt halb geschriebener Zeile. Ohne Journal (sauber geschlossen, ältere Datei) wird nur eine
+unvollständige letzte Zeile entfernt. close() bestätigt den Rest und löscht das Journal.
+
+`on_commit(offset)` wird nach jedem Commit mit dem gesicherten Stand in Bytes aufgerufen, z. B. um
+einen Index (dup_index.DupIndex.sync) erst dann zu bestätigen, wenn seine Zeilen gesichert sind.
+
+    with DurableCSVWriter("out.csv", ["Nr", "Titel"], every=50, interval_ms=1000) as w:
+        w.writerow({"Nr": 1, "Titel": "Macht hoch die Tür"})
+    print(w.summary())
+"""
+import csv, os, time
+from typing import Any, Callable, Dict, Optional, Sequence, Union
+
+TAIL_CHUNK = 64 * 1024
+
+
+def _last_line_end(path: str, size: int) -> int:
+    """Byte-Position hinter dem letzten Zeilenumbruch (0, wenn es keinen gibt)."""
+    with open(path, "rb") as f:
+        end = size
+        while end > 0:
+            start = max(0, end - TAIL_CHUNK)
+            f.seek(start)
+            pos = f.read(end - start).rfind(b"\n")
+            if pos >= 0:
+                return start + pos + 1
+            end = start
+    return 0
+
+
+class DurableCSVWriter:
+    def __init__(self, path: str, fieldnames: Optional[Sequence[str]] = None, mode: str = "a",
+                 delimiter: str = ";", encoding: str = "utf-8", every: int = 50, interval_ms: float = 1000,
+                 metrics=None):
+        """
+        mode "a": an vorhandene Datei anhängen (vorher Absturzreste entfernen), Kopfzeile nur bei
+        leerer Datei; mode "w": neu schreiben. Mit `fieldnames` nimmt writerow Dicts, sonst Listen.
+        `metrics`: optional, zählt csv_fsync_total/csv_fsync_seconds_total und das Histogramm csv_fsync_seconds.
+        """
+        self.path = path
+        self.wal_path = path + ".wal"
+        self.every = max(1, every)
+        self.interval = interval_ms / 1000.0
+        self.metrics = metrics
+        self.on_commit: Optional[Callable[[int], None]] = None
+        self.rows = self.commits = self.fsyncs = 0
+        self.fsync_seconds = 0.0
+        self.recovered_bytes = self._recover() if mode == "a" else 0
+        if mode == "w" and os.path.exists(self.wal_path):
+            os.remove(self.wal_path)
+        self._f = open(path, mode, encoding=encoding, newline="")
+        self._wal = open(self.wal_path, "w", encoding="ascii")
+        if fieldnames is not None:
+            self._writer = csv.DictWriter(self._f, fieldnames=list(fieldnames), delimiter=delimiter)
+            if mode == "w" or os.fstat(self._f.fileno()).st_size == 0:
+                self._writer.writeheader()
+        else:
+            self._writer = csv.writer(self._f, delimiter=delimiter)
+        self._pending = 0
+        self.commit()  # Ausgangsstand bestätigen (nach Absturz bis hierher kürzen)
+
+    # ---------- Wiederherstellung ----------
+    def _committed_offset(self) -> Optional[int]:
+        if not os.path.isfile(self.wal_path):
+            return None
+        offset = None
+        with open(self.wal_path, encoding="ascii", errors="replace") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # abgeschnittener Commit-Satz zählt nicht
+                try:
+                    offset = int(line.split()[0])
+                except (IndexError, ValueError):
+                    break
+        return offset
+
+    def _recover(self) -> int:
+        """Kürzt die CSV auf den letzten bestätigten bzw. vollständigen Stand; gibt verworfene Bytes zurück."""
+        if not os.path.isfile(self.path):
+            return 0
+        size = os.path.getsize(self.path)
+        committed = self._committed_offset()
+        # Journal größer als die Datei: gehört zu einem älteren Stand -> nur die letzte Zeile prüfen
+        keep = committed if committed is not None and committed <= size else _last_line_end(self.path, size)
+        if keep < size:
+            with open(self.path, "rb+") as f:
+                f.truncate(keep)
+                f.flush()
+                os.fsync(f.fileno())
+        return size - keep
+
+    # ---------- Schreiben ----------
+    def writerow(self, row: Union[Dict[str, Any], Sequence[Any]]):
+        self._writer.writerow(row)
+        self.rows += 1
+        self._pending += 1
+        if self._pending >= self.every or time.monotonic() - self._last_commit >= self.interval:
+            self.commit()
+
+    def _fsync(self, f):
+        t0 = time.perf_counter()
+        os.fsync(f.fileno())
+        dt = time.perf_counter() - t0
+        self.fsyncs += 1
+        self.fsync_seconds += dt
+        if self.metrics is not None:
+            self.metrics.inc("csv_fsync_total")
+            self.metrics.inc("csv_fsync_seconds_total", dt)
+            self.metrics.observe("csv_fsync_seconds", dt)
+
+    def commit(self):
+        """Bisher geschriebene Zeilen dauerhaft sichern (CSV, dann Commit-Satz im Journal)."""
+        if self._f.closed:
+            return
+        self._f.flush()
+        self._fsync(self._f)
+        offset = os.fstat(self._f.fileno()).st_size
+        self._wal.write(f"{offset} {self.rows}\n")
+        self._wal.flush()
+        self._fsync(self._wal)
+        self.commits += 1
+        self._pending = 0
+        self._last_commit = time.monotonic()
+        if self.on_commit is not None:
+            self.on_commit(offset)
+
+    def close(self):
+        if self._f.closed:
+            return
+        if self._pending:
+            self.commit()
+        self._f.close()
+        self._wal.close()
+        os.remove(self.wal_path)
+
+    def summary(self) -> str:
+        text = (f"CSV: {self.rows} Zeilen in {self.commits} Commits, "
+                f"{self.fsyncs} fsync ({self.fsync_seconds:.3f} s)")
+        if self.recovered_bytes:
+            text += f", {self.recovered_bytes} Bytes unbestätigter Rest nach Absturz entfernt"
+        return text
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -6,19 +6,61 @@ Spalten: Nr; Titel; Rubrik; Komponist; Dichter
 - Komponist/Dichter OHNE Jahreszahlen (werden entfernt).
 - TLS steuerbar (system/certifi/none/--verify-path).
 - Robuste Nummern+Titel-Erkennung direkt aus dem HTML (Regex), damit nicht nur 1 Titel geladen wird.
+- Liedseiten parallel über einen gemeinsamen Keep-Alive-Pool (fetch_pool.py), je Host ratenbegrenzt.
+- Persistenter Antwort-Cache mit ETag/Last-Modified-Revalidierung (http_cache.py).
+- Checkpoint-Journal (<out>.journal); nach Abbruch setzt --resume beim ersten fehlenden Lied an.
+- Streaming: Liste -> Detailabruf -> Namensbereinigung -> CSV als Generator-Kette mit begrenztem
+  Puffer; Zeilen landen in Nr-Reihenfolge auf der Platte, sobald sie lückenlos vorliegen.
+- Liedseiten per Streaming-Parser mit frühem Abbruch (song_extract.py); --parser bs4 = altes Verfahren.
+- Messwerte je Anfrage/Stufe (metrics.py) als <out>.metrics.jsonl und Prometheus-Textfile <out>.prom;
+  --profile DIR schreibt zusätzlich cProfile-/tracemalloc-Dumps je Stufe.
+- Stapelbetrieb (--manifest liederbuecher.json): mehrere Liederbücher (EG-Regionalteile, Gotteslob, …)
+  in einem Prozess über einen gemeinsamen Pool; Liedseiten, die in mehreren Büchern vorkommen,
+  werden nur einmal abgerufen.
+- --export sqlite/jsonl: zusätzlich <out>.sqlite / <out>.jsonl mit Abgleich-Schlüsseln für den
+  Backend-Import (catalog_export.py).
+- --name-map namen.map.csv: Namensvarianten beim Schreiben auf die kanonische Schreibweise abbilden
+  (Zuordnungsdatei aus name_dedupe.py).
+- Vorübergehende HTTP-Fehler (429/5xx/Timeout) werden mit Backoff wiederholt (--retries), ein
+  Schutzschalter je Host bremst den ganzen Pool bei Überlast (fetch_pool.py). Lieder, die trotzdem
+  scheitern, werden am Ende noch einmal versucht; was bleibt, steht in <out>.failed.csv.
+- --diff-against alt.csv: zusätzlich <out>.added/.changed/.removed.csv und <out>.changes.csv
+  (Feldänderungen) über die Nr, damit ein Re-Import nur die Änderungen verarbeitet (csv_diff.py).
+- Rubriken standardmäßig über die MediaWiki-API (wiki_api.py): nur Gliederung + Wikitext der
+  Rubrik-Abschnitte, Ergebnis je Revision zwischengespeichert; --rubrik-source html = ganze Seite.
 
 Benutzung (eine Variante wählen):
     pip install -U requests beautifulsoup4 tqdm certifi
     python eg_scraper.py --verify certifi
     # oder: python eg_scraper.py --verify-path /pfad/zu/firmenca.pem
     # Notlösung (unsicher): python eg_scraper.py --verify none
+    # Parallelität/Rate: python eg_scraper.py --workers 8 --rate 5
+    # Nur aus dem Cache: python eg_scraper.py --offline
+    # Nach Abbruch fortsetzen: python eg_scraper.py --resume
+    # Mehrere Liederbücher: python eg_scraper.py --manifest songbooks.example.json
+    # Nur Änderungen importieren: cp EG_1-535.csv EG_alt.csv; python eg_scraper.py --diff-against EG_alt.csv
 """
-import csv, re, sys, time, argparse
-from typing import Dict, List, Tuple, Union
+import csv, json, os, re, sys, threading, time, argparse
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urljoin
 import requests
 from bs4 import BeautifulSoup
 from tqdm import tqdm
 
+from fetch_pool import FetchPool, RetryPolicy, VerifyType
+from http_cache import ResponseCache
+from checkpoint import CheckpointJournal
+from song_extract import PARSERS
+from namenorm import clean_name
+from metrics import Metrics
+from catalog_export import FORMATS as EXPORT_FORMATS, CatalogExporter
+from name_dedupe import load_name_map
+from csv_diff import diff_rows, nr_key, read_rows, write_delta
+from durable_csv import DurableCSVWriter
+import wiki_api
+
 try:
     import certifi
 except Exception:
@@ -26,15 +68,29 @@ except Exception:
 
 WIKI_URL = "https://de.wikipedia.org/wiki/Liste_der_Kirchenlieder_im_Evangelischen_Gesangbuch"
 LIEDERDB_URL = "https://liederdatenbank.strehle.de/songbook/8984"
-BASE_SONG_URL = "https://liederdatenbank.strehle.de"
 OUT_CSV = "EG_1-535.csv"
+NR_RANGE = (1, 535)  # Stammteil
+SONGBOOK_URL = "https://liederdatenbank.strehle.de/songbook/{}"
+CSV_COLUMNS = ["Nr", "Titel", "Rubrik", "Komponist", "Dichter"]
+
+# Überschriften der Wikipedia-Liste, die als Rubrik gelten
+EG_RUBRIKEN = frozenset({
+    "Advent","Weihnachten","Jahreswende","Epiphanias","Passion","Ostern",
+    "Himmelfahrt","Pfingsten","Trinitatis","Besondere Tage","Ende des Kirchenjahres",
+    "Eingang und Ausgang","Liturgische Gesänge","Wort Gottes","Taufe und Konfirmation",
+    "Abendmahl","Beichte","Trauung","Sammlung und Sendung","Ökumene",
+    "Psalmen und Lobgesänge","Biblische Erzähllieder",
+    "Loben und Danken","Rechtfertigung und Zuversicht","Angst und Vertrauen",
+    "Umkehr und Nachfolge","Geborgen in Gottes Liebe","Nächsten- und Feindesliebe",
+    "Erhaltung der Schöpfung, Frieden und Gerechtigkeit","Morgen","Mittag und tägliches Brot",
+    "Abend","Arbeit","Auf Reisen","Natur und Jahreszeiten",
+    "Sterben und ewiges Leben, Bestattung"
+})
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
 }
 
-VerifyType = Union[bool, str, None]
-
 def resolve_verify(args) -> VerifyType:
     if args.verify_path:
         return args.verify_path
@@ -48,20 +104,14 @@ def resolve_verify(args) -> VerifyType:
         return certifi.where()
     return None  # system/default
 
-def clean_name(s: str) -> str:
-    if not s:
-        return ""
-    # (1623–1676) / (1623) / 1623 entfernen
-    s = re.sub(r"\(\s*\d{3,4}\s*[–-]\s*\d{1,4}\s*\)", "", s)
-    s = re.sub(r"[\(\[]\s*\d{3,4}\s*[\)\]]", "", s)
-    s = re.sub(r"\b\d{3,4}\b", "", s)
-    s = re.sub(r"\s{2,}", " ", s).strip(" ,;/")
-    return s
-
-def fetch_rubrik_for_nr(verify: VerifyType) -> Dict[int, str]:
-    """Rubrik-Mapping {nr: rubrik}. Fällt bei Fehlern auf {} (Rubrik bleibt dann leer)."""
+def fetch_rubrik_for_nr(pool: FetchPool, url: str = WIKI_URL, nr_range: Tuple[int, int] = NR_RANGE,
+                        known: Optional[Iterable[str]] = EG_RUBRIKEN) -> Dict[int, str]:
+    """
+    Rubrik-Mapping {nr: rubrik}. Fällt bei Fehlern auf {} (Rubrik bleibt dann leer).
+    `known`: Überschriften, die als Rubrik gelten; None = jede h2/h3-Überschrift.
+    """
     try:
-        resp = requests.get(WIKI_URL, headers=HEADERS, timeout=60, verify=verify)
+        resp = pool.get(url)
         resp.raise_for_status()
     except requests.exceptions.SSLError as e:
         print(f"WARNUNG: SSL-Fehler Wikipedia: {e}", file=sys.stderr)
@@ -72,45 +122,61 @@ def fetch_rubrik_for_nr(verify: VerifyType) -> Dict[int, str]:
         return {}
     soup = BeautifulSoup(resp.text, "html.parser")
 
-    known = {
-        "Advent","Weihnachten","Jahreswende","Epiphanias","Passion","Ostern",
-        "Himmelfahrt","Pfingsten","Trinitatis","Besondere Tage","Ende des Kirchenjahres",
-        "Eingang und Ausgang","Liturgische Gesänge","Wort Gottes","Taufe und Konfirmation",
-        "Abendmahl","Beichte","Trauung","Sammlung und Sendung","Ökumene",
-        "Psalmen und Lobgesänge","Biblische Erzähllieder",
-        "Loben und Danken","Rechtfertigung und Zuversicht","Angst und Vertrauen",
-        "Umkehr und Nachfolge","Geborgen in Gottes Liebe","Nächsten- und Feindesliebe",
-        "Erhaltung der Schöpfung, Frieden und Gerechtigkeit","Morgen","Mittag und tägliches Brot",
-        "Abend","Arbeit","Auf Reisen","Natur und Jahreszeiten",
-        "Sterben und ewiges Leben, Bestattung"
-    }
+    known = frozenset(known) if known is not None else None
     rubrik_for_nr: Dict[int, str] = {}
     current = None
+    lo, hi = nr_range
+    nr_re = re.compile(rf"^(\d{{1,{len(str(hi))}}})(?:\.\d+)?\s+")
 
     for tag in soup.find_all(["h2","h3","ul","ol"]):
         if tag.name in ("h2","h3"):
-            span = tag.find("span", class_="mw-headline")
-            title = span.get_text(strip=True) if span else None
-            if title in known:
+            span = tag.find("span", class_="mw-headline")  # neuere Skins: Text direkt in h2/h3
+            title = (span or tag).get_text(strip=True) or None
+            if title and (known is None or title in known):
                 current = title
         elif tag.name in ("ul","ol") and current:
             for li in tag.find_all("li", recursive=False):
                 text = li.get_text(" ", strip=True)
-                m = re.match(r"^(\d{1,3})(?:\.\d+)?\s+", text)
+                m = nr_re.match(text)
                 if m:
                     nr = int(m.group(1))
-                    if 1 <= nr <= 535:
+                    if lo <= nr <= hi:
                         rubrik_for_nr.setdefault(nr, current)
     return rubrik_for_nr
 
-def fetch_titles_and_song_links(verify: VerifyType) -> List[Tuple[int, str, str]]:
+RUBRIK_SOURCES = ("api", "html")
+
+def fetch_rubriken(pool: FetchPool, url: str = WIKI_URL, nr_range: Tuple[int, int] = NR_RANGE,
+                   known: Optional[Iterable[str]] = EG_RUBRIKEN, source: str = "api",
+                   cache_dir: Optional[str] = None, tag: str = "") -> Dict[int, str]:
+    """
+    Rubriken aus der Wikipedia-Liste. source="api": MediaWiki action=parse mit Revisions-Cache in
+    `cache_dir`; liefert die API nichts, wird auf die gerenderte Seite zurückgefallen.
+    """
+    if source == "api":
+        stats: Dict[str, Any] = {}
+        try:
+            rubrik_for_nr = wiki_api.fetch_rubriken(pool, url, nr_range, known, cache_dir, stats)
+        except Exception as e:
+            print(f"{tag}WARNUNG: Wikipedia-API nicht nutzbar ({e}), lade die ganze Seite.", file=sys.stderr)
+        else:
+            if rubrik_for_nr:
+                how = ("unverändert, aus Cache" if stats["cached"]
+                       else f"{stats['sections']} Abschnitte, {stats['bytes'] // 1024} KB Wikitext")
+                print(f"{tag}   Revision {stats['revid']} ({how}): {len(rubrik_for_nr)} Nummern", file=sys.stderr)
+                return rubrik_for_nr
+            print(f"{tag}WARNUNG: Wikipedia-API ohne Rubriken, lade die ganze Seite.", file=sys.stderr)
+    return fetch_rubrik_for_nr(pool, url, nr_range, known)
+
+def fetch_titles_and_song_links(pool: FetchPool, url: str = LIEDERDB_URL,
+                                nr_range: Tuple[int, int] = NR_RANGE) -> List[Tuple[int, str, str]]:
     """
     Robust: extrahiert Nummer+Titel direkt aus dem HTML mit Regex:
       <Zahl><whitespace><a href="/song/ID">Titel</a>
     Dadurch funktionieren auch Seiten, bei denen die Nummer nicht sauber im selben Tag steht.
     """
     try:
-        resp = requests.get(LIEDERDB_URL, headers=HEADERS, timeout=60, verify=verify)
+        resp = pool.get(url)
         resp.raise_for_status()
     except Exception as e:
         print(f"FEHLER: Liederdatenbank nicht ladbar: {e}", file=sys.stderr)
@@ -119,12 +185,13 @@ def fetch_titles_and_song_links(verify: VerifyType) -> List[Tuple[int, str, str]
     html = resp.text
     # Matches: [Zahl] optional Spaces/Entities, dann der Song-Link
     # Beispiele im Quelltext: '1&nbsp;<a href="/song/123">Macht hoch…</a>'
-    pattern = re.compile(r'(\d{1,3})\s*(?:&nbsp;|\s)*<a\s+href="(/song/\d+)">([^<]+)</a>', re.IGNORECASE)
+    lo, hi = nr_range
+    pattern = re.compile(rf'(\d{{1,{len(str(hi))}}})\s*(?:&nbsp;|\s)*<a\s+href="(/song/\d+)">([^<]+)</a>', re.IGNORECASE)
     items = []
     for nr_str, href, title in pattern.findall(html):
         nr = int(nr_str)
-        if 1 <= nr <= 535:
-            link = requests.compat.urljoin(BASE_SONG_URL, href)
+        if lo <= nr <= hi:
+            link = urljoin(url, href)
             # Titel aufräumen
             title = re.sub(r"\s{2,}", " ", title).strip()
             items.append((nr, title, link))
@@ -140,21 +207,394 @@ def fetch_titles_and_song_links(verify: VerifyType) -> List[Tuple[int, str, str]
     print(f"DEBUG: Gefundene Titel gesamt (vor Dedup): {len(items)}, einzigartig: {len(unique)}", file=sys.stderr)
     return unique
 
-def fetch_authors_for_song(song_url: str, verify: VerifyType) -> Tuple[str,str]:
-    """Gibt (Komponist, Dichter) zurück – aus Feldern 'Melodie:' und 'Text:' der Einzelseite."""
+def load_rubrik_csv(path: str, nr_range: Tuple[int, int] = NR_RANGE) -> Dict[int, str]:
+    """Rubrik-Mapping aus einer CSV mit den Spalten Nr;Rubrik (für Bücher ohne Wikipedia-Liste)."""
+    lo, hi = nr_range
+    rubrik_for_nr: Dict[int, str] = {}
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f, delimiter=';'):
+            nr = (row.get("Nr") or "").strip()
+            if nr.isdigit() and lo <= int(nr) <= hi and row.get("Rubrik"):
+                rubrik_for_nr.setdefault(int(nr), row["Rubrik"].strip())
+    return rubrik_for_nr
+
+def extract_raw_authors(page_text: str, parser: str = "stream") -> Tuple[str,str]:
+    """Unbereinigte Felder (Melodie, Text) aus dem HTML einer Liedseite."""
+    return PARSERS[parser](page_text)
+
+def parse_authors(page_text: str, parser: str = "stream") -> Tuple[str,str]:
+    """(Komponist, Dichter) aus dem HTML einer Liedseite."""
+    komponist, dichter = extract_raw_authors(page_text, parser)
+    return clean_name(komponist), clean_name(dichter)
+
+def try_fetch_song_page(song_url: str, pool: FetchPool) -> Optional[str]:
+    """HTML einer Liedseite oder None bei Netz-/HTTP-Fehlern."""
     try:
-        resp = requests.get(song_url, headers=HEADERS, timeout=60, verify=verify)
+        resp = pool.get(song_url)
         resp.raise_for_status()
     except Exception:
-        return "", ""
-    page_text = resp.text
-    # Erst reines Textbild erzeugen
-    text = BeautifulSoup(page_text, "html.parser").get_text("\n", strip=True)
-    mt = re.search(r"Text\s*:\s*([^\n\r]+)", text, re.IGNORECASE)
-    mm = re.search(r"Melodie\s*:\s*([^\n\r]+)", text, re.IGNORECASE)
-    dichter  = clean_name(mt.group(1)) if mt else ""
-    komponist = clean_name(mm.group(1)) if mm else ""
-    return komponist, dichter
+        return None
+    return resp.text
+
+def try_fetch_authors_for_song(song_url: str, pool: FetchPool, parser: str = "stream") -> Optional[Tuple[str,str]]:
+    """Wie fetch_authors_for_song, aber None bei Netz-/HTTP-Fehlern (damit --resume sie erneut abruft)."""
+    page_text = try_fetch_song_page(song_url, pool)
+    return parse_authors(page_text, parser) if page_text is not None else None
+
+def fetch_authors_for_song(song_url: str, pool: FetchPool, parser: str = "stream") -> Tuple[str,str]:
+    """Gibt (Komponist, Dichter) zurück – aus Feldern 'Melodie:' und 'Text:' der Einzelseite."""
+    return try_fetch_authors_for_song(song_url, pool, parser) or ("", "")
+
+# ---------- Streaming-Stufen ----------
+# Jede Stufe ist ein Generator, der nur so viel vom Vorgänger zieht, wie der Nachfolger abnimmt.
+# Der Detailabruf läuft über FetchPool.map_ordered: höchstens 2*workers Lieder sind gleichzeitig
+# unterwegs bzw. warten fertig im Umordnungspuffer, bis alle Vorgänger ausgegeben sind.
+
+Record = Dict[str, Any]
+
+class SongMemo:
+    """
+    Geteilte Ergebnisse je Liedlink für den Stapelbetrieb: dieselbe Liedseite steht oft in
+    mehreren Liederbüchern. Der erste Abruf rechnet, gleichzeitige Anfragen warten auf sein
+    Ergebnis (Single-Flight). Gemerkt werden nur die kleinen Rohfelder, nicht die Seiten;
+    Fehlschläge (None) werden nicht gemerkt, damit ein anderes Buch es erneut versuchen kann.
+    """
+
+    def __init__(self):
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+
+    def get(self, key: str, compute: Callable[[], Optional[Tuple[str, str]]]) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            fut = self._futures.get(key)
+            owner = fut is None
+            if owner:
+                fut = self._futures[key] = Future()
+            else:
+                self.hits += 1
+        if not owner:
+            return fut.result()
+        try:
+            result = compute()
+        except BaseException as e:
+            with self._lock:
+                self._futures.pop(key, None)
+            fut.set_exception(e)
+            raise
+        if result is None:
+            with self._lock:
+                self._futures.pop(key, None)
+        fut.set_result(result)
+        return result
+
+def detail_stage(pool: FetchPool, songs: Iterable[Tuple[int, str, str]],
+                 journal: CheckpointJournal, parser: str = "stream",
+                 memo: Optional[SongMemo] = None, window: Optional[int] = None) -> Iterator[Record]:
+    """Lädt Liedseiten parallel und liefert Rohdatensätze in Eingabereihenfolge (Journal-Treffer ohne Abruf)."""
+    metrics = pool.metrics
+    def load(link):
+        page_text = try_fetch_song_page(link, pool)
+        if page_text is None:
+            return None
+        t0 = time.perf_counter()
+        raw = extract_raw_authors(page_text, parser)
+        if metrics is not None:
+            metrics.observe("item_seconds", time.perf_counter() - t0, stage="parse", parser=parser)
+        return raw
+    def work(song):
+        nr, title, link = song
+        if journal.is_done(nr):
+            return dict(journal.records[nr], journaled=True)
+        raw = memo.get(link, lambda: load(link)) if memo is not None else load(link)
+        komponist, dichter = raw or ("", "")
+        return {"nr": nr, "title": title, "link": link,
+                "komponist": komponist, "dichter": dichter, "ok": raw is not None}
+    for _song, rec in pool.map_ordered(work, songs, window=window):
+        yield rec
+
+def final_retry_stage(pool: FetchPool, songs: Sequence[Tuple[int, str, str]], failed_nrs: Iterable[str],
+                      journal: CheckpointJournal, parser: str = "stream",
+                      window: Optional[int] = None) -> Dict[int, Record]:
+    """
+    Nachlauf: die im Hauptdurchlauf fehlgeschlagenen Lieder noch einmal abrufen (ein offener
+    Schutzschalter wird dabei abgewartet). Gibt {nr: bereinigter Datensatz} der nachgeholten zurück;
+    alle Versuche landen im Journal.
+    """
+    wanted = set(failed_nrs)
+    todo = [song for song in songs if str(song[0]) in wanted]
+    return {rec["nr"]: rec for rec in clean_stage(detail_stage(pool, todo, journal, parser, window=window), journal)
+            if rec["ok"]}
+
+def patch_csv(out_path: str, recovered: Dict[int, Record],
+              name_map: Optional[Dict[str, str]] = None) -> List[Dict[str, str]]:
+    """Trägt nachgeholte Komponisten/Dichter in die fertige CSV ein (atomar ersetzt). Gibt alle Zeilen zurück."""
+    name_map = name_map or {}
+    with open(out_path, encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.reader(f, delimiter=';'))
+    for row in rows[1:]:
+        rec = recovered.get(int(row[0])) if row and row[0].isdigit() else None
+        if rec is not None:
+            row[3] = name_map.get(rec["komponist"], rec["komponist"])
+            row[4] = name_map.get(rec["dichter"], rec["dichter"])
+    tmp = out_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8-sig", newline="") as f:
+        csv.writer(f, delimiter=';').writerows(rows)
+    os.replace(tmp, out_path)
+    return [dict(zip(rows[0], row)) for row in rows[1:]]
+
+def write_failed_report(path: str, songs: Sequence[Tuple[int, str, str]], failed_nrs: Iterable[str],
+                        errors: Dict[str, str]) -> int:
+    """Nr;Titel;URL;Fehler der endgültig fehlgeschlagenen Lieder; ohne Fehlschläge wird eine alte Liste entfernt."""
+    wanted = set(failed_nrs)
+    rows = [[nr, title, link, errors.get(link, "")] for nr, title, link in songs if str(nr) in wanted]
+    if not rows:
+        if os.path.exists(path):
+            os.remove(path)
+        return 0
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.writer(f, delimiter=';')
+        w.writerow(["Nr", "Titel", "URL", "Fehler"])
+        w.writerows(rows)
+    return len(rows)
+
+def clean_stage(records: Iterable[Record], journal: CheckpointJournal,
+                metrics: Optional[Metrics] = None, **labels) -> Iterator[Record]:
+    """Entfernt Jahreszahlen aus den Namen und schreibt neue Datensätze ins Journal."""
+    for rec in records:
+        if rec.pop("journaled", False):
+            outcome = "journal"
+        else:
+            rec["komponist"] = clean_name(rec["komponist"])
+            rec["dichter"] = clean_name(rec["dichter"])
+            journal.append(rec)
+            outcome = "failed" if not rec["ok"] else ("empty" if not (rec["komponist"] or rec["dichter"]) else "ok")
+        if metrics is not None:
+            metrics.inc("songs_total", outcome=outcome, **labels)
+        yield rec
+
+def write_stage(records: Iterable[Record], out_path: str, rubrik_for_nr: Dict[int, str],
+                commit_rows: int = 100, metrics: Optional[Metrics] = None,
+                exporter: Optional[CatalogExporter] = None,
+                name_map: Optional[Dict[str, str]] = None,
+                failed_nrs: Optional[List[str]] = None, commit_ms: float = 1000) -> Tuple[int, int]:
+    """
+    Schreibt Datensätze fortlaufend in die CSV (und den Export). Gibt (Zeilen, fehlgeschlagene Abrufe) zurück.
+    Gesichert wird gruppenweise alle `commit_rows` Zeilen bzw. `commit_ms` Millisekunden (durable_csv.py).
+    `name_map`: {Variante: Kanonisch} für Komponist/Dichter (das Journal behält die Originalnamen).
+    `failed_nrs` sammelt die Nummern fehlgeschlagener Abrufe.
+    """
+    name_map = name_map or {}
+    rows = failed = 0
+    with DurableCSVWriter(out_path, mode="w", encoding="utf-8-sig", every=commit_rows, interval_ms=commit_ms,
+                          metrics=metrics) as w:
+        w.writerow(CSV_COLUMNS)
+        for rec in records:
+            t0 = time.perf_counter()
+            nr = rec["nr"]
+            komponist, dichter = rec["komponist"], rec["dichter"]
+            row = [nr, rec["title"], rubrik_for_nr.get(nr, ""),
+                   name_map.get(komponist, komponist), name_map.get(dichter, dichter)]
+            w.writerow(row)
+            if exporter is not None:
+                exporter.add(dict(zip(CSV_COLUMNS, row)))
+            rows += 1
+            if not rec.get("ok"):
+                failed += 1
+                if failed_nrs is not None:
+                    failed_nrs.append(str(nr))
+            if metrics is not None:
+                metrics.observe("item_seconds", time.perf_counter() - t0, stage="write")
+    return rows, failed
+
+# ---------- Liederbücher / Stapelbetrieb ----------
+
+@dataclass
+class Songbook:
+    """Ein Liederbuch: Liederdatenbank-Seite, Nummernbereich, Rubrikquelle, Ziel-CSV."""
+    name: str
+    songbook_url: str
+    nr_range: Tuple[int, int]
+    out: str
+    rubrik_url: Optional[str] = None          # Wikipedia-Liste
+    rubrik_csv: Optional[str] = None          # alternativ CSV Nr;Rubrik
+    rubrik_known: Optional[FrozenSet[str]] = EG_RUBRIKEN  # None = jede Überschrift
+    rubrik_source: str = "api"                # api (action=parse) oder html (ganze Seite)
+    journal: Optional[str] = None
+    diff_against: Optional[str] = None        # vorheriger Stand für die Delta-Dateien
+
+def load_manifest(path: str) -> List[Songbook]:
+    """
+    Liest ein Liederbuch-Manifest (JSON). Relative Pfade gelten relativ zum Manifest.
+
+        {"songbooks": [
+          {"name": "EG", "songbook": 8984, "range": [1, 535], "out": "EG_1-535.csv",
+           "rubriken": {"wiki": "https://de.wikipedia.org/wiki/...", "headings": "eg", "source": "api"}},
+          {"name": "GL", "songbook": "https://liederdatenbank.strehle.de/songbook/<ID>",
+           "range": [1, 999], "out": "GL.csv", "rubriken": {"csv": "gl_rubriken.csv"}},
+          {"name": "Regional", "songbook": <ID>, "range": [536, 699], "out": "EG_regional.csv"}
+        ]}
+
+    songbook: Liederdatenbank-ID oder volle URL. rubriken.headings: "eg" (Standard, EG-Rubriken),
+    "all" (jede Überschrift) oder eine Liste. rubriken.source: "api" (Standard) oder "html".
+    Ohne "rubriken" bleibt die Spalte leer.
+    Optional je Eintrag: "journal", "diff_against" (vorherige CSV, siehe --diff-against).
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    resolve = lambda p: p if p is None or os.path.isabs(p) else os.path.join(base, p)
+    books: List[Songbook] = []
+    for i, entry in enumerate(data.get("songbooks") or []):
+        try:
+            name = str(entry["name"])
+            ref = entry["songbook"]
+            lo, hi = (int(x) for x in entry["range"])
+            out = entry.get("out") or f"{name}.csv"
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"{path}: Eintrag {i + 1} unvollständig ({e!r})") from None
+        url = ref if isinstance(ref, str) and "://" in ref else SONGBOOK_URL.format(ref)
+        rub = entry.get("rubriken") or {}
+        headings = rub.get("headings", "eg")
+        known = EG_RUBRIKEN if headings == "eg" else None if headings == "all" else frozenset(headings)
+        source = rub.get("source", "api")
+        if source not in RUBRIK_SOURCES:
+            raise ValueError(f"{path}: Eintrag {i + 1}: rubriken.source muss {' oder '.join(RUBRIK_SOURCES)} sein")
+        books.append(Songbook(name=name, songbook_url=url, nr_range=(lo, hi), out=resolve(out),
+                              rubrik_url=rub.get("wiki"), rubrik_csv=resolve(rub.get("csv")),
+                              rubrik_known=known, rubrik_source=source, journal=resolve(entry.get("journal")),
+                              diff_against=resolve(entry.get("diff_against"))))
+    if not books:
+        raise ValueError(f"{path}: keine Liederbücher unter 'songbooks'")
+    names = [b.name for b in books]
+    if len(set(names)) != len(names) or len({b.out for b in books}) != len(books):
+        raise ValueError(f"{path}: Namen und Ziel-CSVs müssen eindeutig sein")
+    return books
+
+def run_songbook(book: Songbook, pool: FetchPool, metrics: Metrics, parser: str = "stream",
+                 resume: bool = False, fsync_every: int = 25, export: Sequence[str] = (),
+                 name_map: Optional[Dict[str, str]] = None, memo: Optional[SongMemo] = None,
+                 window: Optional[int] = None, position: Optional[int] = None,
+                 final_retry: bool = True, cache_dir: Optional[str] = None,
+                 commit_rows: int = 100, commit_ms: float = 1000) -> Dict[str, int]:
+    """Rubriken -> Liste -> Details -> CSV für ein Liederbuch. Im Stapelbetrieb tragen Meldungen,
+    Stufen und Zähler den Buchnamen. `cache_dir`: Ablage des Wikipedia-Revisions-Caches."""
+    tag = f"[{book.name}] " if book.name else ""
+    stage = (lambda s: f"{book.name}.{s}") if book.name else (lambda s: s)
+    labels = {"songbook": book.name} if book.name else {}
+    lo, hi = book.nr_range
+    journal = CheckpointJournal(book.journal or f"{book.out}.journal", batch=fsync_every, resume=resume)
+    # Vorher einlesen: meist ist der vorherige Stand genau die Datei, die gleich überschrieben wird
+    previous = read_rows(book.diff_against)[1] if book.diff_against else None
+    base = os.path.splitext(book.out)[0]
+    new_exporter = lambda: CatalogExporter(base, f"eg:{book.name}" if book.name else "eg", CSV_COLUMNS, export)
+    exporter = new_exporter() if export else None
+    ok = False
+    try:
+        with metrics.stage(stage("rubriken")):
+            if book.rubrik_csv:
+                print(f"{tag}1/3: Rubriken (CSV) …", file=sys.stderr)
+                rubrik_for_nr = load_rubrik_csv(book.rubrik_csv, book.nr_range)
+            elif book.rubrik_url:
+                print(f"{tag}1/3: Rubriken (Wikipedia, {book.rubrik_source}) …", file=sys.stderr)
+                rubrik_for_nr = fetch_rubriken(pool, book.rubrik_url, book.nr_range, book.rubrik_known,
+                                               book.rubrik_source, cache_dir, tag)
+            else:
+                print(f"{tag}1/3: Rubriken – keine Quelle, Spalte bleibt leer.", file=sys.stderr)
+                rubrik_for_nr = {}
+
+        print(f"{tag}2/3: Titel+Links (Liederdatenbank) …", file=sys.stderr)
+        with metrics.stage(stage("liste")):
+            songs = fetch_titles_and_song_links(pool, book.songbook_url, book.nr_range)
+        short = len(songs) < 0.75 * (hi - lo + 1)
+        if short:
+            print(f"{tag}WARNUNG: Deutlich weniger als erwartet – Netz/HTML prüfen. CSV wird dennoch erstellt.",
+                  file=sys.stderr)
+
+        if resume:
+            done = sum(1 for song in songs if journal.is_done(song[0]))
+            print(f"{tag}Resume: {done} Lieder aus dem Journal, {len(songs) - done} offen.", file=sys.stderr)
+
+        print(f"{tag}3/3: Melodie/Text je Lied ({pool.workers} parallel, {pool.limiter.rate:g}/s je Host) …",
+              file=sys.stderr)
+        failed_nrs: List[str] = []
+        with metrics.stage(stage("details")):
+            records = tqdm(detail_stage(pool, songs, journal, parser, memo=memo, window=window),
+                           total=len(songs), desc=f"{book.name or 'Abruf'} Autoren", position=position)
+            rows, failed = write_stage(clean_stage(records, journal, metrics, **labels), book.out, rubrik_for_nr,
+                                       metrics=metrics, exporter=exporter, name_map=name_map,
+                                       failed_nrs=failed_nrs, commit_rows=commit_rows, commit_ms=commit_ms)
+        if failed_nrs and final_retry:
+            print(f"{tag}Nachlauf: {len(failed_nrs)} fehlgeschlagene Lieder erneut …", file=sys.stderr)
+            with metrics.stage(stage("nachlauf")):
+                recovered = final_retry_stage(pool, songs, failed_nrs, journal, parser, window)
+                if recovered:
+                    rows_now = patch_csv(book.out, recovered, name_map)
+                    if exporter is not None:  # Export enthält noch die leeren Zeilen -> neu aufbauen
+                        exporter.close(commit=False)
+                        exporter = new_exporter()
+                        for row in rows_now:
+                            exporter.add(row)
+            failed_nrs = [nr for nr in failed_nrs if int(nr) not in recovered]
+            failed = len(failed_nrs)
+            metrics.inc("songs_recovered_total", len(recovered), **labels)
+            print(f"{tag}Nachlauf: {len(recovered)} nachgeholt, {failed} weiterhin fehlgeschlagen.", file=sys.stderr)
+        failed_report = f"{base}.failed.csv"
+        write_failed_report(failed_report, songs, failed_nrs, pool.failed_urls())
+        if previous is not None:
+            with metrics.stage(stage("diff")):
+                # Fehlgeschlagene Abrufe gelten als unverändert, bei zu kurzer Liste wird nichts als entfernt gemeldet
+                delta = diff_rows(previous, read_rows(book.out)[1], nr_key, CSV_COLUMNS,
+                                  skip=failed_nrs, partial=short)
+                diff_paths = write_delta(delta, base)
+            for kind in ("added", "changed", "removed"):
+                metrics.inc("diff_rows_total", len(getattr(delta, kind)), kind=kind, **labels)
+        ok = True
+    finally:
+        journal.close()
+        if exporter is not None:
+            exporter.close(commit=ok)
+
+    print(f"{tag}Fertig: {book.out} ({rows} Zeilen).", file=sys.stderr)
+    if exporter is not None:
+        print(f"{tag}Export: {', '.join(exporter.paths.values())}", file=sys.stderr)
+    if previous is not None:
+        print(f"{tag}Diff gegen {book.diff_against}: {delta.summary()}", file=sys.stderr)
+        print(f"{tag}Delta: {', '.join(diff_paths.values())}", file=sys.stderr)
+    if failed:
+        print(f"{tag}HINWEIS: {failed} Lieder nicht abrufbar ({failed_report}) – mit --resume erneut versuchen.",
+              file=sys.stderr)
+    if not rubrik_for_nr and (book.rubrik_url or book.rubrik_csv):
+        print(f"{tag}HINWEIS: Rubriken leer (Wikipedia-SSL?). Du kannst sie später nachtragen.", file=sys.stderr)
+    return {"rows": rows, "failed": failed, "rubriken": len(rubrik_for_nr)}
+
+def run_batch(books: List[Songbook], pool: FetchPool, metrics: Metrics, workers: int, parallel: bool = True,
+              **kwargs) -> Dict[str, Optional[Dict[str, int]]]:
+    """
+    Alle Liederbücher über einen Pool. Bis zu `workers` Bücher laufen gleichzeitig; jedes bekommt
+    einen festen Anteil der Abruf-Worker (window), damit ein langsames Buch die anderen nicht
+    ausbremst. Liedseiten, die in mehreren Büchern stehen, werden nur einmal abgerufen (SongMemo).
+    Fehler eines Buchs brechen die übrigen nicht ab; dessen Ergebnis ist dann None.
+    """
+    memo = SongMemo()
+    concurrent = min(len(books), workers) if parallel else 1
+    window = max(1, workers // concurrent)
+    results: Dict[str, Optional[Dict[str, int]]] = {}
+    def one(i_book):
+        i, book = i_book
+        try:
+            return run_songbook(book, pool, metrics, memo=memo, window=window, position=i, **kwargs)
+        except Exception as e:
+            print(f"[{book.name}] FEHLER: {type(e).__name__}: {e}", file=sys.stderr)
+            metrics.inc("songbooks_failed_total", songbook=book.name)
+            return None
+    with ThreadPoolExecutor(max_workers=concurrent, thread_name_prefix="book") as ex:
+        for book, res in zip(books, ex.map(one, enumerate(books))):
+            results[book.name] = res
+    metrics.inc("song_memo_hits_total", memo.hits)
+    print(f"Stapel: {len(books)} Liederbücher, {memo.hits} Liedseiten aus anderen Büchern übernommen.",
+          file=sys.stderr)
+    return results
 
 def main():
     ap = argparse.ArgumentParser(description="Erzeuge EG_1-535.csv (Nr;Titel;Rubrik;Komponist;Dichter)")
@@ -162,36 +602,123 @@ def main():
                     help="TLS-Prüfung: system|certifi|none (unsicher)")
     ap.add_argument("--verify-path", default=None,
                     help="Pfad zu eigenem CA-Bundle (PEM). Überschreibt --verify.")
-    ap.add_argument("--delay", type=float, default=0.15, help="Wartezeit zwischen Song-Abrufen (s)")
+    ap.add_argument("--workers", type=int, default=4, help="Parallele Song-Abrufe (Threads)")
+    ap.add_argument("--rate", type=float, default=5.0, help="Max. Anfragen pro Sekunde und Host (0 = unbegrenzt)")
+    ap.add_argument("--delay", type=float, default=None,
+                    help="Veraltet: feste Wartezeit (s); entspricht --workers 1 --rate 1/delay")
+    ap.add_argument("--wiki-url", default=WIKI_URL, help=argparse.SUPPRESS)
+    ap.add_argument("--liederdb-url", default=LIEDERDB_URL, help=argparse.SUPPRESS)
+    ap.add_argument("--rubrik-source", choices=RUBRIK_SOURCES, default="api",
+                    help="Rubriken über die MediaWiki-API (Standard, je Revision zwischengespeichert) "
+                         "oder aus der ganzen gerenderten Seite")
+    ap.add_argument("--out", default=OUT_CSV, help="Ziel-CSV")
+    ap.add_argument("--cache-dir", default=".http_cache", help="Verzeichnis des Antwort-Caches ('' = aus)")
+    ap.add_argument("--max-age", type=float, default=6 * 3600,
+                    help="Cache-Einträge jünger als so viele Sekunden ohne Netzabruf nutzen (sonst revalidieren)")
+    ap.add_argument("--max-cache-mb", type=float, default=200, help="Größenobergrenze des Caches (MB, LRU)")
+    ap.add_argument("--offline", action="store_true", help="Nur aus dem Cache lesen, kein Netzzugriff")
+    ap.add_argument("--journal", default=None, help="Checkpoint-Journal (Standard: <out>.journal)")
+    ap.add_argument("--resume", action="store_true",
+                    help="Erledigte Nummern aus dem Journal übernehmen, nur fehlende/fehlgeschlagene abrufen")
+    ap.add_argument("--parser", choices=sorted(PARSERS), default="stream",
+                    help="Extraktion der Liedseiten: stream (früher Abbruch) oder bs4 (voller Baum)")
+    ap.add_argument("--metrics", default=None,
+                    help="Präfix für <präfix>.metrics.jsonl und <präfix>.prom (Standard: Ziel-CSV ohne Endung, '' = aus)")
+    ap.add_argument("--profile", default=None, metavar="DIR",
+                    help="cProfile- und tracemalloc-Dumps je Stufe in dieses Verzeichnis schreiben")
+    ap.add_argument("--fsync-every", type=int, default=25, help="Journal alle N Lieder auf Platte sichern")
+    ap.add_argument("--commit-rows", type=int, default=100,
+                    help="CSV alle N Zeilen per fsync sichern (Gruppen-Commit mit Journal <out>.wal)")
+    ap.add_argument("--commit-ms", type=float, default=1000, help="... bzw. spätestens nach so vielen Millisekunden")
+    ap.add_argument("--retries", type=int, default=3,
+                    help="Wiederholungen je Abruf bei 429/5xx/Timeout (Backoff mit Jitter, Retry-After; 0 = aus)")
+    ap.add_argument("--no-final-retry", action="store_true",
+                    help="Fehlgeschlagene Lieder am Ende nicht noch einmal abrufen")
+    ap.add_argument("--export", action="append", choices=EXPORT_FORMATS, default=[],
+                    help="Zusätzlich <out>.sqlite bzw. <out>.jsonl mit Abgleich-Schlüsseln schreiben (mehrfach möglich)")
+    ap.add_argument("--name-map", default=None, metavar="CSV",
+                    help="Namensvarianten aus dieser Zuordnungsdatei (name_dedupe.py) vereinheitlichen")
+    ap.add_argument("--manifest", default=None, metavar="JSON",
+                    help="Stapelbetrieb: Liederbücher aus diesem Manifest (ersetzt --out/--journal/--*-url)")
+    ap.add_argument("--diff-against", default=None, metavar="CSV",
+                    help="Mit diesem vorherigen Stand vergleichen (Schlüssel Nr) und neue/geänderte/entfernte "
+                         "Zeilen als <out>.added/.changed/.removed.csv schreiben")
     args = ap.parse_args()
+    if args.delay is not None:
+        args.workers = 1
+        args.rate = 1.0 / args.delay if args.delay > 0 else 0.0
 
     verify = resolve_verify(args)
     print(f"TLS-Verify: {verify if isinstance(verify,str) else ('aus' if verify is False else 'system')}", file=sys.stderr)
 
-    print("1/3: Rubriken (Wikipedia) …", file=sys.stderr)
-    rubrik_for_nr = fetch_rubrik_for_nr(verify)
-
-    print("2/3: Titel+Links (Liederdatenbank) …", file=sys.stderr)
-    songs = fetch_titles_and_song_links(verify)
-    if len(songs) < 400:
-        print("WARNUNG: Deutlich weniger als erwartet – Netz/HTML prüfen. CSV wird dennoch erstellt.", file=sys.stderr)
-
-    print("3/3: Melodie/Text je Lied …", file=sys.stderr)
-    rows = []
-    for nr, title, link in tqdm(songs, desc="Abruf Autoren"):
-        komponist, dichter = fetch_authors_for_song(link, verify)
-        rubrik = rubrik_for_nr.get(nr, "")
-        rows.append([nr, title, rubrik, komponist, dichter])
-        time.sleep(max(0.0, args.delay))
+    if args.manifest and args.diff_against:
+        ap.error("--diff-against gilt nur ohne --manifest; im Manifest je Liederbuch \"diff_against\" angeben")
+    if args.diff_against and not os.path.isfile(args.diff_against):
+        ap.error(f"--diff-against: {args.diff_against} nicht gefunden")
+    if args.manifest:
+        try:
+            books = load_manifest(args.manifest)
+        except (OSError, ValueError) as e:
+            ap.error(f"Manifest nicht lesbar: {e}")
+        default_prefix = os.path.splitext(args.manifest)[0]
+    else:
+        books = [Songbook(name="", songbook_url=args.liederdb_url, nr_range=NR_RANGE, out=args.out,
+                          rubrik_url=args.wiki_url, rubrik_source=args.rubrik_source, journal=args.journal,
+                          diff_against=args.diff_against)]
+        default_prefix = os.path.splitext(args.out)[0]
 
-    with open(OUT_CSV, "w", encoding="utf-8-sig", newline="") as f:
-        w = csv.writer(f, delimiter=';')
-        w.writerow(["Nr", "Titel", "Rubrik", "Komponist", "Dichter"])
-        w.writerows(rows)
+    cache = None
+    if args.cache_dir:
+        cache = ResponseCache(args.cache_dir, max_age=args.max_age,
+                              max_bytes=int(args.max_cache_mb * 1024 * 1024), offline=args.offline)
+    elif args.offline:
+        ap.error("--offline benötigt --cache-dir")
+    prefix = default_prefix if args.metrics is None else args.metrics
+    metrics = Metrics("eg", jsonl_path=f"{prefix}.metrics.jsonl" if prefix else None,
+                      prom_path=f"{prefix}.prom" if prefix else None, profile_dir=args.profile)
+    pool = FetchPool(workers=args.workers, rate=args.rate, verify=verify, headers=HEADERS, cache=cache, metrics=metrics,
+                     retry=RetryPolicy(attempts=args.retries + 1))
+    opts = dict(parser=args.parser, resume=args.resume, fsync_every=args.fsync_every, export=args.export,
+                name_map=load_name_map(args.name_map) if args.name_map else None,
+                final_retry=not args.no_final_retry, cache_dir=args.cache_dir or None,
+                commit_rows=args.commit_rows, commit_ms=args.commit_ms)
+    try:
+        if args.manifest:
+            # cProfile kann nur einen Thread zur Zeit profilieren -> mit --profile Bücher nacheinander
+            results = run_batch(books, pool, metrics, args.workers, parallel=not args.profile, **opts)
+        else:
+            run_songbook(books[0], pool, metrics, **opts)
+    finally:
+        failed_urls = pool.failed_urls()
+        pool.close()
+        metrics.inc("failed_urls_total", len(failed_urls))
+        retries = metrics.total("http_retries_total")
+        if retries:
+            print(f"Wiederholungen: {retries:g}, Schutzschalter geöffnet: {metrics.total('circuit_open_total'):g}",
+                  file=sys.stderr)
+        fsyncs = metrics.total("csv_fsync_total")
+        if fsyncs:
+            print(f"CSV-Gruppen-Commit: {fsyncs:g} fsync ({metrics.total('csv_fsync_seconds_total'):.3f} s)",
+                  file=sys.stderr)
+        if failed_urls:
+            print(f"Fehlgeschlagene URLs ({len(failed_urls)}):", file=sys.stderr)
+            for url, error in sorted(failed_urls.items())[:10]:
+                print(f"  {url}: {error}", file=sys.stderr)
+            if len(failed_urls) > 10:
+                print(f"  … und {len(failed_urls) - 10} weitere", file=sys.stderr)
+        if cache is not None:
+            print(cache.summary(), file=sys.stderr)
+            for result, n in cache.stats.items():
+                metrics.inc("http_cache_total", n, result=result)
+        metrics.close()
+        print(metrics.short_summary(), file=sys.stderr)
 
-    print(f"Fertig: {OUT_CSV} ({len(rows)} Zeilen).", file=sys.stderr)
-    if not rubrik_for_nr:
-        print("HINWEIS: Rubriken leer (Wikipedia-SSL?). Du kannst sie später nachtragen.", file=sys.stderr)
+    if args.manifest:
+        for name, res in results.items():
+            line = f"{res['rows']} Zeilen, {res['failed']} fehlgeschlagen, {res['rubriken']} Rubriken" if res else "FEHLER"
+            print(f"  {name}: {line}", file=sys.stderr)
+        if any(res is None for res in results.values()):
+            sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Offline-Abgleich zweier Scraper-CSVs: leere Komponist/Dichter/Tonart-Felder der Ziel-CSV
+(z. B. EG_1-535.csv) aus der Quell-CSV (z. B. christmas_carols.csv) ergänzen.
+
+- Hash-Join über den Titelschlüssel wie im Backend (namenorm.match_key); mit --by-composer
+  zählen nur Quellzeilen desselben (oder ohne) Komponisten (namenorm.composer_match_key).
+- Ohne exakten Treffer: Trigramm-Index über die Quelltitel (name_dedupe.NgramIndex), bester
+  Treffer ab --fuzzy-threshold (Standard 85, wie stringSimilarity im Backend).
+- Gefüllt wird nur, wenn alle Treffer denselben Wert liefern. Mehrdeutige Treffer und
+  abweichende vorhandene Werte landen im Bericht, ebenso jede Ergänzung.
+- Fehlt der Ziel-CSV eine Spalte (EG hat keine Tonart), wird sie hinten angehängt.
+
+    python enrich.py EG_1-535.csv christmas_carols.csv --out EG_angereichert.csv --report abgleich.csv
+"""
+import argparse, csv, time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from csv_diff import Row, read_rows
+from namenorm import clean_name, composer_match_key, match_key, normalize
+from name_dedupe import NgramIndex, DEFAULT_THRESHOLD
+
+FILL_COLUMNS = ("Komponist", "Dichter", "Tonart")
+PERSON_COLUMNS = {"Komponist", "Dichter"}
+REPORT_COLUMNS = ["Zeile", "Titel", "Feld", "Art", "Ziel", "Quelle", "Treffer", "Quellzeilen"]
+
+
+def _value_key(column: str, value: str) -> str:
+    """Vergleichsschlüssel: Personen wie im Backend (ohne Jahreszahlen), sonst nur Groß/klein und Leerraum."""
+    if column in PERSON_COLUMNS:
+        return composer_match_key(clean_name(value)).strip()
+    return normalize(value).lower()
+
+
+class Enricher:
+    def __init__(self, source_rows: Sequence[Row], fill: Sequence[str] = FILL_COLUMNS, by_composer: bool = False,
+                 fuzzy_threshold: Optional[float] = DEFAULT_THRESHOLD):
+        self.source = source_rows
+        self.fill = list(fill)
+        self.by_composer = by_composer
+        self.by_title: Dict[str, List[int]] = defaultdict(list)
+        for i, row in enumerate(source_rows):
+            key = match_key(row.get("Titel") or "")
+            if key:
+                self.by_title[key].append(i)
+        self.fuzzy = NgramIndex(list(self.by_title), fuzzy_threshold) if fuzzy_threshold else None
+        self.report: List[List] = []
+        self.stats: Counter = Counter()
+
+    def _composer_filter(self, row: Row, candidates: List[int]) -> List[int]:
+        composer = _value_key("Komponist", row.get("Komponist") or "")
+        if not (self.by_composer and composer):
+            return candidates
+        return [i for i in candidates
+                if _value_key("Komponist", self.source[i].get("Komponist") or "") in ("", composer)]
+
+    def match(self, row: Row) -> Tuple[List[int], str]:
+        """Quellzeilen zur Zielzeile und Art des Treffers ('exakt', 'ähnlich NN' oder '')."""
+        key = match_key(row.get("Titel") or "")
+        if not key:
+            return [], ""
+        candidates = self._composer_filter(row, self.by_title.get(key, []))
+        if candidates:
+            return candidates, "exakt"
+        if self.fuzzy is None:
+            return [], ""
+        hits = self.fuzzy.search(key)
+        for score in sorted({s for _j, s in hits}, reverse=True):  # bester Ähnlichkeitswert mit Treffern
+            candidates = self._composer_filter(
+                row, [i for j, s in hits if s == score for i in self.by_title[self.fuzzy.keys[j]]])
+            if candidates:
+                return candidates, f"ähnlich {score}"
+        return [], ""
+
+    def enrich_row(self, line: int, row: Row) -> Row:
+        candidates, how = self.match(row)
+        if not candidates:
+            self.stats["ohne_treffer"] += 1
+            return row
+        self.stats["exakt" if how == "exakt" else "ähnlich"] += 1
+        out = dict(row)
+        refs = ",".join(str(i + 2) for i in candidates)  # Zeilennummer in der Quell-CSV (mit Kopfzeile)
+        for col in self.fill:
+            values: Dict[str, str] = {}
+            for i in candidates:
+                value = (self.source[i].get(col) or "").strip()
+                if value:
+                    values.setdefault(_value_key(col, value), value)
+            if not values:
+                continue
+            current = (row.get(col) or "").strip()
+            if not current:
+                if len(values) == 1:
+                    out[col] = next(iter(values.values()))
+                    self._note(line, row, col, "ergänzt", "", out[col], how, refs)
+                else:
+                    self._note(line, row, col, "mehrdeutig", "", " | ".join(values.values()), how, refs)
+            elif _value_key(col, current) not in values:
+                self._note(line, row, col, "abweichend", current, " | ".join(values.values()), how, refs)
+        return out
+
+    def _note(self, line, row, col, kind, target, source, how, refs):
+        self.stats[kind] += 1
+        if kind == "ergänzt":
+            self.stats[f"ergänzt_{col}"] += 1
+        self.report.append([line, row.get("Titel", ""), col, kind, target, source, how, refs])
+
+
+def enrich_csv(target_path: str, source_path: str, out_path: str, report_path: Optional[str] = None,
+               by_composer: bool = False, fuzzy_threshold: Optional[float] = DEFAULT_THRESHOLD) -> Counter:
+    target_cols, target_rows = read_rows(target_path)
+    source_cols, source_rows = read_rows(source_path)
+    fill = [c for c in FILL_COLUMNS if c in source_cols]
+    columns = target_cols + [c for c in fill if c not in target_cols]
+    enricher = Enricher(source_rows, fill, by_composer, fuzzy_threshold)
+    with open(out_path, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=columns, delimiter=';', extrasaction="ignore")
+        w.writeheader()
+        for n, row in enumerate(target_rows, 2):
+            w.writerow(enricher.enrich_row(n, row))
+    if report_path:
+        with open(report_path, "w", encoding="utf-8-sig", newline="") as f:
+            w = csv.writer(f, delimiter=';')
+            w.writerow(REPORT_COLUMNS)
+            w.writerows(enricher.report)
+    enricher.stats["zeilen"] = len(target_rows)
+    enricher.stats["quellzeilen"] = len(source_rows)
+    return enricher.stats
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Leere Komponist/Dichter/Tonart-Felder aus einer zweiten Scraper-CSV ergänzen")
+    ap.add_argument("target", help="Ziel-CSV (z. B. EG_1-535.csv)")
+    ap.add_argument("source", help="Quell-CSV (z. B. christmas_carols.csv)")
+    ap.add_argument("--out", default=None, help="Angereicherte CSV (Standard: <ziel>_angereichert.csv)")
+    ap.add_argument("--report", default=None, help="Bericht (Standard: <ziel>_abgleich.csv)")
+    ap.add_argument("--by-composer", action="store_true",
+                    help="Nur Treffer mit gleichem Komponisten (sofern beide einen haben)")
+    ap.add_argument("--fuzzy-threshold", type=float, default=DEFAULT_THRESHOLD,
+                    help="Mindestähnlichkeit der Titel ohne exakten Treffer (0 = nur exakt)")
+    args = ap.parse_args()
+    base = args.target[:-4] if args.target.lower().endswith(".csv") else args.target
+    out = args.out or f"{base}_angereichert.csv"
+    report = args.report or f"{base}_abgleich.csv"
+
+    t0 = time.perf_counter()
+    stats = enrich_csv(args.target, args.source, out, report, args.by_composer, args.fuzzy_threshold or None)
+    filled = ", ".join(f"{c} {stats[f'ergänzt_{c}']}" for c in FILL_COLUMNS if stats[f"ergänzt_{c}"]) or "keine"
+    print(f"{stats['zeilen']} Zeilen gegen {stats['quellzeilen']} Quellzeilen ({time.perf_counter() - t0:.2f}s): "
+          f"{stats['exakt']} exakt, {stats['ähnlich']} ähnlich, {stats['ohne_treffer']} ohne Treffer")
+    print(f"Ergänzt: {filled}; mehrdeutig {stats['mehrdeutig']}, abweichend {stats['abweichend']}")
+    print(f"-> {out}, Bericht {report}")
+
+
+if __name__ == "__main__":
+    main()
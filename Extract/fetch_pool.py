@@ -0,0 +1,399 @@
+# -*- coding: utf-8 -*-
+"""
+Gemeinsamer HTTP-Abrufpool für die Extract-Scraper.
+
+- Eine requests.Session mit Keep-Alive-Verbindungspool (kein neuer TCP/TLS-Handshake je Abruf).
+- Token-Bucket je Host statt fester Wartezeit zwischen den Abrufen.
+- map_ordered(): begrenzte Parallelität über einen Thread-Pool, Ergebnisse in Eingabereihenfolge;
+  auch aus mehreren Threads gleichzeitig nutzbar (z. B. mehrere Liederbücher in einem Lauf).
+- Optional ein persistenter Antwort-Cache (http_cache.ResponseCache); Cache-Treffer
+  verbrauchen kein Token des Host-Limits.
+- Optional Messung je Anfrage (metrics.Metrics): Verbindungsaufbau, Time-to-first-Byte,
+  Download, Wartezeit im Host-Limit, Status.
+- Vorübergehende Fehler (Timeout, Verbindungsabbruch, 408/429/5xx) werden nach RetryPolicy
+  wiederholt: exponentielles Backoff mit Deckel und vollem Jitter, Retry-After hat Vorrang.
+- CircuitBreaker je Host: bei Überlast (429/503) oder mehreren Host-Fehlern in Folge (Timeout,
+  Verbindungsabbruch, 408/502/504) pausieren alle Abrufe an diesen Host, danach tastet sich eine einzelne Probe-Anfrage vor; zugleich wird
+  die Host-Rate halbiert und erholt sich mit jedem Erfolg schrittweise.
+- Was auch nach allen Versuchen scheitert, steht in failed_urls() (URL -> letzter Fehler).
+
+Beispiel:
+    pool = FetchPool(workers=8, rate=5.0, verify=None, headers=HEADERS)
+    for item, result in pool.map_ordered(lambda s: fetch(s, pool), songs):
+        ...
+    pool.close()
+"""
+import random, threading, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple, TypeVar, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+VerifyType = Union[bool, str, None]
+
+
+class TokenBucket:
+    """Einfacher Token-Bucket: `rate` Tokens pro Sekunde, höchstens `capacity` auf Vorrat."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = float(rate)
+        self.base_rate = self.rate  # Ausgangsrate; rate sinkt bei Überlast (throttle) und erholt sich (recover)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Blockiert, bis ein Token verfügbar ist. Gibt die Wartezeit (s) zurück."""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                pause = (1.0 - self._tokens) / self.rate
+            time.sleep(pause)
+            waited += pause
+
+    def throttle(self, factor: float = 0.5, floor: float = 0.2):
+        """Rate multiplikativ senken (nicht unter `floor`/s); unbegrenzte Buckets bleiben unbegrenzt."""
+        with self._lock:
+            if self.base_rate > 0:
+                self.rate = max(min(floor, self.base_rate), self.rate * factor)
+
+    def recover(self, step: float = 0.1):
+        """Rate additiv um `step`*Ausgangsrate anheben, höchstens bis zur Ausgangsrate."""
+        with self._lock:
+            if self.rate < self.base_rate:
+                self.rate = min(self.base_rate, self.rate + step * self.base_rate)
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After als Sekunden (Zahl oder HTTP-Datum), None wenn fehlend/unlesbar."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+class RetryPolicy:
+    """
+    Welche Fehler wiederholt werden und wie lange davor gewartet wird. `attempts` zählt den ersten
+    Versuch mit (1 = keine Wiederholung). Wartezeit: Retry-After des Servers (höchstens
+    `max_retry_after`), sonst zufällig in [0, min(cap, base * 2**n)] ("full jitter").
+    """
+    RETRY_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+    STRESS_STATUS = frozenset({408, 429, 502, 503, 504})  # Host/Gateway-Probleme; 500 betrifft meist nur die URL
+    OVERLOAD_STATUS = frozenset({429, 503})                # Schutzschalter sofort öffnen
+
+    def __init__(self, attempts: int = 4, base: float = 0.5, cap: float = 30.0, max_retry_after: float = 120.0,
+                 rng: Optional[random.Random] = None):
+        self.attempts = max(1, int(attempts))
+        self.base = base
+        self.cap = cap
+        self.max_retry_after = max_retry_after
+        self._rng = rng or random.Random()
+
+    def retryable_error(self, exc: Exception) -> bool:
+        # SSLError ist eine ConnectionError, wird durch Wiederholen aber nicht besser
+        if isinstance(exc, requests.exceptions.SSLError):
+            return False
+        return isinstance(exc, (requests.ConnectionError, requests.Timeout,
+                                requests.exceptions.ChunkedEncodingError))
+
+    def retryable_status(self, status: int) -> bool:
+        return status in self.RETRY_STATUS
+
+    def delay(self, retry: int, retry_after: Optional[float] = None) -> float:
+        """Wartezeit vor der `retry`-ten Wiederholung (ab 0)."""
+        if retry_after is not None:
+            return min(retry_after, self.max_retry_after)
+        return self._rng.uniform(0, min(self.cap, self.base * 2 ** retry))
+
+
+class CircuitBreaker:
+    """
+    Schutzschalter je Host. Geschlossen laufen Anfragen normal. Nach `threshold` Fehlschlägen in
+    Folge oder sofort bei Überlast (429/503) öffnet er für Retry-After bzw. `cooldown` Sekunden:
+    wait() blockiert dann alle Abrufe an diesen Host. Danach darf genau eine Probe-Anfrage los
+    (halb offen); Erfolg schließt, Fehlschlag öffnet erneut (ohne Retry-After mit verdoppelter Pause).
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 5.0, max_cooldown: float = 120.0,
+                 probe_timeout: float = 90.0):
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.probe_timeout = probe_timeout  # Probe ohne Rückmeldung (z. B. Abbruch) gilt danach als verloren
+        self.opened = 0
+        self._hosts: Dict[str, Dict[str, float]] = {}
+        self._cond = threading.Condition()
+
+    def _state(self, host: str) -> Dict[str, float]:
+        st = self._hosts.get(host)
+        if st is None:
+            st = self._hosts[host] = {"failures": 0, "open_until": 0.0, "pause": self.cooldown, "probe": 0.0}
+        return st
+
+    def wait(self, host: str) -> float:
+        """Blockiert, solange der Schalter für `host` offen ist oder eine Probe läuft. Gibt die Wartezeit zurück."""
+        t0 = time.monotonic()
+        with self._cond:
+            while True:
+                st = self._state(host)
+                now = time.monotonic()
+                if st["open_until"] > now:
+                    self._cond.wait(st["open_until"] - now)
+                elif st["probe"] and now - st["probe"] < self.probe_timeout:
+                    self._cond.wait(1.0)    # halb offen: Probe läuft, Ergebnis abwarten
+                else:
+                    if st["open_until"] or st["probe"]:  # Pause vorbei -> diese Anfrage ist die Probe
+                        st["open_until"] = 0.0
+                        st["probe"] = now
+                    return time.monotonic() - t0
+
+    def success(self, host: str):
+        with self._cond:
+            st = self._state(host)
+            st["failures"] = 0
+            if st["probe"]:
+                st["probe"] = 0.0
+                st["pause"] = self.cooldown
+                self._cond.notify_all()
+
+    def failure(self, host: str, retry_after: Optional[float] = None, overload: bool = False) -> bool:
+        """Fehlschlag melden. True, wenn der Schalter dadurch (wieder) öffnet."""
+        with self._cond:
+            st = self._state(host)
+            st["failures"] += 1
+            if not (overload or st["probe"] or st["failures"] >= self.threshold):
+                return False
+            if retry_after is not None:     # der Server sagt, wie lange
+                pause = min(retry_after, self.max_cooldown)
+            elif st["probe"]:               # Probe gescheitert -> längere Pause
+                pause = st["pause"] = min(self.max_cooldown, st["pause"] * 2)
+            else:
+                pause = st["pause"]
+            st["open_until"] = max(st["open_until"], time.monotonic() + pause)
+            st["probe"] = 0.0
+            self.opened += 1
+            self._cond.notify_all()
+            return True
+
+    def is_open(self, host: str) -> bool:
+        with self._cond:
+            return self._state(host)["open_until"] > time.monotonic()
+
+
+class HostRateLimiter:
+    """Ein TokenBucket je Host (netloc), lazy angelegt."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = host_of(url)
+        with self._lock:
+            b = self._buckets.get(host)
+            if b is None:
+                b = self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return b
+
+    def acquire(self, url: str) -> float:
+        return self.bucket(url).acquire()
+
+
+class FetchPool:
+    """Geteilte Session + Host-Ratenbegrenzung + Wiederholung/Schutzschalter + begrenzter Thread-Pool."""
+
+    def __init__(self, workers: int = 4, rate: float = 5.0, burst: Optional[float] = None,
+                 verify: VerifyType = None, headers: Optional[Dict[str, str]] = None,
+                 timeout: float = 60, cache=None, metrics=None,
+                 retry: Optional[RetryPolicy] = None, breaker: Optional[CircuitBreaker] = None):
+        self.workers = max(1, int(workers))
+        self.timeout = timeout
+        self.verify = verify
+        self.limiter = HostRateLimiter(rate, burst)
+        self.cache = cache
+        self.metrics = metrics
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self._failed: Dict[str, str] = {}
+        self._failed_lock = threading.Lock()
+        self.session = requests.Session()
+        if metrics is not None:
+            from metrics import timed_adapter
+            adapter = timed_adapter(metrics, pool_connections=4, pool_maxsize=self.workers)
+        else:
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if headers:
+            self.session.headers.update(headers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def get(self, url: str, max_age: Optional[float] = None, **kwargs) -> requests.Response:
+        """GET über den Cache (falls aktiv), sonst direkt über die geteilte Session. `max_age`: siehe ResponseCache.get."""
+        if self.cache is not None:
+            return self.cache.get(self._get, url, max_age=max_age, **kwargs)
+        return self._get(url, **kwargs)
+
+    def failed_urls(self) -> Dict[str, str]:
+        """URLs, deren letzter Abruf auch nach allen Wiederholungen scheiterte -> letzter Fehler."""
+        with self._failed_lock:
+            return dict(self._failed)
+
+    def _note_result(self, url: str, error: Optional[str]):
+        with self._failed_lock:
+            if error is None:
+                self._failed.pop(url, None)
+            else:
+                self._failed[url] = error
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """Netzabruf mit Wiederholung vorübergehender Fehler; Schutzschalter und Host-Rate je Versuch."""
+        host = host_of(url)
+        m = self.metrics
+        retry = 0
+        while True:
+            paused = self.breaker.wait(host)
+            if paused and m is not None:
+                m.observe("circuit_wait_seconds", paused, host=host)
+            resp, retry_after, overload = None, None, False
+            try:
+                resp = self._attempt(url, **kwargs)
+            except requests.RequestException as e:
+                error = f"{type(e).__name__}: {e}"
+                if not self.retry.retryable_error(e):
+                    self.breaker.success(host)  # z. B. TLS/URL-Fehler: kein Zeichen von Überlast
+                    self._note_result(url, error)
+                    raise
+                exc, reason = e, type(e).__name__
+            else:
+                status = resp.status_code
+                if not self.retry.retryable_status(status):
+                    self.breaker.success(host)
+                    self.limiter.bucket(url).recover()
+                    self._note_result(url, None if status < 400 else f"HTTP {status}")
+                    return resp
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                overload = status in self.retry.OVERLOAD_STATUS
+                error = reason = f"HTTP {status}"
+            if resp is not None and resp.status_code not in self.retry.STRESS_STATUS:
+                self.breaker.success(host)  # Host antwortet, nur diese URL scheitert
+            elif self.breaker.failure(host, retry_after, overload):
+                self.limiter.bucket(url).throttle()
+                if m is not None:
+                    m.inc("circuit_open_total", host=host)
+            if retry + 1 >= self.retry.attempts:
+                self._note_result(url, error)
+                if resp is None:
+                    raise exc
+                return resp
+            delay = self.retry.delay(retry, retry_after)
+            retry += 1
+            if m is not None:
+                m.inc("http_retries_total", host=host, reason=reason)
+                m.event("retry", url=url, reason=reason, attempt=retry, delay_s=round(delay, 3))
+            time.sleep(delay)
+
+    def _attempt(self, url: str, **kwargs) -> requests.Response:
+        """Ein Netzabruf über die geteilte Session, nach Freigabe durch den Host-Token-Bucket."""
+        waited = self.limiter.acquire(url)
+        kwargs.setdefault("timeout", self.timeout)
+        if self.verify is not None:
+            kwargs.setdefault("verify", self.verify)
+        if self.metrics is None:
+            return self.session.get(url, **kwargs)
+
+        m = self.metrics
+        host = host_of(url)
+        t0 = time.perf_counter()
+        try:
+            resp = self.session.get(url, stream=True, **kwargs)
+            ttfb = time.perf_counter() - t0
+            size = len(resp.content)
+        except Exception as e:
+            m.inc("http_requests_total", host=host, outcome="error")
+            m.event("request", url=url, error=f"{type(e).__name__}: {e}", wait_s=round(waited, 4))
+            raise
+        total = time.perf_counter() - t0
+        m.inc("http_requests_total", host=host, outcome=f"{resp.status_code // 100}xx")
+        m.inc("http_response_bytes_total", size, host=host)
+        m.observe("http_request_seconds", ttfb, host=host, phase="ttfb")
+        m.observe("http_request_seconds", total - ttfb, host=host, phase="download")
+        if waited:
+            m.observe("rate_limit_wait_seconds", waited, host=host)
+        m.event("request", url=url, status=resp.status_code, bytes=size, wait_s=round(waited, 4),
+                ttfb_s=round(ttfb, 4), download_s=round(total - ttfb, 4))
+        return resp
+
+    def map_ordered(self, fn: Callable[[T], R], items: Iterable[T],
+                    window: Optional[int] = None) -> Iterator[Tuple[T, R]]:
+        """
+        Wendet `fn` parallel (max. `workers` gleichzeitig) auf `items` an und liefert
+        (item, ergebnis) streng in Eingabereihenfolge. Es sind höchstens `window` (Standard
+        2*workers) Aufgaben gleichzeitig unterwegs, damit lange Eingaben nicht komplett vorab
+        eingeplant werden. Mehrere Aufrufe aus verschiedenen Threads teilen sich die Worker;
+        ein kleineres `window` je Aufruf verhindert, dass einer alle Worker belegt.
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="fetch")
+            executor = self._executor
+        window = max(1, window or 2 * self.workers)
+        pending = deque()
+        it = iter(items)
+        for item in it:
+            pending.append((item, executor.submit(fn, item)))
+            if len(pending) >= window:
+                break
+        while pending:
+            item, fut = pending.popleft()
+            result = fut.result()
+            nxt = next(it, _END)
+            if nxt is not _END:
+                pending.append((nxt, executor.submit(fn, nxt)))
+            yield item, result
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_END = object()
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Persistenter HTTP-Antwort-Cache für die Extract-Scraper.
+
+- Inhalte werden inhaltsadressiert abgelegt (objects/<sha256[:2]>/<sha256>), ein SQLite-Index
+  ordnet URL -> Inhalt, ETag, Last-Modified, Abrufzeit und letzten Zugriff zu.
+- Frische Einträge (jünger als max_age) kosten keinen Netzabruf; ältere werden mit
+  If-None-Match/If-Modified-Since revalidiert (304 = Body aus dem Cache).
+- Größenobergrenze mit LRU-Verdrängung nach letztem Zugriff.
+- Offline-Modus: nur Cache, fehlende URLs lösen CacheMiss aus.
+
+Wird über FetchPool(cache=ResponseCache(...)) genutzt; die Scraper merken davon nichts.
+"""
+import hashlib, os, sqlite3, threading, time
+from typing import Dict, Optional
+
+import requests
+
+
+class CacheMiss(requests.RequestException):
+    """URL ist im Offline-Modus nicht im Cache."""
+
+
+class ResponseCache:
+    def __init__(self, cache_dir: str, max_age: float = 6 * 3600, max_bytes: int = 200 * 1024 * 1024,
+                 offline: bool = False):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.stats: Dict[str, int] = {"hit": 0, "revalidated": 0, "miss": 0, "offline_miss": 0, "evicted": 0}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(cache_dir, "objects"), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"), check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY, body_hash TEXT NOT NULL, etag TEXT, last_modified TEXT,
+                content_type TEXT, encoding TEXT, fetched_at REAL NOT NULL, accessed_at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS blobs (hash TEXT PRIMARY KEY, size INTEGER NOT NULL);
+            CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed_at);
+        """)
+        self._db.commit()
+
+    # ---------- Ablage ----------
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, "objects", digest[:2], digest)
+
+    def _read_blob(self, digest: str) -> Optional[bytes]:
+        try:
+            with open(self._blob_path(digest), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_blob(self, body: bytes) -> str:
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(body)
+            os.replace(tmp, path)
+        self._db.execute("INSERT OR IGNORE INTO blobs(hash, size) VALUES (?, ?)", (digest, len(body)))
+        return digest
+
+    def _drop_blob_if_unused(self, digest: str):
+        if self._db.execute("SELECT 1 FROM entries WHERE body_hash = ? LIMIT 1", (digest,)).fetchone():
+            return
+        self._db.execute("DELETE FROM blobs WHERE hash = ?", (digest,))
+        try:
+            os.remove(self._blob_path(digest))
+        except OSError:
+            pass
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        while total > self.max_bytes:
+            row = self._db.execute("SELECT url, body_hash FROM entries ORDER BY accessed_at LIMIT 1").fetchone()
+            if not row:
+                break
+            self._db.execute("DELETE FROM entries WHERE url = ?", (row[0],))
+            self._drop_blob_if_unused(row[1])
+            self.stats["evicted"] += 1
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    # ---------- Antwort-Objekte ----------
+    @staticmethod
+    def _response(url: str, body: bytes, content_type: Optional[str], encoding: Optional[str]) -> requests.Response:
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.url = url
+        resp._content = body
+        resp.encoding = encoding
+        if content_type:
+            resp.headers["Content-Type"] = content_type
+        resp.headers["X-Cache"] = "HIT"
+        return resp
+
+    # ---------- Öffentliche API ----------
+    def get(self, session_get, url: str, max_age: Optional[float] = None, **kwargs) -> requests.Response:
+        """
+        Holt `url` über den Cache. `session_get(url, **kwargs)` führt den eigentlichen Abruf aus
+        (z. B. FetchPool._get mit Ratenbegrenzung) und wird nur bei Bedarf aufgerufen. `max_age`
+        ersetzt für diesen Abruf die Frischedauer; 0 = immer (bedingt) beim Server nachfragen.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body_hash, etag, last_modified, content_type, encoding, fetched_at FROM entries WHERE url = ?",
+                (url,)).fetchone()
+            body = self._read_blob(row[0]) if row else None
+            if row and body is not None and (self.offline or now - row[5] <= max_age):
+                self._db.execute("UPDATE entries SET accessed_at = ? WHERE url = ?", (now, url))
+                self._db.commit()
+                self.stats["hit"] += 1
+                return self._response(url, body, row[3], row[4])
+        if self.offline:
+            with self._lock:
+                self.stats["offline_miss"] += 1
+            raise CacheMiss(f"Offline: nicht im Cache: {url}")
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if row and body is not None:
+            if row[1]:
+                headers["If-None-Match"] = row[1]
+            if row[2]:
+                headers["If-Modified-Since"] = row[2]
+        resp = session_get(url, headers=headers, **kwargs)
+
+        with self._lock:
+            if resp.status_code == 304 and row and body is not None:
+                self._db.execute("UPDATE entries SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+                self._db.commit()
+                self.stats["revalidated"] += 1
+                return self._response(url, body, row[3], row[4])
+            self.stats["miss"] += 1
+            if resp.status_code != 200:
+                return resp
+            digest = self._write_blob(resp.content)
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries(url, body_hash, etag, last_modified, content_type, encoding,"
+                " fetched_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, digest, resp.headers.get("ETag"), resp.headers.get("Last-Modified"),
+                 resp.headers.get("Content-Type"), resp.encoding, now, now))
+            if row and row[0] != digest:
+                self._drop_blob_if_unused(row[0])
+            self._evict()
+            self._db.commit()
+        return resp
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"Cache: {s['hit']} Treffer, {s['revalidated']} revalidiert (304), {s['miss']} Abrufe"
+                + (f", {s['offline_miss']} offline fehlend" if s["offline_miss"] else "")
+                + (f", {s['evicted']} verdrängt" if s["evicted"] else ""))
+
+    def close(self):
+        """Erzwingt die Größenobergrenze (z. B. nach gesenktem Limit) und schließt den Index."""
+        with self._lock:
+            self._evict()
+            self._db.commit()
+            self._db.close()
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Leichtgewichtige Laufzeit-Messung für die Extract-Scraper.
+
+- Zähler und Histogramme mit Labels (thread-sicher).
+- stage(): Wand- und CPU-Zeit je Stufe; mit profile_dir zusätzlich cProfile-Dump und
+  tracemalloc-Snapshot je Stufe (cProfile erfasst nur den Thread, der die Stufe ausführt).
+- event(): Einzelereignisse (z. B. jede HTTP-Anfrage) als JSON-Lines.
+- close(): Zusammenfassung ans JSON-Lines-Protokoll anhängen und Prometheus-Textfile schreiben
+  (für den node_exporter-Textfile-Collector).
+- timed_adapter(): requests-Adapter, der die TCP/TLS-Verbindungsaufbauzeit misst.
+
+    m = Metrics("eg", jsonl_path="run.metrics.jsonl", prom_path="run.prom")
+    with m.stage("liste"):
+        ...
+    m.inc("songs_total", outcome="ok")
+    m.observe("parse_seconds", 0.002)
+    m.close()
+"""
+import cProfile, json, os, threading, time, tracemalloc
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # letzter Eintrag = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"buckets": dict(zip([*map(str, self.buckets), "+Inf"], self.counts)),
+                "sum": round(self.sum, 6), "count": self.count}
+
+
+class Metrics:
+    def __init__(self, scraper: str, jsonl_path: Optional[str] = None, prom_path: Optional[str] = None,
+                 profile_dir: Optional[str] = None):
+        self.scraper = scraper
+        self.prom_path = prom_path
+        self.profile_dir = profile_dir
+        self.counters: Dict[Tuple[str, LabelKey], float] = {}
+        self.histograms: Dict[Tuple[str, LabelKey], Histogram] = {}
+        self.stages: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._jsonl = open(jsonl_path, "w", encoding="utf-8") if jsonl_path else None
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+    # ---------- Erfassung ----------
+    def inc(self, name: str, n: float = 1, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = Histogram()
+            hist.observe(value)
+
+    def event(self, kind: str, **fields):
+        if self._jsonl is None:
+            return
+        line = json.dumps({"ts": round(time.time(), 3), "type": kind, **fields}, ensure_ascii=False)
+        with self._lock:
+            self._jsonl.write(line + "\n")
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        profiler = cProfile.Profile() if self.profile_dir else None
+        if profiler:
+            profiler.enable()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            entry = {"stage": name, "wall_s": round(time.perf_counter() - wall, 4),
+                     "cpu_s": round(time.process_time() - cpu, 4)}
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(os.path.join(self.profile_dir, f"{self.scraper}-{name}.prof"))
+                tracemalloc.take_snapshot().dump(os.path.join(self.profile_dir, f"{self.scraper}-{name}.tracemalloc"))
+                entry["tracemalloc_peak_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+                tracemalloc.reset_peak()
+            with self._lock:
+                self.stages.append(entry)
+            self.event("stage", **entry)
+
+    # ---------- Zusammenführen (Worker-Prozesse) ----------
+    def snapshot(self) -> Dict[str, Any]:
+        """Zähler, Histogramme und Stufen als picklebare Daten, z. B. zum Versand aus einem Worker-Prozess."""
+        with self._lock:
+            return {"counters": dict(self.counters),
+                    "histograms": {key: (h.buckets, list(h.counts), h.sum, h.count) for key, h in self.histograms.items()},
+                    "stages": list(self.stages)}
+
+    def merge(self, snapshot: Dict[str, Any], **labels):
+        """snapshot() eines anderen Metrics-Objekts übernehmen; `labels` (z. B. shard=...) kommen überall hinzu."""
+        def relabel(key: LabelKey) -> LabelKey:
+            return _labels({**dict(key), **labels})
+        stages = [{**s, **{k: str(v) for k, v in labels.items()}} for s in snapshot["stages"]]
+        with self._lock:
+            for (name, key), value in snapshot["counters"].items():
+                target = (name, relabel(key))
+                self.counters[target] = self.counters.get(target, 0) + value
+            for (name, key), (buckets, counts, total, count) in snapshot["histograms"].items():
+                target = (name, relabel(key))
+                hist = self.histograms.get(target)
+                if hist is None:
+                    hist = self.histograms[target] = Histogram(tuple(buckets))
+                hist.counts = [a + b for a, b in zip(hist.counts, counts)]
+                hist.sum += total
+                hist.count += count
+            self.stages.extend(stages)
+        for entry in stages:
+            self.event("stage", **entry)
+
+    # ---------- Ausgabe ----------
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "scraper": self.scraper,
+                "stages": list(self.stages),
+                "counters": [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self.counters.items())],
+                "histograms": [{"name": n, "labels": dict(l), **h.as_dict()}
+                               for (n, l), h in sorted(self.histograms.items())],
+            }
+
+    def total(self, name: str) -> float:
+        """Summe eines Zählers über alle Labels."""
+        with self._lock:
+            return sum(v for (n, _l), v in self.counters.items() if n == name)
+
+    def short_summary(self) -> str:
+        """Eine Zeile mit Stufenzeiten, z. B. für das Konsolenende; wiederholte Stufen summiert."""
+        totals: Dict[str, List[float]] = {}
+        for s in self.stages:
+            totals.setdefault(s["stage"], []).append(s["wall_s"])
+        return "Stufen: " + ", ".join(f"{name} {sum(w):.2f}s" + (f" ({len(w)}×)" if len(w) > 1 else "")
+                                      for name, w in totals.items())
+
+    def _prom_labels(self, labels: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        items = (("scraper", self.scraper),) + labels + extra
+        return "{" + ",".join(f'{k}="{_prom_escape(v)}"' for k, v in items) + "}"
+
+    def prometheus_text(self) -> str:
+        lines: List[str] = []
+        typed = set()
+        with self._lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                metric = f"scraper_{name}"
+                if metric not in typed:
+                    lines.append(f"# TYPE {metric} counter")
+                    typed.add(metric)
+                lines.append(f"{metric}{self._prom_labels(labels)} {value:g}")
+            for (name, labels), hist in sorted(self.histograms.items()):
+                metric = f"scraper_{name}"
+                if metric not in typed:
+                    lines.append(f"# TYPE {metric} histogram")
+                    typed.add(metric)
+                cumulative = 0
+                for bound, count in zip([*map(str, hist.buckets), "+Inf"], hist.counts):
+                    cumulative += count
+                    lines.append(f"{metric}_bucket{self._prom_labels(labels, (('le', bound),))} {cumulative}")
+                lines.append(f"{metric}_sum{self._prom_labels(labels)} {hist.sum:.6f}")
+                lines.append(f"{metric}_count{self._prom_labels(labels)} {hist.count}")
+            if self.stages:
+                # Je Stufe eine Serie: mehrfach durchlaufene Stufen (Crawl: eine je Produkt) werden summiert
+                seconds: Dict[str, float] = {}
+                runs: Dict[str, int] = {}
+                for s in self.stages:
+                    seconds[s["stage"]] = seconds.get(s["stage"], 0.0) + s["wall_s"]
+                    runs[s["stage"]] = runs.get(s["stage"], 0) + 1
+                lines.append("# TYPE scraper_stage_seconds gauge")
+                for stage, value in seconds.items():
+                    lines.append(f"scraper_stage_seconds{self._prom_labels((('stage', stage),))} {value:.6f}")
+                lines.append("# TYPE scraper_stage_runs gauge")
+                for stage, count in runs.items():
+                    lines.append(f"scraper_stage_runs{self._prom_labels((('stage', stage),))} {count}")
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        if self._jsonl is not None:
+            self.event("summary", **self.summary())
+            self._jsonl.close()
+            self._jsonl = None
+        if self.prom_path:
+            tmp = f"{self.prom_path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(self.prometheus_text())
+            os.replace(tmp, self.prom_path)  # atomar, damit der Collector nie eine halbe Datei liest
+
+
+def _prom_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def timed_adapter(metrics: Metrics, **adapter_kwargs):
+    """HTTPAdapter, dessen Verbindungen die Aufbauzeit (TCP + TLS) als http_connect_seconds messen."""
+    from requests.adapters import HTTPAdapter
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    class _TimedConnect:
+        def connect(self):
+            t0 = time.perf_counter()
+            try:
+                super().connect()
+            finally:
+                metrics.observe("http_connect_seconds", time.perf_counter() - t0, host=self.host)
+                metrics.inc("http_connections_total", host=self.host)
+
+    class TimedHTTPConnection(_TimedConnect, HTTPConnection):
+        pass
+
+    class TimedHTTPSConnection(_TimedConnect, HTTPSConnection):
+        pass
+
+    class TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = TimedHTTPConnection
+
+    class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = TimedHTTPSConnection
+
+    class TimedAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = {"http": TimedHTTPConnectionPool,
+                                                       "https": TimedHTTPSConnectionPool}
+
+    return TimedAdapter(**adapter_kwargs)
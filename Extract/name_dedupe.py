@@ -0,0 +1,449 @@
+# -*- coding: utf-8 -*-
+"""
+Dublettenbereinigung der Komponisten-/Dichternamen über alle Scraper-CSVs vor dem Import.
+
+Das Backend erkennt Schreibvarianten erst spät (groupDoublettes/findDoubletteCandidates in
+matching.utils.js) und vergleicht dabei jedes Paar per Levenshtein – quadratisch. Hier:
+
+1. Schlüssel je Name wie im Backend (namenorm.composer_match_key) nach Entfernen der Jahreszahlen
+   (namenorm.clean_name): "Bach, Johann Sebastian (1685–1750)" und "Johann Sebastian Bach" fallen
+   sofort zusammen.
+2. Ähnliche Schlüssel über einen Trigramm-Index mit Präfixfilter: jedes Trigramm (mit Position
+   unter Gleichen) ist ein Token, Tokens nach globaler Seltenheit sortiert. Zwei Schlüssel mit
+   Abstand d teilen mindestens tau = max(len)+2-3d Trigramme; daraus folgt, dass sie sich schon in
+   den ersten seltenen Tokens treffen müssen. Nur diese Präfixe werden indiziert und abgefragt;
+   mit um PREFIX_EXTRA-1 verlängerten Präfixen müssen es sogar PREFIX_EXTRA gemeinsame Tokens sein,
+   was die meisten Kandidaten schon beim Zählen (in C, collections.Counter) aussortiert. Unter
+   ~67 % Ähnlichkeit gilt die Schranke nicht mehr, dann werden alle Paare im Längenfenster geprüft.
+3. Kandidaten mit zu wenig gemeinsamen Trigrammen (Mengenschnitt) fallen ohne Levenshtein heraus,
+   der Rest wird mit begrenztem Levenshtein geprüft – gleiche Schwelle wie isComposerMatch
+   (stringSimilarity >= 85, gerundet wie Math.round).
+4. Union-Find bildet Gruppen; kanonisch ist die häufigste Schreibweise. Varianten, die dem
+   kanonischen Namen selbst nicht ähnlich genug sind (Kettenbildung), bleiben unverändert.
+
+Ergebnis ist eine Zuordnungsdatei Variante;Kanonisch;Aehnlichkeit;Anzahl, die eg_scraper.py und
+carus.py mit --name-map anwenden:
+
+    python name_dedupe.py EG_1-535.csv christmas_carols.csv --out namen.map.csv
+    python name_dedupe.py --bench --sizes 10000 100000     # Index gegen alle Paare
+"""
+import argparse, csv, math, random, time
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from namenorm import clean_name, composer_match_key
+
+DEFAULT_THRESHOLD = 85  # wie isComposerMatch() in matching.utils.js
+LOW_THRESHOLD = 40  # --bench prüft zusätzlich diese Schwelle (unter ~67 % ohne Präfixfilter)
+LOW_SAMPLE = 150    # Stichprobe dafür
+PREFIX_EXTRA = 3  # ℓ-Präfix: so viele gemeinsame Präfix-Tokens werden verlangt (1 = klassischer Präfixfilter)
+NAME_COLUMNS = ("Komponist", "Dichter")
+MAP_COLUMNS = ["Variante", "Kanonisch", "Aehnlichkeit", "Anzahl"]
+
+Pair = Tuple[int, int]
+
+
+# ---------- Ähnlichkeit wie stringSimilarity() ----------
+
+def name_key(raw: str) -> str:
+    return composer_match_key(clean_name(raw)).strip()
+
+
+def max_distance(length: int, threshold: float = DEFAULT_THRESHOLD) -> float:
+    """Größter Levenshtein-Abstand, bei dem Math.round(100*(L-d)/L) >= threshold noch gilt."""
+    return length * (100.5 - threshold) / 100
+
+
+def similarity(length: int, distance: int) -> int:
+    return math.floor(100 * (length - distance) / length + 0.5) if length else 0
+
+
+def levenshtein(a: str, b: str, limit: Optional[int] = None) -> int:
+    """
+    Levenshtein-Abstand. Mit `limit` nur das Band |i-j| <= limit (Ukkonen) und Abbruch, sobald
+    der Abstand sicher größer ist; dann Rückgabe limit+1.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    n, m = len(a), len(b)
+    if limit is None:
+        prev = list(range(m + 1))
+        for i, ca in enumerate(a, 1):
+            cur = [i]
+            for j, cb in enumerate(b, 1):
+                cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+            prev = cur
+        return prev[-1]
+    over = limit + 1
+    if n - m > limit:
+        return over
+    prev = [j if j <= limit else over for j in range(m + 1)]
+    for i in range(1, n + 1):
+        ca = a[i - 1]
+        lo, hi = max(1, i - limit), min(m, i + limit)
+        cur = [over] * (m + 1)
+        left = cur[0] = i if i <= limit else over
+        best = left if lo == 1 else over
+        for j in range(lo, hi + 1):
+            v = prev[j - 1] + (ca != b[j - 1])
+            if prev[j] + 1 < v:
+                v = prev[j] + 1
+            if left + 1 < v:
+                v = left + 1
+            if v > over:
+                v = over
+            cur[j] = left = v
+            if v < best:
+                best = v
+        if best > limit:
+            return over
+        prev = cur
+    return prev[m]
+
+
+def is_match(a: str, b: str, threshold: float = DEFAULT_THRESHOLD) -> bool:
+    length = max(len(a), len(b))
+    if not length:
+        return False
+    limit = int(max_distance(length, threshold) + 1e-9)
+    d = levenshtein(a, b, limit)
+    return d <= limit and similarity(length, d) >= threshold
+
+
+# ---------- Trigramm-Index ----------
+
+def _tokens(key: str) -> List[Tuple[str, int]]:
+    padded = f"\0\0{key}\0\0"
+    seen: Dict[str, int] = defaultdict(int)
+    out = []
+    for i in range(len(padded) - 2):
+        gram = padded[i:i + 3]
+        out.append((gram, seen[gram]))
+        seen[gram] += 1
+    return out
+
+
+def indexed_pairs(keys: Sequence[str], threshold: float = DEFAULT_THRESHOLD, stats: Optional[Dict] = None) -> Set[Pair]:
+    """Alle Indexpaare (i, j) ähnlicher Schlüssel; Kandidaten per Präfixfilter über seltene Trigramme."""
+    token_lists = [_tokens(k) for k in keys]
+    freq = Counter(t for toks in token_lists for t in toks)
+    rank = {t: r for r, (t, _n) in enumerate(sorted(freq.items(), key=lambda x: (x[1], x[0])))}
+    token_sets = [frozenset(rank[t] for t in toks) for toks in token_lists]
+    order = sorted(range(len(keys)), key=lambda i: len(keys[i]))
+    # je Token: Schlüssel-Indizes und deren Längen, aufsteigend (Einfügen in Längenreihenfolge)
+    index: Dict[int, Tuple[List[int], List[int]]] = defaultdict(lambda: ([], []))
+    # Unter ~67 % wächst tau nicht mehr mit der Länge: der Präfix eines kürzeren Schlüssels (mit
+    # dessen größerem tau gekürzt) reicht dann nicht, Partner können fehlen -> alle früheren prüfen
+    exhaustive = 1 - 3 * max_distance(1, threshold) <= 0
+    done_ids: List[int] = []
+    done_lens: List[int] = []
+    pairs: Set[Pair] = set()
+    candidates = verified = 0
+    for i in order:
+        key = keys[i]
+        length = len(key)
+        if not length:
+            continue
+        dmax = max_distance(length, threshold)
+        tau = math.ceil(length + 2 - 3 * dmax - 1e-9)  # Mindestzahl gemeinsamer Trigramme
+        limit = int(dmax + 1e-9)
+        if exhaustive:
+            seen = done_ids[bisect_left(done_lens, length - limit):]  # nur Längenfilter
+            done_ids.append(i)
+            done_lens.append(length)
+        else:
+            toks = sorted(rank[t] for t in token_lists[i])
+            need = max(1, min(PREFIX_EXTRA, tau))
+            prefix = toks[:len(toks) - tau + need] if tau > 0 else toks
+            hits = []
+            for t in prefix:
+                ids, lens = index[t]
+                hits.append(ids[bisect_left(lens, length - limit):])  # Längenfilter
+                ids.append(i)
+                lens.append(length)
+            counted = Counter(chain.from_iterable(hits))
+            seen = [j for j, n in counted.items() if n >= need] if need > 1 else counted
+        candidates += len(seen)
+        own = token_sets[i]
+        for j in seen:  # früher einsortiert -> len(keys[j]) <= length
+            if len(own & token_sets[j]) < tau:
+                continue
+            verified += 1
+            d = levenshtein(key, keys[j], limit)
+            if d <= limit and similarity(length, d) >= threshold:
+                pairs.add((min(i, j), max(i, j)))
+    if stats is not None:
+        stats.update(candidates=candidates, verified=verified)
+    return pairs
+
+
+@lru_cache(maxsize=None)
+def _min_shared(length: int, threshold: float) -> int:
+    """Mindestzahl gemeinsamer Trigramme zweier Schlüssel mit max. Länge `length` (q-Gramm-Lemma)."""
+    return math.ceil(length + 2 - 3 * max_distance(length, threshold) - 1e-9)
+
+
+class NgramIndex:
+    """
+    Trigramm-Index über feste Schlüssel für Einzelabfragen (z. B. enrich.py). search() liefert alle
+    Schlüssel mit Ähnlichkeit >= threshold – exakt wie der Vergleich mit jedem einzelnen, aber nur
+    über die seltensten Trigramme: wer tau Trigramme teilt, teilt von den len-tau+PREFIX_EXTRA
+    seltensten beider Seiten mindestens PREFIX_EXTRA. Indiziert werden daher nur diese Präfixe der
+    Schlüssel; die Trefferlisten sind nach Schlüssellänge sortiert, abgefragt wird nur das
+    Längenfenster, in dem ein Treffer möglich ist.
+    """
+
+    def __init__(self, keys: Iterable[str], threshold: float = DEFAULT_THRESHOLD):
+        self.keys = list(keys)
+        self.threshold = threshold
+        token_lists = [_tokens(k) for k in self.keys]
+        freq = Counter(t for toks in token_lists for t in toks)
+        # Rang = globale Reihenfolge (seltene Trigramme zuerst); Ints hashen und sortieren billiger als Tupel
+        self._rank = {t: r for r, t in enumerate(sorted(freq, key=lambda t: (freq[t], t)))}
+        rank_lists = [sorted(map(self._rank.__getitem__, toks)) for toks in token_lists]
+        self._sets = [frozenset(ranks) for ranks in rank_lists]
+        # Unter ~67 % wächst tau nicht mehr mit der Länge -> Präfixfilter ungültig, dann alle prüfen
+        self._exhaustive = 1 - 3 * max_distance(1, threshold) <= 0
+        self._need: List[int] = []
+        self._index: List[Tuple[List[int], List[int]]] = [([], []) for _ in self._rank]
+        for i, ranks in enumerate(rank_lists):
+            tau = _min_shared(len(self.keys[i]), threshold)  # untere Schranke für alle Partner
+            need = max(1, min(PREFIX_EXTRA, tau))
+            self._need.append(need)
+            if tau > 0:
+                rank_lists[i] = ranks[:len(ranks) - tau + need]
+        for i in sorted(range(len(self.keys)), key=lambda i: len(self.keys[i])):
+            for r in rank_lists[i]:
+                ids, lens = self._index[r]
+                ids.append(i)
+                lens.append(len(self.keys[i]))
+        self._min_need = min(self._need, default=1)
+
+    def search(self, key: str) -> List[Tuple[int, int]]:
+        """[(index, ähnlichkeit)], beste zuerst."""
+        length = len(key)
+        if not length:
+            return []
+        toks = _tokens(key)
+        # Unbekannte Trigramme sind die seltensten (kein Partner hat sie) und fallen gleich weg
+        ranks = sorted(self._rank[t] for t in toks if t in self._rank)
+        tau = _min_shared(length, self.threshold)  # untere Schranke, längere Partner brauchen mehr
+        if self._exhaustive or tau <= 0:
+            candidates = range(len(self.keys))
+        else:
+            need = max(1, min(PREFIX_EXTRA, tau))
+            c = max_distance(1, self.threshold)
+            lo = length - int(max_distance(length, self.threshold) + 1e-9)  # kürzere Partner
+            hi = length + int(length * c / (1 - c) + 1e-9)                  # längere: d <= c*(length+d)
+            slices = []
+            for r in ranks[:len(ranks) - tau + need]:
+                ids, lens = self._index[r]
+                slices.append(ids[bisect_left(lens, lo):bisect_right(lens, hi)])
+            counted = Counter(chain.from_iterable(slices))
+            if need <= self._min_need:  # Regelfall: kein Vergleich je Kandidat nötig
+                candidates = [j for j, n in counted.items() if n >= need]
+            else:
+                candidates = [j for j, n in counted.items() if n >= min(need, self._need[j])]
+        own = frozenset(ranks)
+        keys, sets, threshold = self.keys, self._sets, self.threshold
+        hits = []
+        for j in candidates:
+            other = keys[j]
+            longest = len(other) if len(other) > length else length
+            if not self._exhaustive and len(own & sets[j]) < _min_shared(longest, threshold):
+                continue
+            limit = int(max_distance(longest, threshold) + 1e-9)
+            d = levenshtein(key, other, limit)
+            if d <= limit:
+                score = similarity(longest, d)
+                if score >= threshold:
+                    hits.append((j, score))
+        hits.sort(key=lambda h: (-h[1], h[0]))
+        return hits
+
+
+def naive_pairs(keys: Sequence[str], threshold: float = DEFAULT_THRESHOLD) -> Set[Pair]:
+    """Vergleich aller Paare wie groupDoublettes() (voller Levenshtein je Paar) – nur für den Benchmark."""
+    pairs: Set[Pair] = set()
+    for i in range(len(keys)):
+        for j in range(i + 1, len(keys)):
+            length = max(len(keys[i]), len(keys[j]))
+            if length and similarity(length, levenshtein(keys[i], keys[j])) >= threshold:
+                pairs.add((i, j))
+    return pairs
+
+
+# ---------- Gruppen und Zuordnung ----------
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def build_name_map(counts: Counter, threshold: float = DEFAULT_THRESHOLD,
+                   stats: Optional[Dict] = None) -> List[Tuple[str, str, int, int]]:
+    """
+    (Variante, Kanonisch, Ähnlichkeit, Anzahl) für alle Namen, die auf eine andere Schreibweise
+    abgebildet werden. `counts`: Häufigkeit je Rohname über alle CSVs.
+    """
+    by_key: Dict[str, List[str]] = defaultdict(list)
+    for raw in counts:
+        key = name_key(raw)
+        if key:
+            by_key[key].append(raw)
+    keys = sorted(by_key)
+    uf = _UnionFind(len(keys))
+    for i, j in indexed_pairs(keys, threshold, stats):
+        uf.union(i, j)
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for i in range(len(keys)):
+        groups[uf.find(i)].append(i)
+
+    mapping = []
+    for members in groups.values():
+        variants = [(raw, keys[i]) for i in members for raw in by_key[keys[i]]]
+        if len(variants) < 2:
+            continue
+        # häufigste Schreibweise; bei Gleichstand ohne Jahreszahlen, dann die ausführlichere, dann alphabetisch
+        canonical, canonical_key = min(variants, key=lambda v: (-counts[v[0]], clean_name(v[0]) != v[0],
+                                                                -len(v[0]), v[0]))
+        for raw, key in variants:
+            if raw == canonical:
+                continue
+            length = max(len(key), len(canonical_key))
+            score = similarity(length, levenshtein(key, canonical_key))
+            if key == canonical_key or score >= threshold:
+                mapping.append((raw, canonical, score, counts[raw]))
+    mapping.sort(key=lambda m: (m[1], m[0]))
+    if stats is not None:
+        stats.update(names=len(counts), keys=len(keys), groups=sum(1 for g in groups.values() if len(g) > 1),
+                     mapped=len(mapping))
+    return mapping
+
+
+def collect_names(csv_paths: Iterable[str], columns: Sequence[str] = NAME_COLUMNS) -> Counter:
+    counts: Counter = Counter()
+    for path in csv_paths:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f, delimiter=';'):
+                for col in columns:
+                    value = (row.get(col) or "").strip()
+                    if value:
+                        counts[value] += 1
+    return counts
+
+
+def write_name_map(path: str, mapping: Iterable[Tuple[str, str, int, int]]):
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.writer(f, delimiter=';')
+        w.writerow(MAP_COLUMNS)
+        w.writerows(mapping)
+
+
+def load_name_map(path: str) -> Dict[str, str]:
+    """{Variante: Kanonisch} aus einer (ggf. von Hand nachbearbeiteten) Zuordnungsdatei."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return {row["Variante"]: row["Kanonisch"] for row in csv.DictReader(f, delimiter=';')
+                if row.get("Variante") and row.get("Kanonisch")}
+
+
+# ---------- Benchmark ----------
+
+_ONSETS = ["b", "ch", "d", "f", "g", "h", "k", "l", "m", "n", "p", "r", "s", "sch", "st", "t", "w", "z", "br", "kr"]
+_NUCLEI = ["a", "e", "i", "o", "u", "ä", "ö", "ü", "ei", "au", "ie"]
+_CODAS = ["", "", "n", "r", "l", "ch", "ck", "tz", "rt", "nd", "ng", "mann", "berg", "stein", "hardt"]
+_GIVEN = ["Johann", "Sebastian", "Paul", "Martin", "Georg", "Friedrich", "Felix", "Heinrich", "Anna", "Maria",
+          "Nikolaus", "Philipp", "Clara", "Matthias", "Michael", "Christoph", "Ludwig", "Joseph"]
+
+
+def _bench_corpus(size: int, seed: int = 7) -> Counter:
+    """Synthetische Namen mit typischen Varianten (Reihenfolge, Jahreszahlen, Tippfehler, 'von')."""
+    rnd = random.Random(seed)
+    counts: Counter = Counter()
+    while len(counts) < size:
+        family = "".join(rnd.choice(_ONSETS) + rnd.choice(_NUCLEI) + rnd.choice(_CODAS)
+                         for _ in range(rnd.randint(2, 3))).capitalize()
+        given = " ".join(rnd.sample(_GIVEN, rnd.randint(1, 2)))
+        born = rnd.randint(1480, 1950)
+        forms = [f"{given} {family}", f"{family}, {given}", f"{given} {family} ({born}–{born + rnd.randint(20, 80)})",
+                 f"{family}, {given} ({born})", f"von {given} {family}"]
+        typo = list(f"{given} {family}")
+        k = rnd.randrange(len(typo))
+        typo[k] = rnd.choice("aeiourstn")
+        forms.append("".join(typo))
+        for form in rnd.sample(forms, rnd.randint(1, 4)):
+            counts[form] += rnd.randint(1, 20)
+    return counts
+
+
+def bench(sizes: Sequence[int], naive_sample: int, threshold: float):
+    print(f"{'Namen':>8} {'Schlüssel':>10} {'Kandidaten':>11} {'geprüft':>9} {'Index':>9} {'alle Paare':>12} {'Faktor':>8}")
+    for size in sizes:
+        counts = _bench_corpus(size)
+        keys = sorted({name_key(n) for n in counts} - {""})
+        stats: Dict = {}
+        t0 = time.perf_counter()
+        build_name_map(counts, threshold, stats)
+        indexed_s = time.perf_counter() - t0
+
+        # alle Paare nur auf einer Stichprobe messen (quadratisch), Ergebnis muss identisch sein
+        sample = sorted(random.Random(1).sample(keys, min(naive_sample, len(keys))))
+        t0 = time.perf_counter()
+        expected = naive_pairs(sample, threshold)
+        sample_s = time.perf_counter() - t0
+        if indexed_pairs(sample, threshold) != expected:
+            raise SystemExit(f"ABWEICHUNG zwischen Index und allen Paaren (Stichprobe {len(sample)})")
+        # niedrige Schwelle: Präfixfilter ungültig, der Index muss auf den Vergleich aller Paare zurückfallen
+        # (ohne frühen Abbruch im Levenshtein teuer, daher kleinere Stichprobe)
+        low = sample[:LOW_SAMPLE]
+        if indexed_pairs(low, LOW_THRESHOLD) != naive_pairs(low, LOW_THRESHOLD):
+            raise SystemExit(f"ABWEICHUNG bei Schwelle {LOW_THRESHOLD} (Stichprobe {len(low)})")
+        n, m = len(keys), len(sample)
+        naive_s = sample_s * (n * (n - 1)) / max(1, m * (m - 1))
+        label = f"{naive_s:>11.1f}s" if m == n else f"~{naive_s:>10.0f}s"
+        print(f"{len(counts):>8} {n:>10} {stats['candidates']:>11} {stats['verified']:>9} {indexed_s:>8.2f}s {label} {naive_s / indexed_s:>7.0f}x")
+    print(f"Stichprobe je Größe: {naive_sample} Schlüssel, Paare identisch (bei Schwelle {LOW_THRESHOLD}: {LOW_SAMPLE}); "
+          "'~' = auf alle Schlüssel hochgerechnet.")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Namensvarianten über Scraper-CSVs gruppieren und Zuordnungsdatei schreiben")
+    ap.add_argument("csv", nargs="*", help="Semikolon-CSVs aus eg_scraper.py / carus.py")
+    ap.add_argument("--out", default="namen.map.csv", help="Zuordnungsdatei (Variante;Kanonisch;Aehnlichkeit;Anzahl)")
+    ap.add_argument("--columns", nargs="+", default=list(NAME_COLUMNS), help="Namensspalten")
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Mindestähnlichkeit 0–100")
+    ap.add_argument("--bench", action="store_true", help="Index gegen Vergleich aller Paare messen")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000], help="Korpusgrößen für --bench")
+    ap.add_argument("--naive-sample", type=int, default=600, help="Stichprobe für den quadratischen Vergleich")
+    args = ap.parse_args()
+
+    if args.bench:
+        bench(args.sizes, args.naive_sample, args.threshold)
+        return
+    if not args.csv:
+        ap.error("CSV-Dateien oder --bench angeben")
+    counts = collect_names(args.csv, args.columns)
+    stats: Dict = {}
+    t0 = time.perf_counter()
+    mapping = build_name_map(counts, args.threshold, stats)
+    write_name_map(args.out, mapping)
+    print(f"{stats['names']} Namen, {stats['keys']} Schlüssel, {stats['groups']} Gruppen, "
+          f"{stats['mapped']} Varianten zugeordnet ({time.perf_counter() - t0:.2f}s) -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
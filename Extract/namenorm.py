@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Gemeinsame Namens-/Schlüssel-Normalisierung für eg_scraper.py und carus.py.
+
+- Vorkompilierte Muster statt re.sub(<str>, ...) je Aufruf.
+- Begrenztes LRU-Memo: dieselben Komponisten-/Dichternamen werden je Lauf hunderte Male bereinigt.
+- Batch-API (clean_column) für ganze Spalten: jeder verschiedene Wert wird nur einmal berechnet.
+- Abgleich-Schlüssel wie im Backend (match_key, composer_match_key, match_tokens), damit der
+  Import sie nicht für jede Zeile neu berechnen muss (catalog_export.py).
+
+Die Ergebnisse entsprechen exakt den bisherigen Einzelfunktionen; Nachweis und Messung:
+    python namenorm.py --bench --size 100000
+"""
+import argparse, random, re, time
+from functools import lru_cache
+from typing import Callable, Iterable, List, Tuple
+
+MEMO_SIZE = 8192
+
+# eg_scraper: Jahreszahlen entfernen
+_RE_YEAR_RANGE = re.compile(r"\(\s*\d{3,4}\s*[–-]\s*\d{1,4}\s*\)")
+_RE_YEAR_BRACKET = re.compile(r"[\(\[]\s*\d{3,4}\s*[\)\]]")
+_RE_YEAR = re.compile(r"\b\d{3,4}\b")
+_RE_MULTI_SPACE = re.compile(r"\s{2,}")
+
+# carus: Zusätze in Personen- und Tonartfeldern
+_RE_ZUR_PERSON = re.compile(r"\bzur Person\b", re.IGNORECASE)
+_RE_MOLL = re.compile(r"-moll", re.IGNORECASE)
+_RE_DUR = re.compile(r"-dur", re.IGNORECASE)
+
+# Backend-Abgleich (choir-app-backend/src/utils/name.utils.js, matching.utils.js, import.controller.js)
+_RE_NON_ALNUM = re.compile(r"[^a-z0-9]")
+_RE_NAME_PREFIX = re.compile(r"^(von|van|de|der|la|le)\s+", re.IGNORECASE)
+_RE_WHITESPACE = re.compile(r"\s+")
+_RE_TOKEN_SPLIT = re.compile(r"[\s,]+")
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def clean_name(s: str) -> str:
+    """Entfernt Jahreszahlen wie (1623–1676) / (1623) / 1623 aus Komponisten-/Dichterangaben."""
+    if not s:
+        return ""
+    s = _RE_YEAR_RANGE.sub("", s)
+    s = _RE_YEAR_BRACKET.sub("", s)
+    s = _RE_YEAR.sub("", s)
+    s = _RE_MULTI_SPACE.sub(" ", s).strip(" ,;/")
+    return s
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def normalize(text: str) -> str:
+    return " ".join(text.strip().split())
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def clean_zur_person(text: str) -> str:
+    """Entfernt die Phrase 'zur Person' (falls vorhanden) und normalisiert."""
+    if not text:
+        return ""
+    return normalize(_RE_ZUR_PERSON.sub("", text))
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def clean_tonart(text: str) -> str:
+    """Entfernt '-Moll' und '-Dur' aus der Tonart und normalisiert."""
+    if not text:
+        return ""
+    t = normalize(text)
+    t = _RE_MOLL.sub("", t)
+    t = _RE_DUR.sub("", t)
+    return t.strip()
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def format_person_name(name: str) -> str:
+    """Wandelt 'Vorname Mittelname Nachname' in 'Nachname, Vorname Mittelname' um. Einzelne Wörter bleiben."""
+    name = clean_zur_person(name)
+    if not name:
+        return ""
+    if "," in name:
+        return name  # schon formatiert
+    parts = name.split()
+    if len(parts) == 1:
+        return parts[0]
+    return f"{parts[-1]}, {' '.join(parts[:-1])}"
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def match_key(text: str) -> str:
+    """Wie normalize() in name.utils.js: Kleinbuchstaben, nur a-z0-9 (Umlaute fallen weg)."""
+    return _RE_NON_ALNUM.sub("", text.lower())
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def composer_match_key(name: str) -> str:
+    """Wie normalizeComposerName() in matching.utils.js: 'Bach, Johann Sebastian' -> 'johann sebastian bach'."""
+    if not name:
+        return ""
+    s = _RE_NAME_PREFIX.sub("", name.lower().strip(), count=1)
+    if "," in s:
+        parts = [p.strip() for p in s.split(",")]
+        s = f"{parts[1]} {parts[0]}"
+    return _RE_WHITESPACE.sub(" ", s)
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def match_tokens(text: str) -> Tuple[str, ...]:
+    """Wie tokenize() in import.controller.js: Kleinbuchstaben, an Leerraum und Kommas getrennt."""
+    return tuple(t for t in _RE_TOKEN_SPLIT.split(text.lower()) if t)
+
+
+def clean_column(fn: Callable[[str], str], values: Iterable[str]) -> List[str]:
+    """Wendet `fn` auf eine ganze Spalte an; jeder verschiedene Wert wird nur einmal berechnet."""
+    values = list(values)
+    done = {v: fn(v) for v in set(values)}
+    return [done[v] for v in values]
+
+
+def clear_memo():
+    for fn in (clean_name, normalize, clean_zur_person, clean_tonart, format_person_name,
+               match_key, composer_match_key, match_tokens):
+        fn.cache_clear()
+
+
+# ---------- Mikro-Benchmark gegen die bisherigen Implementierungen ----------
+
+def _legacy_clean_name(s):
+    if not s:
+        return ""
+    s = re.sub(r"\(\s*\d{3,4}\s*[–-]\s*\d{1,4}\s*\)", "", s)
+    s = re.sub(r"[\(\[]\s*\d{3,4}\s*[\)\]]", "", s)
+    s = re.sub(r"\b\d{3,4}\b", "", s)
+    s = re.sub(r"\s{2,}", " ", s).strip(" ,;/")
+    return s
+
+def _legacy_normalize(text):
+    return " ".join(text.strip().split())
+
+def _legacy_clean_zur_person(text):
+    if not text:
+        return ""
+    return _legacy_normalize(re.sub(r'\bzur Person\b', '', text, flags=re.IGNORECASE))
+
+def _legacy_clean_tonart(text):
+    if not text:
+        return ""
+    t = _legacy_normalize(text)
+    t = re.sub(r'(?i)-moll', '', t)
+    t = re.sub(r'(?i)-dur', '', t)
+    return t.strip()
+
+def _legacy_format_person_name(name):
+    name = _legacy_clean_zur_person(name)
+    if not name:
+        return ""
+    if "," in name:
+        return name
+    parts = name.split()
+    if len(parts) == 1:
+        return parts[0]
+    return f"{parts[-1]}, {' '.join(parts[:-1])}"
+
+
+_GIVEN = ["Johann Sebastian", "Paul", "Martin", "Georg Friedrich", "Felix", "Heinrich", "Anna", "Maria",
+          "Johann", "Nikolaus", "Philipp", "Friedrich Heinrich", "Clara", "Matthias"]
+_FAMILY = ["Bach", "Gerhardt", "Luther", "Händel", "Mendelssohn Bartholdy", "Schütz", "Weissel", "Crüger",
+           "Herman", "Nicolai", "Ranke", "Schumann", "Claudius", "Praetorius"]
+_DECOR = ["{n}", "{n} ({a}–{b})", "{n} ({a})", "{n} {a}", "{n}  zur Person", " {n} ,", "{n} [{a}]", "zur Person {n}"]
+_KEYS = ["C-Dur", "a-Moll", "F-dur", "d-moll", " Es-Dur ", "G"]
+
+
+def _corpus(size: int, seed: int = 1) -> List[str]:
+    rnd = random.Random(seed)
+    distinct = []
+    for _ in range(max(50, size // 50)):
+        a = rnd.randint(1480, 1950)
+        n = f"{rnd.choice(_GIVEN)} {rnd.choice(_FAMILY)}"
+        distinct.append(rnd.choice(_DECOR).format(n=n, a=a, b=a + rnd.randint(20, 80)))
+    distinct += _KEYS
+    # schiefe Verteilung wie in echten Katalogen: wenige Namen sehr häufig
+    return [distinct[min(int(rnd.paretovariate(1.2)) - 1, len(distinct) - 1)] for _ in range(size)]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Mikro-Benchmark der Namensnormalisierung")
+    ap.add_argument("--bench", action="store_true", required=True)
+    ap.add_argument("--size", type=int, default=100_000, help="Anzahl Namen im Korpus")
+    args = ap.parse_args()
+
+    corpus = _corpus(args.size)
+    pairs = [("clean_name", _legacy_clean_name, clean_name),
+             ("normalize", _legacy_normalize, normalize),
+             ("clean_zur_person", _legacy_clean_zur_person, clean_zur_person),
+             ("clean_tonart", _legacy_clean_tonart, clean_tonart),
+             ("format_person_name", _legacy_format_person_name, format_person_name)]
+    print(f"Korpus: {len(corpus)} Namen, {len(set(corpus))} verschieden")
+    print(f"{'Funktion':<20} {'bisher':>10} {'memo':>10} {'batch':>10} {'Faktor':>8}")
+    for name, old, new in pairs:
+        clear_memo()
+        t0 = time.perf_counter()
+        expected = [old(v) for v in corpus]
+        t1 = time.perf_counter()
+        got = [new(v) for v in corpus]
+        t2 = time.perf_counter()
+        clear_memo()
+        batch = clean_column(new, corpus)
+        t3 = time.perf_counter()
+        if got != expected or batch != expected:
+            raise SystemExit(f"ABWEICHUNG in {name}")
+        print(f"{name:<20} {t1 - t0:>9.3f}s {t2 - t1:>9.3f}s {t3 - t2:>9.3f}s {(t1 - t0) / (t2 - t1):>7.1f}x")
+    print("Alle Ergebnisse identisch.")
+
+
+if __name__ == "__main__":
+    main()
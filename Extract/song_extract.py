@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Extraktion der Felder 'Melodie:' und 'Text:' aus Liederdatenbank-Liedseiten.
+
+Zwei gleichwertige Verfahren:
+- "bs4":    bisheriges Verfahren – kompletter BeautifulSoup-Baum, get_text("\\n", strip=True), Regex.
+- "stream": html.parser.HTMLParser ohne Baum. Erzeugt dieselbe Textfolge wie get_text()
+            (gleiche Stringgrenzen, script/style/template ausgelassen, gleiche Entity-Behandlung),
+            prüft die Regex schrittweise und bricht ab, sobald beide Felder feststehen.
+
+Gleichheitsprüfung gegen gespeicherte Seiten:
+    python song_extract.py --compare fixtures/liederdb/*.html
+    python -m pytest test_song_extract.py                   # dasselbe als automatischer Test
+"""
+import argparse, html, re, sys, time
+from html.entities import html5 as _HTML5_ENTITIES
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    from bs4 import BeautifulSoup
+except Exception:
+    BeautifulSoup = None
+
+MELODIE = "Melodie"
+TEXT = "Text"
+
+# Inhalte dieser Tags liefert BeautifulSoup.get_text() nicht mit (Script/Stylesheet/TemplateString).
+_SKIP_TAGS = {"script", "style", "template"}
+
+
+def _field_pattern(label: str) -> "re.Pattern[str]":
+    return re.compile(rf"{label}\s*:\s*([^\n\r]+)", re.IGNORECASE)
+
+
+def _prefix_pattern(label: str) -> "re.Pattern[str]":
+    """Passt auf jeden echten Anfang eines Treffers von _field_pattern(label) am Textende."""
+    pat = r"\s*(?::\s*)?"
+    for ch in reversed(label):
+        pat = f"{re.escape(ch)}(?:{pat})?"
+    return re.compile(pat[:-1] + r"\Z", re.IGNORECASE)  # erstes Zeichen ist Pflicht
+
+
+class _FieldScanner:
+    """
+    Sucht den ersten Treffer eines Feldes in einem wachsenden Text. `start` ist die früheste
+    Stelle, an der ein Treffer noch beginnen kann: ohne Treffer kann ein späterer nur dort
+    anfangen, wo der bisherige Text mit einem Treffer-Anfang endet.
+    """
+
+    def __init__(self, label: str):
+        self.pattern = _field_pattern(label)
+        self.partial = _prefix_pattern(label)
+        self.start = 0
+
+    def scan(self, buf: str) -> Optional[str]:
+        m = self.pattern.search(buf, self.start)
+        if m:
+            return m.group(1)
+        p = self.partial.search(buf, self.start)
+        self.start = p.start() if p else len(buf)
+        return None
+
+
+class _StopParsing(Exception):
+    pass
+
+
+class SongFieldParser(HTMLParser):
+    """Streaming-Extraktor; nach feed_all() stehen die gefundenen Rohwerte in `values`."""
+
+    def __init__(self, labels: Tuple[str, ...] = (MELODIE, TEXT)):
+        super().__init__(convert_charrefs=False)
+        self.values: Dict[str, str] = {}
+        self._scanners = {label: _FieldScanner(label) for label in labels}
+        self._pending: List[str] = []
+        self._skip = 0
+        self._buf = ""
+
+    def feed_all(self, page_text: str) -> Dict[str, str]:
+        try:
+            self.feed(page_text)
+            self.close()
+            self._end_data()
+        except _StopParsing:
+            pass
+        return self.values
+
+    # ---------- Textfolge wie BeautifulSoup.get_text("\n", strip=True) ----------
+    def _end_data(self):
+        if not self._pending:
+            return
+        s = "".join(self._pending).strip()
+        self._pending = []
+        if s:
+            self._add_string(s)
+
+    def _add_string(self, s: str):
+        self._buf = f"{self._buf}\n{s}" if self._buf else s
+        for label, scanner in list(self._scanners.items()):
+            value = scanner.scan(self._buf)
+            if value is not None:
+                self.values[label] = value
+                del self._scanners[label]
+        if not self._scanners:
+            raise _StopParsing
+        offset = min(sc.start for sc in self._scanners.values())
+        if offset:
+            self._buf = self._buf[offset:]
+            for sc in self._scanners.values():
+                sc.start -= offset
+
+    def handle_starttag(self, tag, attrs):
+        self._end_data()
+        if tag in _SKIP_TAGS:
+            self._skip += 1
+
+    def handle_endtag(self, tag):
+        self._end_data()
+        if tag in _SKIP_TAGS and self._skip:
+            self._skip -= 1
+
+    def handle_startendtag(self, tag, attrs):
+        self._end_data()
+
+    def handle_data(self, data):
+        if not self._skip:
+            self._pending.append(data)
+
+    def handle_charref(self, name):
+        self.handle_data(html.unescape(f"&#{name};"))
+
+    def handle_entityref(self, name):
+        self.handle_data(_HTML5_ENTITIES.get(f"{name};") or f"&{name}")
+
+    def handle_comment(self, data):
+        self._end_data()
+
+    def handle_decl(self, decl):
+        self._end_data()
+
+    def handle_pi(self, data):
+        self._end_data()
+
+    def unknown_decl(self, data):
+        self._end_data()
+        if data.upper().startswith("CDATA[") and not self._skip:
+            self._pending.append(data[len("CDATA["):])
+            self._end_data()
+
+
+def extract_raw_authors_stream(page_text: str) -> Tuple[str, str]:
+    """(Melodie, Text) roh, per Streaming-Parser mit frühem Abbruch."""
+    values = SongFieldParser().feed_all(page_text)
+    return values.get(MELODIE, ""), values.get(TEXT, "")
+
+
+def extract_raw_authors_bs4(page_text: str) -> Tuple[str, str]:
+    """(Melodie, Text) roh, per vollständigem BeautifulSoup-Baum (bisheriges Verfahren)."""
+    text = BeautifulSoup(page_text, "html.parser").get_text("\n", strip=True)
+    mt = re.search(r"Text\s*:\s*([^\n\r]+)", text, re.IGNORECASE)
+    mm = re.search(r"Melodie\s*:\s*([^\n\r]+)", text, re.IGNORECASE)
+    return (mm.group(1) if mm else ""), (mt.group(1) if mt else "")
+
+
+PARSERS: Dict[str, Callable[[str], Tuple[str, str]]] = {
+    "stream": extract_raw_authors_stream,
+    "bs4": extract_raw_authors_bs4,
+}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Vergleicht Streaming- und BeautifulSoup-Extraktion auf gespeicherten Liedseiten")
+    ap.add_argument("--compare", nargs="+", required=True, metavar="HTML", help="Gespeicherte Liedseiten")
+    ap.add_argument("--repeat", type=int, default=20, help="Wiederholungen für die Zeitmessung")
+    args = ap.parse_args()
+    if BeautifulSoup is None:
+        ap.error("beautifulsoup4 ist für den Vergleich erforderlich")
+
+    mismatches = 0
+    timings = {name: 0.0 for name in PARSERS}
+    for path in args.compare:
+        with open(path, encoding="utf-8") as f:
+            page = f.read()
+        results = {}
+        for name, fn in PARSERS.items():
+            t0 = time.perf_counter()
+            for _ in range(args.repeat):
+                results[name] = fn(page)
+            timings[name] += time.perf_counter() - t0
+        if results["stream"] != results["bs4"]:
+            mismatches += 1
+            print(f"ABWEICHUNG {path}: stream={results['stream']!r} bs4={results['bs4']!r}")
+        else:
+            print(f"ok  {path}: {results['stream']!r}")
+
+    n = len(args.compare) * args.repeat
+    for name, total in timings.items():
+        print(f"{name:>6}: {total / n * 1000:.3f} ms/Seite")
+    if mismatches:
+        print(f"{mismatches} Abweichung(en).", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Lokaler Ersatz-HTTP-Server für Offline-Benchmarks und Tests der Extract-Scraper.
+
+Liefert fest hinterlegte Antworten (aufgezeichnete oder synthetische Seiten) aus einem
+Routen-Dict {pfad: (content_type, body)}. Unterstützt Keep-Alive, ETag/If-None-Match (304)
+und eine künstliche Latenz je Anfrage, um Netzwartezeit nachzustellen.
+
+    routes = {"/song/1": ("text/html; charset=utf-8", b"<html>...</html>")}
+    with StubServer(routes, latency=0.02) as srv:
+        requests.get(srv.url("/song/1"))
+"""
+import hashlib, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+
+Routes = Dict[str, Tuple[str, bytes]]
+
+
+class StubServer:
+    def __init__(self, routes: Routes, latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.routes = routes
+        self.latency = latency
+        self.stats = {"requests": 0, "not_modified": 0, "not_found": 0, "bytes": 0}
+        self._lock = threading.Lock()
+        self._etags = {path: '"%s"' % hashlib.sha1(body).hexdigest() for path, (_ct, body) in routes.items()}
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    def _count(self, key: str, n: int = 1):
+        with self._lock:
+            self.stats[key] += n
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server._count("requests")
+                if server.latency:
+                    time.sleep(server.latency)
+                path = self.path.split("#", 1)[0]
+                route = server.routes.get(path)
+                if route is None:
+                    server._count("not_found")
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                content_type, body = route
+                etag = server._etags.get(path)
+                if etag and self.headers.get("If-None-Match") == etag:
+                    server._count("not_modified")
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                if etag:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+                server._count("bytes", len(body))
+
+        return Handler
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="stub-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
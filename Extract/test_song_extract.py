@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming- und BeautifulSoup-Extraktion müssen auf allen gespeicherten Liedseiten dasselbe liefern
+(wie `python song_extract.py --compare fixtures/liederdb/*.html`).
+
+    python -m pytest test_song_extract.py
+"""
+import glob, os
+
+import pytest
+
+import song_extract
+
+pytest.importorskip("bs4")
+
+FIXTURES = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "liederdb", "*.html")))
+
+
+def _read(path: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_fixtures_vorhanden():
+    assert FIXTURES, "keine Liedseiten unter fixtures/liederdb/"
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=os.path.basename)
+def test_stream_gleich_bs4(path):
+    page = _read(path)
+    assert song_extract.extract_raw_authors_stream(page) == song_extract.extract_raw_authors_bs4(page)
+
+
+def test_felder_gefunden():
+    """Die Fixtures decken Treffer ab, nicht nur zwei leere Ergebnisse."""
+    results = [song_extract.extract_raw_authors_stream(_read(path)) for path in FIXTURES]
+    assert any(melodie for melodie, _text in results)
+    assert any(text for _melodie, text in results)
@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""
+Rubriken einer Wikipedia-Liste über die MediaWiki-API (action=parse) statt der gerenderten Seite.
+
+- Zuerst nur Gliederung und Revisions-ID (prop=sections|revid, wenige KB), immer beim Server
+  nachgefragt, auch wenn der HTTP-Antwort-Cache noch eine frische Antwort hätte.
+- Ist die Revision unverändert, kommt das {nr: rubrik}-Mapping aus dem Revisions-Cache
+  (<cache_dir>/wiki_rubriken.json) ohne weiteren Abruf oder Parse.
+- Sonst je Hauptabschnitt, der eine Rubrik enthält, dessen Wikitext (prop=wikitext&section=N,
+  an die Revision gebunden über oldid). Unterabschnitte stecken im Wikitext des Abschnitts,
+  Überschriften darin wechseln die Rubrik wie h2/h3 in der gerenderten Seite.
+- Erkannt werden Listenzeilen (* / #) und die erste Zelle von Tabellenzeilen, die mit der
+  Liednummer beginnen.
+
+Die Abfrage-URLs werden mit fester Parameterreihenfolge gebaut (query_url), damit ein
+Ersatz-Server (stub_server.py) aufgezeichnete Antworten über den Pfad samt Query zuordnen kann.
+
+    python wiki_api.py --wiki-url https://de.wikipedia.org/wiki/Liste_der_Kirchenlieder_im_Evangelischen_Gesangbuch
+"""
+import argparse, hashlib, html, json, os, re, sys, tempfile, threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote, unquote, urlencode, urlsplit
+
+try:
+    import fcntl  # Sperre über Prozesse hinweg (nicht unter Windows)
+except ImportError:
+    fcntl = None
+
+CACHE_FILE = "wiki_rubriken.json"
+
+
+class WikiApiError(Exception):
+    """API-Antwort unbrauchbar (Fehlercode, fehlende Felder, kein JSON)."""
+
+
+def api_for(wiki_url: str) -> Tuple[str, str]:
+    """https://host/wiki/Titel -> (https://host/w/api.php, 'Titel')."""
+    parts = urlsplit(wiki_url)
+    if "/wiki/" not in parts.path:
+        raise WikiApiError(f"keine Wikipedia-Artikel-URL: {wiki_url}")
+    page = unquote(parts.path.split("/wiki/", 1)[1])
+    if not page:
+        raise WikiApiError(f"kein Seitentitel in {wiki_url}")
+    return f"{parts.scheme}://{parts.netloc}/w/api.php", page
+
+
+def query_url(api: str, **params: Any) -> str:
+    """Abfrage-URL mit fester Parameterreihenfolge (action, format, formatversion, dann wie übergeben)."""
+    query = {"action": "parse", "format": "json", "formatversion": 2, **params}
+    return f"{api}?{urlencode(query, quote_via=quote)}"
+
+
+def sections_url(api: str, page: str) -> str:
+    return query_url(api, page=page, prop="sections|revid", redirects=1)
+
+
+def section_url(api: str, revid: int, index: str) -> str:
+    return query_url(api, oldid=revid, section=index, prop="wikitext")
+
+
+def _parse_json(resp) -> Dict[str, Any]:
+    try:
+        data = json.loads(resp.text)
+    except ValueError as e:
+        raise WikiApiError(f"keine JSON-Antwort von {resp.url}: {e}") from None
+    if "error" in data:
+        err = data["error"]
+        raise WikiApiError(f"{err.get('code')}: {err.get('info')}")
+    if "parse" not in data:
+        raise WikiApiError(f"Antwort ohne 'parse' von {resp.url}")
+    return data["parse"]
+
+
+def fetch_sections(pool, api: str, page: str) -> Tuple[int, List[Dict[str, Any]]]:
+    """(revid, Abschnitte) der aktuellen Revision."""
+    # Immer beim Server nachfragen (bedingt, falls ETag/Last-Modified vorliegen): eine im HTTP-Cache
+    # noch frische Antwort hätte nach einer Änderung die alte revid und damit alte Rubriken geliefert.
+    # Die per oldid gebundenen Abschnitte ändern sich nie und bleiben normal gecacht.
+    resp = pool.get(sections_url(api, page), max_age=0)
+    resp.raise_for_status()
+    data = _parse_json(resp)
+    try:
+        return int(data["revid"]), list(data.get("sections") or [])
+    except (KeyError, TypeError, ValueError):
+        raise WikiApiError(f"Antwort ohne revid für {page}") from None
+
+
+def fetch_section_wikitext(pool, api: str, revid: int, index: str) -> str:
+    resp = pool.get(section_url(api, revid, index))
+    resp.raise_for_status()
+    text = _parse_json(resp).get("wikitext")
+    if isinstance(text, dict):  # formatversion=1
+        text = text.get("*")
+    if not isinstance(text, str):
+        raise WikiApiError(f"Abschnitt {index} ohne Wikitext")
+    return text
+
+
+# ---------- Wikitext ----------
+
+_TEMPLATE_RE = re.compile(r"\{\{[^{}]*\}\}")
+_LINK_RE = re.compile(r"\[\[(?:[^\[\]|]*\|)?([^\[\]]*)\]\]")
+_EXTLINK_RE = re.compile(r"\[(?:https?:)?//\S+\s*([^\]]*)\]")
+_REF_RE = re.compile(r"<ref[^>/]*/>|<ref[^>]*>.*?</ref>", re.S)
+_TAG_RE = re.compile(r"<[^>]+>")
+_HEADING_RE = re.compile(r"^(={2,6})\s*(.+?)\s*\1\s*$")
+_CELL_ATTR_RE = re.compile(r'^[^|\[\]{}]*=[^|\[\]{}]*\|(?!\|)')
+
+
+def plain(text: str) -> str:
+    """Wikitext/HTML einer Zeile -> sichtbarer Text (Vorlagen entfallen, Links -> Linktext)."""
+    text = _REF_RE.sub("", text)
+    prev = None
+    while prev != text:  # verschachtelte Vorlagen von innen nach außen
+        prev, text = text, _TEMPLATE_RE.sub("", text)
+    text = _LINK_RE.sub(r"\1", text)
+    text = _EXTLINK_RE.sub(r"\1", text)
+    text = _TAG_RE.sub("", text).replace("'''", "").replace("''", "")
+    return " ".join(html.unescape(text).split())
+
+
+def heading_title(section: Dict[str, Any]) -> str:
+    return plain(str(section.get("line") or ""))
+
+
+def parse_wikitext(text: str, nr_re: "re.Pattern", nr_range: Tuple[int, int], known: Optional[frozenset],
+                   current: Optional[str], out: Dict[int, str]) -> Optional[str]:
+    """Trägt Nummern aus Listen- und Tabellenzeilen in `out` ein (erste Rubrik gewinnt); gibt die
+    zuletzt gültige Rubrik zurück."""
+    lo, hi = nr_range
+    first_cell = False
+    for raw in text.splitlines():
+        line = raw.strip()
+        m = _HEADING_RE.match(line)
+        if m:
+            title = plain(m.group(2))
+            if title and (known is None or title in known):
+                current = title
+            continue
+        if line.startswith("{|") or line.startswith("|-"):
+            first_cell = True
+            continue
+        if line.startswith(("|}", "|+", "!")):
+            continue
+        if line.startswith("|"):
+            if not first_cell:
+                continue
+            first_cell = False
+            cell = _CELL_ATTR_RE.sub("", line[1:].split("||", 1)[0].strip())
+        elif line[:1] in "*#":
+            cell = line.lstrip("*#:;")
+        else:
+            continue
+        if not current:
+            continue
+        m = nr_re.match(plain(cell))
+        if m:
+            nr = int(m.group(1))
+            if lo <= nr <= hi:
+                out.setdefault(nr, current)
+    return current
+
+
+def plan_sections(sections: Iterable[Dict[str, Any]], known: Optional[frozenset]) -> List[str]:
+    """Indizes der Hauptabschnitte, deren Wikitext abgerufen werden muss: jeder Abschnitt mit
+    Rubrik-Überschrift (None: jede Ebene-2/3-Überschrift), zusammengefasst auf den obersten
+    Vorfahren, damit verschachtelte Rubriken nur einmal geladen werden."""
+    wanted: List[str] = []
+    top: Optional[Tuple[str, int]] = None   # (index, level) des aktuellen obersten Abschnitts
+    for sec in sections:
+        index = str(sec.get("index") or "")
+        if not index.isdigit():   # eingebundene Vorlagen ("T-1") lassen sich nicht über oldid abrufen
+            continue
+        try:
+            level = int(sec.get("level") or 0)
+        except ValueError:
+            continue
+        if top is None or level <= top[1]:
+            top = (index, level)
+        title = heading_title(sec)
+        relevant = (level <= 3) if known is None else (title in known)
+        if relevant and top[0] not in wanted:
+            wanted.append(top[0])
+    return wanted
+
+
+# ---------- Revisions-Cache ----------
+
+class RevisionCache:
+    """
+    {Schlüssel: {"revid", "rubriken"}} als JSON-Datei; Schlüssel aus API, Seite, Bereich, Überschriften.
+    put() schreibt unter Sperre (Threads, per fcntl auch Prozesse), liest die Datei vorher neu ein und
+    ergänzt nur den eigenen Eintrag – gleichzeitige Läufe mit demselben Cache-Verzeichnis verlieren
+    so keine Einträge des anderen.
+    """
+
+    _lock = threading.Lock()  # gemeinsam für alle Instanzen (fetch_rubriken legt je Aufruf eine an)
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._data = self._load()
+
+    def _load(self) -> Dict[str, Any]:
+        if not self.path or not os.path.isfile(self.path):
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.path + ".lock", "a") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @staticmethod
+    def key(api: str, page: str, nr_range: Tuple[int, int], known: Optional[frozenset]) -> str:
+        spec = json.dumps([api, page, list(nr_range), sorted(known) if known is not None else None],
+                          ensure_ascii=False)
+        return hashlib.sha1(spec.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, revid: int) -> Optional[Dict[int, str]]:
+        entry = self._data.get(key)
+        if not entry or entry.get("revid") != revid:
+            return None
+        return {int(nr): rubrik for nr, rubrik in entry["rubriken"].items()}
+
+    def put(self, key: str, revid: int, rubrik_for_nr: Dict[int, str]):
+        if not self.path:
+            return
+        entry = {"revid": revid, "rubriken": {str(nr): r for nr, r in sorted(rubrik_for_nr.items())}}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with self._locked():
+            self._data = self._load()  # inzwischen von anderen geschriebene Einträge übernehmen
+            self._data[key] = entry
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, prefix=".wiki_rubriken.",
+                                             suffix=".tmp", delete=False) as f:
+                json.dump(self._data, f, ensure_ascii=False)
+            try:
+                os.replace(f.name, self.path)
+            except OSError:
+                os.remove(f.name)
+                raise
+
+
+def fetch_rubriken(pool, wiki_url: str, nr_range: Tuple[int, int], known: Optional[Iterable[str]] = None,
+                   cache_dir: Optional[str] = None, stats: Optional[Dict[str, Any]] = None) -> Dict[int, str]:
+    """
+    {nr: rubrik} über action=parse. Wirft WikiApiError/requests-Fehler; der Aufrufer entscheidet
+    über den Rückfall auf die HTML-Seite. `stats` erhält revid, Abschnitte, Bytes und ob der
+    Revisions-Cache getroffen hat.
+    """
+    api, page = api_for(wiki_url)
+    known = frozenset(known) if known is not None else None
+    stats = stats if stats is not None else {}
+    cache = RevisionCache(os.path.join(cache_dir, CACHE_FILE) if cache_dir else None)
+    key = RevisionCache.key(api, page, nr_range, known)
+
+    revid, sections = fetch_sections(pool, api, page)
+    stats.update(revid=revid, sections=0, bytes=0, cached=False)
+    cached = cache.get(key, revid)
+    if cached is not None:
+        stats["cached"] = True
+        return cached
+
+    lo, hi = nr_range
+    nr_re = re.compile(rf"^(\d{{1,{len(str(hi))}}})(?:\.\d+)?(?:\s|$)")
+    wanted = plan_sections(sections, known)
+    rubrik_for_nr: Dict[int, str] = {}
+    texts = pool.map_ordered(lambda index: fetch_section_wikitext(pool, api, revid, index), wanted)
+    for _index, text in texts:   # in Abschnittsreihenfolge, damit die erste Rubrik je Nr gewinnt
+        stats["sections"] += 1
+        stats["bytes"] += len(text.encode("utf-8"))
+        parse_wikitext(text, nr_re, nr_range, known, None, rubrik_for_nr)
+    if rubrik_for_nr:   # leeres Ergebnis nicht festschreiben, sonst bliebe es bis zur nächsten Revision
+        cache.put(key, revid, rubrik_for_nr)
+    return rubrik_for_nr
+
+
+def main():
+    from fetch_pool import FetchPool
+    from eg_scraper import EG_RUBRIKEN, HEADERS, NR_RANGE, WIKI_URL
+
+    ap = argparse.ArgumentParser(description="Rubriken einer Wikipedia-Liste über die MediaWiki-API anzeigen")
+    ap.add_argument("--wiki-url", default=WIKI_URL, help="Artikel-URL (…/wiki/<Titel>)")
+    ap.add_argument("--range", type=int, nargs=2, default=list(NR_RANGE), metavar=("VON", "BIS"))
+    ap.add_argument("--headings", choices=["eg", "all"], default="eg", help="EG-Rubriken oder jede Überschrift")
+    ap.add_argument("--cache-dir", default=None, help="Revisions-Cache in diesem Verzeichnis")
+    args = ap.parse_args()
+    stats: Dict[str, Any] = {}
+    with FetchPool(workers=4, rate=5.0, headers=HEADERS) as pool:
+        try:
+            rubrik_for_nr = fetch_rubriken(pool, args.wiki_url, tuple(args.range),
+                                           EG_RUBRIKEN if args.headings == "eg" else None, args.cache_dir, stats)
+        except Exception as e:
+            sys.exit(f"FEHLER: {e}")
+    source = "Revisions-Cache" if stats["cached"] else f"{stats['sections']} Abschnitte, {stats['bytes'] // 1024} KB"
+    print(f"Revision {stats['revid']} ({source}): {len(rubrik_for_nr)} Nummern")
+    for rubrik, n in Counter(rubrik_for_nr.values()).most_common():
+        print(f"  {n:4d}  {rubrik}")
+
+
+if __name__ == "__main__":
+    main()
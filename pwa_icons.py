@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+PWA Icon Generator für NAK Chorleiter (importierbare API, CLI: generate-pwa-icons.py)
+
+Jeder Stil (Icon, maskable, Shortcut je Hintergrundfarbe) wird genau einmal als Master in
+MASTER_SIZE px gezeichnet; alle Zielgrößen entstehen daraus durch Verkleinern mit LANCZOS, d. h.
+Kanten sind auch bei 48 px geglättet und weitere Größen kosten kaum Zeit. Kodieren und Schreiben
+laufen bei mehreren Ausgaben in einem Prozess-Pool (fork: die Master werden vorab im Elternprozess
+gezeichnet und geerbt).
+
+Inkrementell: das Manifest (Standard choir-app-frontend/pwa-icons.manifest.json, außerhalb von
+public/, damit es nicht ausgeliefert wird) hält je Datei den Hash der Render-Eingaben (Art, Größe,
+Stil, Farben, MASTER_SIZE, GENERATOR_VERSION) und den SHA-256 der geschriebenen Bytes. Passen beide,
+wird die Datei gar nicht erst gezeichnet. Sonst wird neu gezeichnet, aber nur geschrieben, wenn sich
+die Pixel gegenüber der vorhandenen Datei wirklich ändern (temporäre Datei + os.replace).
+
+Optimierung (Standard, --no-optimize schaltet ab): je Bild werden verlustfreie Kodierungen
+verglichen - Truecolor mit maximaler Kompression und, bei höchstens 256 Farben, eine exakte Palette
+(mit tRNS für Alpha) - und die kleinste behalten; Metadaten werden keine geschrieben. Mit --webp
+entsteht daneben je eine verlustfreie .webp. --max-file-bytes / --max-total-bytes lassen den Build
+scheitern, wenn eine Datei bzw. alle zusammen größer sind.
+
+    from pwa_icons import build, default_outputs, icon_outputs, splash_outputs, SPLASH_MATRIX
+    result = build(default_outputs() + splash_outputs(SPLASH_MATRIX), "out/icons", "out/manifest.json")
+    print(result.summary())
+"""
+
+import argparse, hashlib, io, json, multiprocessing, os, sys, time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image, ImageDraw
+
+# Bei jeder Änderung an der Zeichnung erhöhen, damit alle Eingabe-Hashes ungültig werden
+GENERATOR_VERSION = 2
+MASTER_SIZE = 2048
+
+ICON_DIR = "choir-app-frontend/public/assets/icons"
+MANIFEST = "choir-app-frontend/pwa-icons.manifest.json"
+
+# Farbschema
+THEME_COLOR = (25, 118, 210)  # #1976d2 - Blau
+ACCENT_COLOR = (255, 255, 255)  # Weiß
+BG_COLOR = (255, 255, 255)  # Weiß
+DARK_BG = (245, 245, 245)  # Hellgrau
+COLORS = {"theme": THEME_COLOR, "accent": ACCENT_COLOR, "bg": BG_COLOR}
+
+KINDS = ("icon", "shortcut", "screenshot", "splash")
+SPLASH_ICON_RATIO = 0.4  # Kantenlänge des Icons relativ zur kürzeren Bildseite
+
+# iOS-Startbilder (Hochformat, Pixel); Querformat wird in splash_outputs(..., landscape=True) ergänzt
+SPLASH_MATRIX = [
+    (640, 1136), (750, 1334), (828, 1792), (1080, 1920), (1125, 2436), (1170, 2532), (1179, 2556),
+    (1242, 2208), (1242, 2688), (1284, 2778), (1290, 2796), (1488, 2266), (1536, 2048), (1620, 2160),
+    (1640, 2360), (1668, 2224), (1668, 2388), (2048, 2732),
+]
+
+Color = Tuple[int, int, int]
+
+
+@dataclass(frozen=True)
+class Output:
+    filename: str
+    kind: str  # icon | shortcut | screenshot | splash
+    width: int
+    height: int
+    style: str = "default"  # icon: default | maskable
+    bg: Optional[Color] = None  # shortcut: Hintergrundfarbe
+    label: str = ""
+
+    def inputs(self) -> Dict:
+        data = asdict(self)
+        del data["filename"]
+        return {**data, "colors": COLORS, "master": MASTER_SIZE, "version": GENERATOR_VERSION}
+
+
+def default_outputs() -> List[Output]:
+    """Die Dateien, auf die manifest.webmanifest verweist."""
+    outs = icon_outputs([192, 512, 144, 96]) + icon_outputs([192, 512], style="maskable")
+    outs += [Output(f"shortcut-{name}-192x192.png", "shortcut", 192, 192, bg=bg, label=label)
+             for name, label, bg in (("absence", "A", (232, 245, 233)), ("library", "L", (227, 242, 253)),
+                                     ("performance", "E", (255, 243, 224)))]
+    outs += [Output("screenshot-1.png", "screenshot", 540, 720), Output("screenshot-2.png", "screenshot", 1280, 720)]
+    return outs
+
+
+def icon_outputs(sizes: Sequence[int], style: str = "default") -> List[Output]:
+    suffix = "-maskable" if style == "maskable" else ""
+    return [Output(f"icon-{s}x{s}{suffix}.png", "icon", s, s, style=style) for s in sizes]
+
+
+def splash_outputs(sizes: Sequence[Tuple[int, int]], landscape: bool = False) -> List[Output]:
+    dims = list(dict.fromkeys([*sizes, *((h, w) for w, h in sizes if landscape and w != h)]))
+    return [Output(f"splash-{w}x{h}.png", "splash", w, h) for w, h in dims]
+
+
+def parse_sizes(text: str) -> List[Tuple[int, int]]:
+    """'96,192,640x1136' -> [(96, 96), (192, 192), (640, 1136)]"""
+    out = []
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        w, _, h = part.lower().partition("x")
+        out.append((int(w), int(h or w)))
+    return out
+
+
+# ---------- Zeichnen ----------
+@lru_cache(maxsize=None)
+def master(kind: str, style: str = "default", bg: Optional[Color] = None) -> Image.Image:
+    """Master in MASTER_SIZE px (RGBA); wird je Prozess nur einmal gezeichnet."""
+    return _draw_shortcut(MASTER_SIZE, bg) if kind == "shortcut" else _draw_icon(MASTER_SIZE, style)
+
+
+@lru_cache(maxsize=None)
+def pyramid(kind: str, style: str = "default", bg: Optional[Color] = None) -> List[Image.Image]:
+    """Master und fortlaufend halbierte Stufen (bis 64 px), vormultipliziertes Alpha (RGBa), damit
+    weder jede Verkleinerung beim vollen Master beginnt noch jedes Mal umgerechnet wird."""
+    levels = [master(kind, style, bg).convert('RGBa')]
+    while levels[-1].width > 64:
+        levels.append(levels[-1].reduce(2))
+    return levels
+
+
+def _draw_icon(size: int, style: str) -> Image.Image:
+    # maskable: transparenter Hintergrund, sonst weiß
+    img = Image.new('RGBA', (size, size), (255, 255, 255, 0) if style == "maskable" else BG_COLOR + (255,))
+    draw = ImageDraw.Draw(img)
+
+    # Hintergrund-Kreis
+    margin = size * 0.15
+    inner = size - 2 * margin
+    draw.ellipse([margin, margin, margin + inner, margin + inner], fill=THEME_COLOR)
+
+    # Musiknoten-Symbol (vereinfacht): zwei Noten mit Balken
+    note_x = margin + inner * 0.3
+    note_y = margin + inner * 0.2
+    note = inner * 0.15
+    stem = round(note * 0.3)
+    note_x2 = note_x + inner * 0.35
+    draw.ellipse([note_x, note_y + note, note_x + note, note_y + 2 * note], fill=ACCENT_COLOR)
+    draw.line([(note_x + note, note_y + note), (note_x + note, note_y - inner * 0.3)], fill=ACCENT_COLOR, width=stem)
+    draw.ellipse([note_x2, note_y + inner * 0.1, note_x2 + note, note_y + inner * 0.25], fill=ACCENT_COLOR)
+    draw.line([(note_x2 + note, note_y), (note_x2 + note, note_y - inner * 0.4)], fill=ACCENT_COLOR, width=stem)
+    draw.line([(note_x + note, note_y - inner * 0.3), (note_x2 + note, note_y - inner * 0.4)],
+              fill=ACCENT_COLOR, width=round(note * 0.2))
+    return img
+
+
+def _draw_shortcut(size: int, bg: Color) -> Image.Image:
+    img = Image.new('RGBA', (size, size), bg + (255,))
+    draw = ImageDraw.Draw(img)
+
+    # Farbiger Kreis
+    margin = size * 0.1
+    draw.ellipse([margin, margin, size - margin, size - margin], fill=THEME_COLOR)
+
+    # Achtelnote (♪) als Form, damit sie mit der Größe skaliert
+    width = round(size * 0.035)
+    stem_x = size * 0.52 - width / 2
+    draw.ellipse([size * 0.36, size * 0.56, size * 0.52, size * 0.68], fill=ACCENT_COLOR)
+    draw.line([(stem_x, size * 0.62), (stem_x, size * 0.28)], fill=ACCENT_COLOR, width=width)
+    draw.line([(stem_x, size * 0.28), (size * 0.64, size * 0.40)], fill=ACCENT_COLOR, width=width)
+    return img
+
+
+def _scaled(levels: List[Image.Image], size: int) -> Image.Image:
+    """LANCZOS ab der kleinsten Stufe, die nicht kleiner als die Zielgröße ist."""
+    src = next((lvl for lvl in reversed(levels) if lvl.width >= size), levels[0])
+    return src.resize((size, size), Image.LANCZOS).convert('RGBA')
+
+
+@lru_cache(maxsize=64)
+def _splash_logo(size: int) -> Image.Image:
+    # Hoch- und Querformat eines Geräts teilen sich die Logo-Größe
+    return _scaled(pyramid("icon", "maskable"), size)
+
+
+def render(out: Output) -> Image.Image:
+    """Fertiges Bild einer Ausgabe (RGBA nur für maskable Icons, sonst RGB)."""
+    if out.kind == "icon":
+        img = _scaled(pyramid("icon", out.style), out.width)
+        return img if out.style == "maskable" else img.convert('RGB')
+    if out.kind == "shortcut":
+        return _scaled(pyramid("shortcut", bg=out.bg), out.width).convert('RGB')
+    if out.kind == "splash":
+        img = Image.new('RGB', (out.width, out.height), BG_COLOR)
+        logo = _splash_logo(round(min(out.width, out.height) * SPLASH_ICON_RATIO))
+        img.paste(logo, ((out.width - logo.width) // 2, (out.height - logo.height) // 2), logo)
+        return img
+    if out.kind == "screenshot":
+        # Platzhalter aus achsenparallelen Flächen: direkt in Zielgröße exakt
+        img = Image.new('RGB', (out.width, out.height), BG_COLOR)
+        ImageDraw.Draw(img).rectangle([0, 0, out.width, int(out.height * 0.1)], fill=THEME_COLOR)
+        return img
+    raise ValueError(f"Unbekannte Ausgabe-Art: {out.kind}")
+
+
+# ---------- Schreiben ----------
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _inputs_hash(out: Output, encoding: Dict) -> str:
+    return _sha256(json.dumps({**out.inputs(), "encoding": encoding}, sort_keys=True).encode())
+
+
+def _png(img: Image.Image, **params) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, 'PNG', **params)  # ohne pnginfo/icc_profile/exif: keine Metadaten
+    return buf.getvalue()
+
+
+def _palette(img: Image.Image) -> Optional[Tuple[Image.Image, bytes]]:
+    """Exakte Palettenfassung (P + Alpha je Eintrag) bei höchstens 256 Farben, sonst None."""
+    rgba = img.convert('RGBA')
+    colors = rgba.getcolors(256)
+    if colors is None:
+        return None
+    index = {int.from_bytes(bytes(c), sys.byteorder): i for i, (_n, c) in enumerate(colors)}
+    pal = Image.frombytes('P', img.size, bytes(map(index.__getitem__, array('I', rgba.tobytes()))))
+    pal.putpalette(b"".join(bytes(c[:3]) for _n, c in colors))
+    return pal, bytes(c[3] for _n, c in colors)
+
+
+def _decodes_to(data: bytes, img: Image.Image) -> bool:
+    with Image.open(io.BytesIO(data)) as dec:
+        return dec.size == img.size and dec.convert(img.mode).tobytes() == img.tobytes()
+
+
+def encode_png(img: Image.Image, optimize: bool = True) -> Tuple[bytes, int]:
+    """-> (kleinste verlustfreie PNG-Kodierung, Größe der einfachen Kodierung zum Vergleich)."""
+    plain = _png(img)
+    if not optimize:
+        return plain, len(plain)
+    best = min(plain, _png(img, optimize=True), key=len)
+    pal = _palette(img)
+    if pal is not None:
+        pal_img, alpha = pal
+        params = {"transparency": alpha} if alpha.count(255) != len(alpha) else {}
+        data = _png(pal_img, optimize=True, **params)
+        if len(data) < len(best) and _decodes_to(data, img):
+            best = data
+    return best, len(plain)
+
+
+def encode_webp(img: Image.Image) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, 'WEBP', lossless=True, quality=100, method=4)
+    return buf.getvalue()
+
+
+def _webp_name(filename: str) -> str:
+    return os.path.splitext(filename)[0] + ".webp"
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _same_pixels(path: Path, img: Image.Image) -> bool:
+    try:
+        with Image.open(path) as old:
+            return old.size == img.size and old.convert(img.mode).tobytes() == img.tobytes()
+    except (OSError, ValueError):
+        return False
+
+
+def _store(path: Path, img: Image.Image, data: bytes, force: bool) -> Tuple[bytes, bool]:
+    """Schreibt `data`, außer die vorhandene Datei hat dieselben Pixel und ist nicht größer
+    (kein neuer Zeitstempel/Cache-Bust nur wegen anderer Encoder-Bytes)."""
+    if not force and path.is_file() and path.stat().st_size <= len(data):
+        old = path.read_bytes()
+        if old == data or _same_pixels(path, img):
+            return old, False
+    _write_atomic(path, data)
+    return data, True
+
+
+def _build_one(job: Tuple[Output, str, bool, Dict]) -> Tuple[str, bool, Dict]:
+    """Zeichnet, kodiert und schreibt eine Ausgabe (Pool-Worker); -> (datei, geschrieben, manifest-eintrag)."""
+    out, out_dir, force, encoding = job
+    path = Path(out_dir) / out.filename
+    img = render(out)
+    data, plain_bytes = encode_png(img, encoding["optimize"])
+    data, changed = _store(path, img, data, force)
+    entry = {"inputs": _inputs_hash(out, encoding), "sha256": _sha256(data), "bytes": len(data),
+             "plain_bytes": plain_bytes}
+    if encoding["webp"]:
+        webp, webp_changed = _store(path.with_name(_webp_name(out.filename)), img, encode_webp(img), force)
+        entry["webp"] = {"sha256": _sha256(webp), "bytes": len(webp)}
+        changed = changed or webp_changed
+    return out.filename, changed, entry
+
+
+def _unchanged(entry: Optional[Dict], inputs_hash: str, path: Path) -> bool:
+    if not entry or entry.get("inputs") != inputs_hash:
+        return False
+    files = [(path, entry.get("sha256"))]
+    if "webp" in entry:
+        files.append((path.with_name(_webp_name(path.name)), entry["webp"].get("sha256")))
+    return all(p.is_file() and _sha256(p.read_bytes()) == digest for p, digest in files)
+
+
+@dataclass
+class BuildResult:
+    built: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    files: Dict[str, Dict] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        return f"{len(self.built)} erstellt, {len(self.skipped)} übersprungen (unverändert) in {self.seconds:.2f} s"
+
+    def sizes(self) -> Dict[str, int]:
+        """{datei: bytes} aller Ausgaben einschließlich WebP-Geschwistern."""
+        out = {}
+        for name, entry in self.files.items():
+            out[name] = entry["bytes"]
+            if "webp" in entry:
+                out[_webp_name(name)] = entry["webp"]["bytes"]
+        return out
+
+    def budget_violations(self, max_file: Optional[int] = None, max_total: Optional[int] = None) -> List[str]:
+        sizes = self.sizes()
+        problems = [f"{name}: {n} B > {max_file} B" for name, n in sorted(sizes.items())
+                    if max_file is not None and n > max_file]
+        total = sum(sizes.values())
+        if max_total is not None and total > max_total:
+            problems.append(f"gesamt: {total} B > {max_total} B")
+        return problems
+
+    def size_table(self) -> str:
+        """Vorher (einfache PNG-Kodierung) / nachher je Datei und gesamt."""
+        rows = [("Datei", "vorher", "nachher", "Ersparnis", "WebP")]
+        totals = [0, 0, 0]
+        for name, entry in sorted(self.files.items()):
+            before, after = entry.get("plain_bytes", entry["bytes"]), entry["bytes"]
+            webp = entry.get("webp", {}).get("bytes", 0)
+            totals = [totals[0] + before, totals[1] + after, totals[2] + webp]
+            rows.append((name, str(before), str(after), _percent(before, after), str(webp or "–")))
+        rows.append(("gesamt", str(totals[0]), str(totals[1]), _percent(totals[0], totals[1]), str(totals[2] or "–")))
+        widths = [max(len(r[i]) for r in rows) for i in range(len(rows[0]))]
+        return "\n".join("  ".join(c.ljust(w) if i == 0 else c.rjust(w) for i, (c, w) in enumerate(zip(r, widths)))
+                         for r in rows)
+
+
+def _percent(before: int, after: int) -> str:
+    return f"{100 * (before - after) / before:.0f} %" if before else "–"
+
+
+def parse_bytes(text: str) -> int:
+    """'150000', '150k', '2m' -> Bytes"""
+    text = text.strip().lower()
+    factor = {"k": 1024, "m": 1024 * 1024}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * factor)
+
+
+def _load_manifest(path: Path) -> Dict[str, Dict]:
+    if not path.is_file():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8")).get("files", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def _pool_context():
+    try:
+        return multiprocessing.get_context("fork")
+    except ValueError:  # Windows: spawn, Master werden dann je Worker gezeichnet
+        return None
+
+
+def build(outputs: Sequence[Output], out_dir=ICON_DIR, manifest=MANIFEST, force: bool = False,
+          workers: Optional[int] = None, verbose: bool = False, optimize: bool = True,
+          webp: bool = False) -> BuildResult:
+    """Erzeugt alle geänderten Ausgaben und schreibt das Manifest; workers=None: CPU-Anzahl."""
+    t0 = time.perf_counter()
+    out_dir, manifest = Path(out_dir), Path(manifest)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    names = [o.filename for o in outputs]
+    if len(set(names)) != len(names):
+        raise ValueError("Doppelte Dateinamen in den Ausgaben")
+    old = {} if force else _load_manifest(manifest)
+    encoding = {"optimize": optimize, "webp": webp}
+    result = BuildResult()
+    todo = []
+    for out in outputs:
+        entry = old.get(out.filename)
+        if _unchanged(entry, _inputs_hash(out, encoding), out_dir / out.filename):
+            result.files[out.filename] = entry
+            result.skipped.append(out.filename)
+            if verbose:
+                print(f"· Unverändert: {out.filename}")
+        else:
+            todo.append((out, str(out_dir), force, encoding))
+
+    # Master einmal im Elternprozess zeichnen; fork-Worker erben sie. Große Bilder zuerst,
+    # damit am Ende kein einzelner Worker allein an einem Startbild kodiert.
+    for out, *_rest in todo:
+        if out.kind == "icon":
+            pyramid("icon", out.style)
+        elif out.kind == "shortcut":
+            pyramid("shortcut", bg=out.bg)
+        elif out.kind == "splash":
+            pyramid("icon", "maskable")
+    todo.sort(key=lambda job: -job[0].width * job[0].height)
+    workers = min(workers or os.cpu_count() or 1, len(todo))
+    ctx = _pool_context()
+    if workers > 1 and ctx is not None:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            done = list(pool.map(_build_one, todo))
+    else:
+        done = [_build_one(job) for job in todo]
+
+    for name, changed, entry in done:
+        result.files[name] = entry
+        (result.built if changed else result.skipped).append(name)
+        if verbose:
+            print(f"✓ Erstellt: {name}" if changed else f"· Unverändert: {name}")
+    manifest.parent.mkdir(parents=True, exist_ok=True)
+    data = json.dumps({"version": GENERATOR_VERSION, "files": result.files}, indent=2, sort_keys=True)
+    _write_atomic(manifest, (data + "\n").encode("utf-8"))
+    result.seconds = time.perf_counter() - t0
+    return result
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="PWA-Icons für NAK Chorleiter erzeugen (inkrementell)")
+    ap.add_argument("--out-dir", default=ICON_DIR, help="Zielverzeichnis der Icons")
+    ap.add_argument("--manifest", default=MANIFEST, help="Build-Manifest mit Eingabe- und Ausgabe-Hashes")
+    ap.add_argument("--force", action="store_true", help="Alle Dateien neu schreiben, Manifest ignorieren")
+    ap.add_argument("--sizes", default="", help="Zusätzliche Icon-Größen, z. B. 48,72,128,256")
+    ap.add_argument("--maskable-sizes", default="", help="Zusätzliche maskable Icon-Größen")
+    ap.add_argument("--splash", default="", help="Startbilder BxH, z. B. 640x1136,1170x2532")
+    ap.add_argument("--splash-matrix", action="store_true", help="Alle iOS-Startbilder (SPLASH_MATRIX, hoch + quer)")
+    ap.add_argument("--no-defaults", action="store_true", help="Nur die angegebenen Größen, nicht die Manifest-Icons")
+    ap.add_argument("--workers", type=int, default=None, help="Prozesse zum Kodieren (Standard: CPU-Anzahl)")
+    ap.add_argument("--no-optimize", action="store_true", help="Einfache PNG-Kodierung statt der kleinsten")
+    ap.add_argument("--webp", action="store_true", help="Zusätzlich verlustfreie .webp je Datei")
+    ap.add_argument("--max-file-bytes", type=parse_bytes, default=None, help="Budget je Datei, z. B. 40k")
+    ap.add_argument("--max-total-bytes", type=parse_bytes, default=None, help="Budget für alle Dateien, z. B. 500k")
+    args = ap.parse_args(argv)
+
+    outputs = [] if args.no_defaults else default_outputs()
+    outputs += icon_outputs([w for w, _h in parse_sizes(args.sizes)])
+    outputs += icon_outputs([w for w, _h in parse_sizes(args.maskable_sizes)], style="maskable")
+    outputs += splash_outputs(parse_sizes(args.splash) + (SPLASH_MATRIX if args.splash_matrix else []),
+                              landscape=args.splash_matrix)
+    # Doppelte (z. B. --sizes 192 zusätzlich zu den Standard-Icons) nur einmal erzeugen
+    outputs = list({o.filename: o for o in outputs}.values())
+
+    result = build(outputs, args.out_dir, args.manifest, force=args.force, workers=args.workers, verbose=True,
+                   optimize=not args.no_optimize, webp=args.webp)
+    print("\n" + result.size_table())
+    problems = result.budget_violations(args.max_file_bytes, args.max_total_bytes)
+    if problems:
+        raise SystemExit("\n✗ Byte-Budget überschritten:\n  " + "\n  ".join(problems))
+    print(f"\n✓✓ PWA-Icon-Generierung abgeschlossen: {result.summary()}")
+
+
+if __name__ == "__main__":
+    main()